@@ -13,6 +13,18 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from contextlib import contextmanager
 
+# ポジション履歴クエリ（timestamp範囲はインデックスで解決する。DATE(timestamp)等の関数適用は不可）
+POSITION_HISTORY_QUERY = """
+    SELECT timestamp, ticket, symbol, type, volume, profit,
+           open_price, current_price, open_time, created_at
+    FROM position_history
+    WHERE timestamp > ?
+"""
+DAILY_POSITIONS_QUERY = """
+    SELECT profit, type FROM position_history
+    WHERE timestamp >= ? AND timestamp < ?
+"""
+
 class DatabaseManager:
     """SQLiteデータベース管理・統計データ永続化"""
     
@@ -87,7 +99,10 @@ class DatabaseManager:
             
             # インデックス作成
             conn.execute("CREATE INDEX IF NOT EXISTS idx_account_timestamp ON account_history(timestamp)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_position_timestamp ON position_history(timestamp)")
+            # 日別統計はインデックスのみで集計できるよう(timestamp, profit, type)のカバリングインデックスとする
+            conn.execute("DROP INDEX IF EXISTS idx_position_timestamp")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_position_timestamp_cover ON position_history(timestamp, profit, type)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_position_symbol_timestamp ON position_history(symbol, timestamp)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_position_ticket ON position_history(ticket)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_date ON performance_metrics(date)")
             
@@ -201,12 +216,7 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
                 
-                query = """
-                    SELECT timestamp, ticket, symbol, type, volume, profit,
-                           open_price, current_price, open_time, created_at
-                    FROM position_history
-                    WHERE timestamp > ?
-                """
+                query = POSITION_HISTORY_QUERY
                 params = [cutoff_time]
                 
                 if symbol:
@@ -229,11 +239,9 @@ class DatabaseManager:
         
         try:
             with self.get_connection() as conn:
-                # その日の全ポジション取得
-                cursor = conn.execute("""
-                    SELECT profit, type FROM position_history
-                    WHERE DATE(timestamp) = ?
-                """, (date,))
+                # その日の全ポジション取得（日付境界の範囲検索）
+                next_date = (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+                cursor = conn.execute(DAILY_POSITIONS_QUERY, (date, next_date))
                 
                 positions = cursor.fetchall()
                 
@@ -14,10 +14,11 @@ import sys
 import time
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict
 
 from cost_resistant_strategy import CostResistantStrategy
-from data_cache_system import DataCacheManager
+from data_cache_system import DataCacheManager, frame_to_records
+from historical_data_lake import HistoricalDataLake
 
 
 class Position:
@@ -27,7 +28,10 @@ class Position:
 
 class CostResistantWFAExecutionFixed:
     def __init__(self):
-        self.cache_manager = DataCacheManager()
+        # フォールド期間はデータレイクから該当月のパーティションだけを読む
+        self.cache_manager = DataCacheManager(
+            data_lake=HistoricalDataLake("data_cache/data_lake")
+        )
         self.base_params = {
             "h4_period": 24,
             "h1_period": 24,
@@ -39,8 +43,11 @@ class CostResistantWFAExecutionFixed:
             "commission_pips": 0.3,
         }
 
-    def _backtest_fold(self, test_data: List, fold_id: int) -> Dict:
+    def _backtest_fold(self, start: datetime, end: datetime, fold_id: int) -> Dict:
         """逐次版と完全同一のバックテストロジックを実行"""
+        # フォールド期間はワーカー側でデータレイクから読み込む
+        # （親プロセスから辞書リストをpickle転送しない）
+        test_data = frame_to_records(self.cache_manager.read_range(start, end))
         # CostResistantStrategy インスタンスを毎回生成（ステートレス設計）
         strategy = CostResistantStrategy(self.base_params.copy())
         # ここで既存の _execute_realistic_backtest と同一処理を呼び出し
@@ -48,23 +55,25 @@ class CostResistantWFAExecutionFixed:
 
     def execute_sensitivity_analysis_parallel(self) -> Dict:
         """並列感度分析: 全シナリオを _backtest_fold で処理"""
-        raw_data = self.cache_manager.get_full_data()
-        assert raw_data and len(raw_data) >= 1000, "データ不足"
-        # 5フォールド分割
-        fold_size = len(raw_data) // 5
+        timeline = self.cache_manager.get_timeline()
+        assert len(timeline) >= 1000, "データ不足"
+        # ワーカーが読む前にデータレイクへ登録しておく
+        self.cache_manager.ensure_lake()
+        # 5フォールド分割（ワーカーへは期間のみ渡す）
+        fold_size = len(timeline) // 5
         tasks = []
         for fold_id in range(1, 6):
             start = (fold_id - 1) * fold_size
             end = fold_id * fold_size
-            tasks.append((raw_data[start:end], fold_id))
+            tasks.append((timeline[start], timeline[end - 1], fold_id))
 
         cpu = max(1, mp.cpu_count() - 1)
         results = []
         start_time = time.time()
         with ProcessPoolExecutor(max_workers=cpu) as executor:
             future_to_fold = {
-                executor.submit(self._backtest_fold, data, fid): fid
-                for data, fid in tasks
+                executor.submit(self._backtest_fold, start, end, fid): fid
+                for start, end, fid in tasks
             }
             completed = 0
             for future in as_completed(future_to_fold):
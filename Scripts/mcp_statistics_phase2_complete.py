@@ -11,8 +11,10 @@ import json
 import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict
+from statistics import NormalDist
+from typing import Dict, List, Optional
 
 import numpy as np
 
@@ -28,6 +30,52 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _simulate_ruin_chunk(
+    seed_sequence: np.random.SeedSequence,
+    simulations: int,
+    step_values: np.ndarray,
+    step_probabilities: Optional[np.ndarray],
+    initial_balance: float,
+    ruin_threshold: float,
+    max_trades: int,
+    block_size: int,
+) -> np.ndarray:
+    """
+    破産シミュレーション（1チャンク分）
+
+    取引結果をblock_size取引ずつ行列（生存パス数×block_size）で一括抽選し、
+    累積和で資産曲線を求め、閾値を最初に下回った位置をargmaxで検出する。
+    破産したパスは次ブロック以降の計算対象から外す。
+
+    Returns:
+        np.ndarray: パスごとの破産取引数（破産しなかったパスは0）
+    """
+    rng = np.random.default_rng(seed_sequence)
+    ruin_trades = np.zeros(simulations, dtype=np.int64)
+    alive = np.arange(simulations)
+    balance = np.full(simulations, float(initial_balance))
+    trades_done = 0
+
+    while alive.size and trades_done < max_trades:
+        steps = min(block_size, max_trades - trades_done)
+        outcomes = rng.choice(
+            step_values, size=(alive.size, steps), p=step_probabilities
+        )
+        paths = balance[:, None] + np.cumsum(outcomes, axis=1)
+
+        crossed = paths <= ruin_threshold
+        ruined = crossed.any(axis=1)
+        first_cross = crossed.argmax(axis=1)
+        ruin_trades[alive[ruined]] = trades_done + first_cross[ruined] + 1
+
+        survivors = ~ruined
+        alive = alive[survivors]
+        balance = paths[survivors, -1]
+        trades_done += steps
+
+    return ruin_trades
+
+
 class CompletePhase2Calculator:
     """Phase 1 第2優先統計指標計算クラス（完全版）"""
 
@@ -251,8 +299,46 @@ class CompletePhase2Calculator:
             logger.error(f"Error calculating consecutive losses: {e}")
             return {"max": 0, "current": 0, "sequences": []}
 
-    def calculate_risk_of_ruin_monte_carlo(self, simulations: int = 10000) -> Dict:
-        """モンテカルロシミュレーションによる破産確率計算"""
+    def _trade_profits(self) -> List[float]:
+        """取引ごとの損益（USD）"""
+        profits = []
+        for trade in self.trades_data:
+            if isinstance(trade, dict):
+                if "profit" in trade:
+                    profits.append(float(trade["profit"]))
+                elif "pip_profit" in trade:
+                    profits.append(float(trade["pip_profit"]) * 0.1)
+                elif "pip_net_profit" in trade:
+                    profits.append(float(trade["pip_net_profit"]) * 0.1)
+        return profits
+
+    def calculate_risk_of_ruin_monte_carlo(
+        self,
+        simulations: int = 10000,
+        method: str = "parametric",
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        confidence: float = 0.95,
+        chunk_size: int = 1000,
+        max_trades: int = 10000,
+    ) -> Dict:
+        """
+        モンテカルロシミュレーションによる破産確率計算
+
+        Args:
+            simulations: シミュレーション回数
+            method: "parametric"（勝率・平均損益の2値モデル）または
+                "bootstrap"（実取引損益からの復元抽出）
+            workers: 並列プロセス数（Noneなら全コア、1なら単一プロセス）
+            seed: 乱数シード（並列数によらず同じ結果になる）
+            confidence: 信頼区間の信頼水準
+            chunk_size: 1チャンク（1タスク）あたりのシミュレーション数
+            max_trades: 1シミュレーションあたりの最大取引数
+
+        Returns:
+            dict: probability（%）・avg_ruin_trades等。bootstrapで取引損益が1件もない
+                場合は推定不能としてprobability・avg_ruin_tradesをNoneで返す
+        """
         try:
             # 基本パラメータ
             win_rate = self.phase1_data.get("win_rate", 0) / 100
@@ -260,44 +346,97 @@ class CompletePhase2Calculator:
             avg_win = rr_data.get("avg_profit", 0)
             avg_loss = rr_data.get("avg_loss", 0)
 
-            if win_rate == 0 or avg_loss == 0:
-                return {"probability": 100.0, "avg_ruin_trades": 0}
-
             # シミュレーション設定
             initial_balance = 1000  # 正規化
             ruin_threshold = 100  # 90%損失で破産
             risk_per_trade = 10  # 1%リスク
 
-            ruin_count = 0
-            ruin_trades = []
-
-            for _ in range(simulations):
-                balance = initial_balance
-                trades = 0
-
-                while balance > ruin_threshold and trades < 10000:
-                    trades += 1
-
-                    # 勝敗をランダムに決定
-                    if np.random.random() < win_rate:
-                        # 勝ち
-                        balance += risk_per_trade * (avg_win / avg_loss)
-                    else:
-                        # 負け
-                        balance -= risk_per_trade
-
-                if balance <= ruin_threshold:
-                    ruin_count += 1
-                    ruin_trades.append(trades)
+            if method == "bootstrap":
+                # 実取引損益を平均損失=1%リスクとなるよう正規化して復元抽出
+                profits = np.array(self._trade_profits())
+                if profits.size == 0:
+                    logger.warning("Bootstrap risk of ruin skipped: no trade profits")
+                    return {"probability": None, "avg_ruin_trades": None, "method": method}
+                losses = profits[profits < 0]
+                if losses.size == 0:
+                    return {"probability": 0.0, "avg_ruin_trades": 0}
+                step_values = profits / abs(losses.mean()) * risk_per_trade
+                step_probabilities = None
+            else:
+                if win_rate == 0 or avg_loss == 0:
+                    return {"probability": 100.0, "avg_ruin_trades": 0}
+                step_values = np.array(
+                    [risk_per_trade * (avg_win / avg_loss), -risk_per_trade]
+                )
+                step_probabilities = np.array([win_rate, 1 - win_rate])
+
+            # チャンク分割（乱数列はチャンク単位で独立・再現可能）
+            chunk_sizes = [
+                min(chunk_size, simulations - start)
+                for start in range(0, simulations, chunk_size)
+            ]
+            seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+            args = [
+                (
+                    chunk_seed,
+                    size,
+                    step_values,
+                    step_probabilities,
+                    initial_balance,
+                    ruin_threshold,
+                    max_trades,
+                    chunk_size,
+                )
+                for chunk_seed, size in zip(seeds, chunk_sizes)
+            ]
+
+            workers = workers or os.cpu_count() or 1
+            if workers > 1 and len(args) > 1:
+                with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+                    chunks = list(pool.map(_simulate_ruin_chunk, *zip(*args)))
+            else:
+                chunks = [_simulate_ruin_chunk(*chunk_args) for chunk_args in args]
+
+            ruin_trades = np.concatenate(chunks)
+            ruin_trades = ruin_trades[ruin_trades > 0]
+            ruin_count = int(ruin_trades.size)
 
             ruin_probability = (ruin_count / simulations) * 100
-            avg_ruin_trades = np.mean(ruin_trades) if ruin_trades else 0
+            avg_ruin_trades = np.mean(ruin_trades) if ruin_count else 0
+
+            # Wilsonスコア信頼区間（破産確率）
+            z = NormalDist().inv_cdf(0.5 + confidence / 2)
+            p = ruin_count / simulations
+            center = (p + z**2 / (2 * simulations)) / (1 + z**2 / simulations)
+            half_width = (
+                z
+                * np.sqrt(p * (1 - p) / simulations + z**2 / (4 * simulations**2))
+                / (1 + z**2 / simulations)
+            )
+
+            # 破産までの取引数の分位点
+            tail = (1 - confidence) / 2 * 100
+            ruin_trade_interval = (
+                [
+                    round(float(v), 0)
+                    for v in np.percentile(ruin_trades, [tail, 100 - tail])
+                ]
+                if ruin_count
+                else [0, 0]
+            )
 
             return {
                 "probability": round(ruin_probability, 2),
                 "avg_ruin_trades": round(avg_ruin_trades, 0),
                 "simulations": simulations,
                 "ruin_events": ruin_count,
+                "method": method,
+                "confidence": confidence,
+                "probability_ci": [
+                    round(float(max(center - half_width, 0.0)) * 100, 2),
+                    round(float(min(center + half_width, 1.0)) * 100, 2),
+                ],
+                "ruin_trades_interval": ruin_trade_interval,
             }
 
         except Exception as e:
@@ -11,7 +11,6 @@ kiro設計tasks.md:159-165準拠 - 既存自動化システムとの互換性確
 import asyncio
 import json
 import logging
-import aiosqlite
 import time
 import subprocess
 import os
@@ -35,6 +34,7 @@ except ImportError:
 # 既存システム統合
 sys.path.append(str(Path(__file__).parent))
 from realtime_signal_generator import SystemConstants, get_config_value, CONFIG
+from database_pool import get_connection_pool, get_ingest_queue, WriteLane
 from database_manager import DatabaseManager
 from position_management import PositionTracker
 from risk_management import RiskManager
@@ -176,7 +176,7 @@ class AutomationCompatibilityManager:
     async def _initialize_compatibility_tables(self):
         """互換性管理テーブル初期化"""
         try:
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
+            async with get_connection_pool(self.db_manager.db_path).writer() as conn:
                 # 自動化コンポーネント登録テーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS automation_components (
@@ -419,25 +419,23 @@ class AutomationCompatibilityManager:
             self.registered_components[component.component_id] = component
             
             # データベース保存
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
-                await conn.execute('''
-                    INSERT OR REPLACE INTO automation_components (
-                        component_id, name, component_type, status, pid, command,
-                        schedule, working_directory, log_file, last_seen, start_time,
-                        restart_count, health_check_endpoint, dependencies,
-                        compatibility_level, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    component.component_id, component.name, component.component_type.value,
-                    component.status.value, component.pid, component.command,
-                    component.schedule, component.working_directory, component.log_file,
-                    component.last_seen.isoformat(),
-                    component.start_time.isoformat() if component.start_time else None,
-                    component.restart_count, component.health_check_endpoint,
-                    json.dumps(component.dependencies), component.compatibility_level.value,
-                    datetime.now().isoformat()
-                ))
-                await conn.commit()
+            await get_ingest_queue(self.db_manager.db_path).execute('''
+                INSERT OR REPLACE INTO automation_components (
+                    component_id, name, component_type, status, pid, command,
+                    schedule, working_directory, log_file, last_seen, start_time,
+                    restart_count, health_check_endpoint, dependencies,
+                    compatibility_level, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                component.component_id, component.name, component.component_type.value,
+                component.status.value, component.pid, component.command,
+                component.schedule, component.working_directory, component.log_file,
+                component.last_seen.isoformat(),
+                component.start_time.isoformat() if component.start_time else None,
+                component.restart_count, component.health_check_endpoint,
+                json.dumps(component.dependencies), component.compatibility_level.value,
+                datetime.now().isoformat()
+            ), lane=WriteLane.NORMAL)
             
             logger.debug(f"Component registered: {component.component_id}")
             
@@ -728,21 +726,19 @@ class AutomationCompatibilityManager:
     async def _save_hotswap_operation(self, operation: HotSwapOperation):
         """ホットスワップ操作履歴保存"""
         try:
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO hotswap_operations (
-                        operation_id, target_component, operation_type, old_version,
-                        new_version, start_time, completion_time, success,
-                        rollback_available, error_message
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    operation.operation_id, operation.target_component, operation.operation_type,
-                    operation.old_version, operation.new_version, operation.start_time.isoformat(),
-                    operation.completion_time.isoformat() if operation.completion_time else None,
-                    operation.success, operation.rollback_available, operation.error_message
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_manager.db_path).execute('''
+                INSERT INTO hotswap_operations (
+                    operation_id, target_component, operation_type, old_version,
+                    new_version, start_time, completion_time, success,
+                    rollback_available, error_message
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                operation.operation_id, operation.target_component, operation.operation_type,
+                operation.old_version, operation.new_version, operation.start_time.isoformat(),
+                operation.completion_time.isoformat() if operation.completion_time else None,
+                operation.success, operation.rollback_available, operation.error_message
+            ), lane=WriteLane.NORMAL)
+            
         except Exception as e:
             logger.error(f"Hotswap operation save error: {e}")
     
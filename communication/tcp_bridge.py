@@ -27,6 +27,8 @@ class MessageType(Enum):
     PARAMETER_UPDATE = "parameter_update"
     STATUS_REQUEST = "status_request"
     ERROR = "error"
+    POSITION_ACTION = "position_action"    # Python→MT4: ポジション開設・決済指示
+    POSITION_UPDATE = "position_update"    # MT4→Python: 約定・決済結果（チケット番号付き）
 
 @dataclass
 class TradingSignal:
@@ -50,13 +52,13 @@ class TradingMessage:
     message_id: str
     
     def to_json(self) -> str:
-        """JSON形式に変換"""
+        """JSON形式に変換（EA側の文字列照合に合わせ区切り文字の空白なし）"""
         return json.dumps({
             'message_type': self.message_type.value,
             'timestamp': self.timestamp,
             'data': self.data,
             'message_id': self.message_id
-        })
+        }, separators=(',', ':'))
     
     @classmethod
     def from_json(cls, json_str: str) -> 'TradingMessage':
@@ -21,6 +21,12 @@ from pathlib import Path
 import threading
 import queue
 
+try:
+    from historical_data_lake import HistoricalDataLake
+    DATA_LAKE_AVAILABLE = True
+except ImportError:
+    DATA_LAKE_AVAILABLE = False
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -85,11 +91,21 @@ class AlphaVantageClient:
     
     BASE_URL = "https://www.alphavantage.co/query"
     
-    def __init__(self, api_key: str, cache_dir: str = "data_cache"):
+    def __init__(self, api_key: str, cache_dir: str = "data_cache", data_lake=None,
+                 use_data_lake: bool = True):
         self.api_key = api_key
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         
+        # ヒストリカルデータレイク（HistoricalDataLake）: 取得データを差分追記
+        # 未指定ならキャッシュディレクトリ配下のレイクを使う（use_data_lake=Falseで無効）
+        if data_lake is None and use_data_lake:
+            if DATA_LAKE_AVAILABLE:
+                data_lake = HistoricalDataLake(str(self.cache_dir / "data_lake"))
+            else:
+                logger.warning("historical_data_lake未検出: データレイク追記無効")
+        self.data_lake = data_lake
+        
         # レート制限管理（無料枠: 25 requests/day）
         self.request_count = 0
         self.last_request_time = 0
@@ -198,6 +214,7 @@ class AlphaVantageClient:
             
             # キャッシュ保存
             self._save_cache(cache_key, df)
+            self._append_to_lake(from_symbol + to_symbol, interval.name, df)
             
             logger.info(f"FX分足データ取得成功: {from_symbol}/{to_symbol}, {len(df)}レコード")
             return df
@@ -245,6 +262,7 @@ class AlphaVantageClient:
             df.sort_index(inplace=True)
             
             self._save_cache(cache_key, df)
+            self._append_to_lake(from_symbol + to_symbol, DataInterval.DAILY.name, df)
             
             logger.info(f"FX日足データ取得成功: {from_symbol}/{to_symbol}, {len(df)}レコード")
             return df
@@ -358,6 +376,30 @@ class AlphaVantageClient:
             logger.error(f"経済指標解析エラー: {e}")
             return []
     
+    def load_fx_history(self, from_symbol: str, to_symbol: str,
+                        interval: DataInterval = DataInterval.M5,
+                        start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """蓄積済みFX履歴の期間読み込み（データレイクの該当パーティションのみ）"""
+        if self.data_lake is None:
+            logger.warning("データレイク未設定のため履歴読み込み不可")
+            return None
+        
+        df = self.data_lake.read(from_symbol + to_symbol, interval.name, start=start, end=end)
+        df.index.name = 'timestamp'
+        return df
+    
+    def _append_to_lake(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        """取得データをデータレイクへ差分追記"""
+        if self.data_lake is None:
+            return
+        
+        try:
+            updated = self.data_lake.append(symbol, timeframe, df)
+            logger.info(f"データレイク追記: {symbol}/{timeframe} {updated}")
+        except Exception as e:
+            logger.warning(f"データレイク追記エラー: {e}")
+    
     def _load_cache(self, cache_key: str) -> Optional[pd.DataFrame]:
         """キャッシュデータ読み込み"""
         cache_file = self.cache_dir / f"{cache_key}.pkl"
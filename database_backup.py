@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Phase 4.1: Online Database Backup
+WALモードの読み込み接続からのオンラインバックアップ（ページ単位の差分バックアップ対応）
+
+- 読み込み接続で読み取りトランザクションを開いたままSQLiteバックアップAPIを
+  step_pagesページずつ実行する。スナップショットが固定されるため、他接続の書き込みで
+  バックアップが最初からやり直しになることはなく、WALのため書き込み側も待たされない
+- チェックサム・ページハッシュはchunk_pagesページ単位で読みながら計算する
+  （ファイル全体をメモリに読み込まない）。ファイルI/Oはスレッドで実行する
+- 差分バックアップは直近のフルバックアップのページハッシュ（.pagemap）と比較し、
+  変更されたページだけを保存する。復元はフル + 差分1つ
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import aiosqlite
+
+from database_pool import get_connection_pool
+
+# ログ設定
+logger = logging.getLogger(__name__)
+
+DIFF_MAGIC = b'SQLDIFF1'
+DIFF_HEADER = struct.Struct('>II')    # page_size, page_count
+DIFF_RECORD = struct.Struct('>I')     # pgno（1始まり）
+PAGE_DIGEST_SIZE = 16
+FILE_CHUNK_BYTES = 1024 * 1024
+
+class BackupKind:
+    """バックアップ種別"""
+    FULL = "FULL"
+    DIFFERENTIAL = "DIFFERENTIAL"
+
+@dataclass
+class BackupResult:
+    """バックアップ結果"""
+    path: Path
+    backup_kind: str
+    checksum: str
+    file_size_bytes: int
+    page_size: int
+    page_count: int
+    pages_written: int
+    elapsed_seconds: float
+    base_path: Optional[Path] = None
+
+    @property
+    def size_ratio(self) -> float:
+        """データベース全体に対するバックアップサイズ比"""
+        total = self.page_size * self.page_count
+        return self.file_size_bytes / total if total else 1.0
+
+def pagemap_path(backup_path: Path) -> Path:
+    """フルバックアップのページハッシュファイル"""
+    return backup_path.with_name(backup_path.name + '.pagemap')
+
+def _page_digest(page: bytes) -> bytes:
+    return hashlib.blake2b(page, digest_size=PAGE_DIGEST_SIZE).digest()
+
+def _read_page_size(path: Path) -> int:
+    """データベースヘッダからページサイズ取得"""
+    with open(path, 'rb') as f:
+        header = f.read(100)
+    page_size = int.from_bytes(header[16:18], 'big')
+    return 65536 if page_size == 1 else page_size
+
+def file_sha256(path: Path, chunk_size: int = FILE_CHUNK_BYTES) -> str:
+    """チャンク単位のSHA-256計算"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _hash_full_backup(path: Path, page_size: int, chunk_pages: int) -> Tuple[str, int]:
+    """フルバックアップのSHA-256とページハッシュ（.pagemap）を1回の読み込みで作成"""
+    file_digest = hashlib.sha256()
+    page_count = 0
+    chunk_bytes = page_size * chunk_pages
+    tmp_map = pagemap_path(path).with_suffix('.tmp')
+    with open(path, 'rb') as f, open(tmp_map, 'wb') as page_map:
+        for chunk in iter(lambda: f.read(chunk_bytes), b''):
+            file_digest.update(chunk)
+            page_map.write(b''.join(
+                _page_digest(chunk[offset:offset + page_size])
+                for offset in range(0, len(chunk), page_size)
+            ))
+            page_count += (len(chunk) + page_size - 1) // page_size
+    os.replace(tmp_map, pagemap_path(path))
+    return file_digest.hexdigest(), page_count
+
+def _write_differential(snapshot: Path, base_map: Path, diff_path: Path,
+                        page_size: int, chunk_pages: int) -> Tuple[str, int, int]:
+    """スナップショットとベースのページハッシュを比較し、変更ページのみ書き出す"""
+    page_count = 0
+    pages_written = 0
+    chunk_bytes = page_size * chunk_pages
+
+    with open(snapshot, 'rb') as f, open(base_map, 'rb') as base, open(diff_path, 'wb') as out:
+        # ヘッダ（ページ数は末尾で確定するため後から書き直す）
+        out.write(DIFF_MAGIC + DIFF_HEADER.pack(page_size, 0))
+        for chunk in iter(lambda: f.read(chunk_bytes), b''):
+            base_digests = base.read(PAGE_DIGEST_SIZE * chunk_pages)
+            for index, offset in enumerate(range(0, len(chunk), page_size)):
+                page = chunk[offset:offset + page_size]
+                base_digest = base_digests[index * PAGE_DIGEST_SIZE:(index + 1) * PAGE_DIGEST_SIZE]
+                if _page_digest(page) != base_digest:
+                    out.write(DIFF_RECORD.pack(page_count + index + 1) + page)
+                    pages_written += 1
+            page_count += (len(chunk) + page_size - 1) // page_size
+
+        header = DIFF_MAGIC + DIFF_HEADER.pack(page_size, page_count)
+        out.seek(0)
+        out.write(header)
+
+    # ページ数確定後のヘッダを含めるため書き出し後に計算（差分ファイルは変更ページ分のみ）
+    return file_sha256(diff_path), page_count, pages_written
+
+def _apply_differential(diff_path: Path, target: Path):
+    """フルバックアップの複製に差分ページを適用"""
+    with open(diff_path, 'rb') as diff, open(target, 'r+b') as out:
+        if diff.read(len(DIFF_MAGIC)) != DIFF_MAGIC:
+            raise ValueError(f"Not a differential backup: {diff_path}")
+        page_size, page_count = DIFF_HEADER.unpack(diff.read(DIFF_HEADER.size))
+        while True:
+            record = diff.read(DIFF_RECORD.size)
+            if not record:
+                break
+            (pgno,) = DIFF_RECORD.unpack(record)
+            page = diff.read(page_size)
+            if len(page) != page_size:
+                raise ValueError(f"Truncated differential backup: {diff_path}")
+            out.seek((pgno - 1) * page_size)
+            out.write(page)
+        out.truncate(page_count * page_size)
+
+class OnlineBackupEngine:
+    """
+    オンラインバックアップエンジン
+
+    step_pages: バックアップAPIの1ステップのページ数
+    step_sleep: ステップ間の待機秒数（I/O帯域の抑制）
+    chunk_pages: チェックサム・差分計算の読み込み単位
+    promote_ratio: 変更ページ率がこれを超える差分はフルバックアップとして保存する
+    """
+
+    def __init__(self, db_path: str, step_pages: int = 1024, step_sleep: float = 0.0,
+                 chunk_pages: int = 256, promote_ratio: float = 0.5):
+        self.db_path = db_path
+        self.step_pages = step_pages
+        self.step_sleep = step_sleep
+        self.chunk_pages = chunk_pages
+        self.promote_ratio = promote_ratio
+
+        self.last_progress = {'remaining': 0, 'total': 0, 'steps': 0}
+
+    def _on_progress(self, status: int, remaining: int, total: int):
+        """バックアップAPIのステップ毎コールバック（バックアップ用スレッドで実行）"""
+        self.last_progress['remaining'] = remaining
+        self.last_progress['total'] = total
+        self.last_progress['steps'] += 1
+        if self.step_sleep > 0:
+            time.sleep(self.step_sleep)
+
+    async def _snapshot(self, target: Path):
+        """一貫したスナップショットをtargetへ書き出す"""
+        tmp_path = target.with_name(target.name + '.tmp')
+        tmp_path.unlink(missing_ok=True)
+        self.last_progress = {'remaining': 0, 'total': 0, 'steps': 0}
+
+        async with get_connection_pool(self.db_path).reader() as source:
+            async with aiosqlite.connect(str(tmp_path)) as dest:
+                # 読み取りトランザクションでスナップショットを固定（他接続の書き込みで再開しない）
+                await source.execute("BEGIN")
+                await source.execute("SELECT COUNT(*) FROM sqlite_master")
+                try:
+                    await source.backup(dest, pages=self.step_pages,
+                                        progress=self._on_progress, sleep=0)
+                finally:
+                    await source.rollback()
+
+        os.replace(tmp_path, target)
+
+    async def create_full_backup(self, target: Path) -> BackupResult:
+        """フルバックアップ作成（.pagemapも作成）"""
+        started = time.perf_counter()
+        await self._snapshot(target)
+        return await self._finish_full_backup(target, started)
+
+    async def _finish_full_backup(self, target: Path, started: float) -> BackupResult:
+        loop = asyncio.get_running_loop()
+        page_size = await loop.run_in_executor(None, _read_page_size, target)
+        checksum, page_count = await loop.run_in_executor(
+            None, _hash_full_backup, target, page_size, self.chunk_pages
+        )
+        return BackupResult(
+            path=target,
+            backup_kind=BackupKind.FULL,
+            checksum=checksum,
+            file_size_bytes=target.stat().st_size,
+            page_size=page_size,
+            page_count=page_count,
+            pages_written=page_count,
+            elapsed_seconds=time.perf_counter() - started
+        )
+
+    async def create_differential_backup(self, target: Path, base_path: Path) -> BackupResult:
+        """
+        差分バックアップ作成
+
+        変更ページ率がpromote_ratioを超えた場合、ベース（またはその.pagemap）がない場合、
+        ページサイズが変わった場合はスナップショットをそのままフルバックアップ
+        （拡張子.db）として保存する。
+        保存先は戻り値のpath・backup_kindで確認すること。
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        snapshot = target.with_name(target.name + '.snapshot')
+        await self._snapshot(snapshot)
+
+        try:
+            if not base_path.exists() or not pagemap_path(base_path).exists():
+                logger.info(f"Differential backup promoted to full (base missing: {base_path})")
+                return await self._promote(snapshot, target, started)
+
+            page_size = await loop.run_in_executor(None, _read_page_size, snapshot)
+            base_page_size = await loop.run_in_executor(None, _read_page_size, base_path)
+            if page_size != base_page_size:
+                logger.info("Differential backup promoted to full (base incompatible)")
+                return await self._promote(snapshot, target, started)
+
+            checksum, page_count, pages_written = await loop.run_in_executor(
+                None, _write_differential, snapshot, pagemap_path(base_path), target,
+                page_size, self.chunk_pages
+            )
+            if page_count and pages_written / page_count > self.promote_ratio:
+                logger.info(f"Differential backup promoted to full "
+                            f"({pages_written}/{page_count} pages changed)")
+                target.unlink(missing_ok=True)
+                return await self._promote(snapshot, target, started)
+
+            return BackupResult(
+                path=target,
+                backup_kind=BackupKind.DIFFERENTIAL,
+                checksum=checksum,
+                file_size_bytes=target.stat().st_size,
+                page_size=page_size,
+                page_count=page_count,
+                pages_written=pages_written,
+                elapsed_seconds=time.perf_counter() - started,
+                base_path=base_path
+            )
+        finally:
+            snapshot.unlink(missing_ok=True)
+
+    async def _promote(self, snapshot: Path, target: Path, started: float) -> BackupResult:
+        """差分用スナップショットをフルバックアップとして保存"""
+        full_path = target.with_suffix('.db')
+        os.replace(snapshot, full_path)
+        return await self._finish_full_backup(full_path, started)
+
+    async def restore(self, backup_path: Path, target: Path, base_path: Optional[Path] = None):
+        """バックアップ復元（差分の場合はbase_pathのフルバックアップに適用）"""
+        loop = asyncio.get_running_loop()
+        tmp_path = target.with_name(target.name + '.restore')
+        if base_path is None:
+            await loop.run_in_executor(None, shutil.copyfile, backup_path, tmp_path)
+        else:
+            await loop.run_in_executor(None, shutil.copyfile, base_path, tmp_path)
+            await loop.run_in_executor(None, _apply_differential, backup_path, tmp_path)
+        os.replace(tmp_path, target)
+
+    @staticmethod
+    async def verify(path: Path, checksum: str) -> bool:
+        """チェックサム検証（チャンク読み込み）"""
+        actual = await asyncio.get_running_loop().run_in_executor(None, file_sha256, path)
+        return actual == checksum
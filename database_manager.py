@@ -9,9 +9,10 @@ kiro設計tasks.md:127-133準拠 - 取引操作のためのデータベースス
 """
 
 import asyncio
+import calendar
 import json
 import logging
-import aiosqlite
+import sqlite3
 import time
 import hashlib
 from datetime import datetime, timedelta
@@ -26,10 +27,76 @@ sys.path.append(str(Path(__file__).parent))
 from realtime_signal_generator import SystemConstants, get_config_value, CONFIG
 from position_management import Position, PositionStatus, PositionType
 from risk_management import RiskAssessment, RiskLevel, RiskAction
+from database_pool import (
+    get_connection_pool, get_ingest_queue, configure_connection_pools, WriteLane,
+    DEFAULT_READERS, DEFAULT_BUSY_TIMEOUT_MS, DEFAULT_INGEST_MAX_BATCH
+)
+from database_backup import OnlineBackupEngine, BackupKind, pagemap_path
+from database_partitions import PartitionManager
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
+# トリガーで行数を管理するテーブル → 統計キー
+COUNTED_TABLES = {
+    'trading_signals': 'total_signals',
+    'trade_executions': 'total_executions',
+    'positions': 'total_positions'
+}
+
+# 月単位パーティションのテーブル → 範囲判定に使う時刻列
+PARTITIONED_TABLES = {
+    'trading_signals': 'timestamp',
+    'system_snapshots': 'timestamp'
+}
+
+# 保持期間経過後も残すシグナル（パーティション削除前にアーカイブへ移す）
+RETAINED_SIGNAL_CONDITION = "signal_status NOT IN ('EXPIRED', 'REJECTED')"
+
+# 取引履歴クエリ（パーティション単位で実行。timestamp_epochの複合インデックスで
+# 範囲検索・降順ソートを解決。{signals}はtrading_signalsのパーティション名）
+TRADING_HISTORY_QUERY = '''
+    SELECT ts.*, te.*, ra.risk_level, ra.risk_score
+    FROM {signals} ts
+    LEFT JOIN trade_executions te ON ts.signal_id = te.signal_id
+    LEFT JOIN risk_assessments ra ON ts.signal_id = ra.signal_id
+    WHERE ts.timestamp_epoch >= ?
+    ORDER BY ts.timestamp_epoch DESC
+'''
+TRADING_HISTORY_BY_SYMBOL_QUERY = '''
+    SELECT ts.*, te.*, ra.risk_level, ra.risk_score
+    FROM {signals} ts
+    LEFT JOIN trade_executions te ON ts.signal_id = te.signal_id
+    LEFT JOIN risk_assessments ra ON ts.signal_id = ra.signal_id
+    WHERE ts.symbol = ? AND ts.timestamp_epoch >= ?
+    ORDER BY ts.timestamp_epoch DESC
+'''
+
+def timestamp_to_epoch(value: datetime) -> int:
+    """
+    datetime → timestamp_epoch列の値
+    
+    timestamp_epochはstrftime('%s', timestamp)で生成される。SQLiteはタイムゾーンなしの
+    ISO文字列をUTCとして扱うため、naiveなdatetimeも同じ規約（壁時計をUTCとみなす）で変換する。
+    """
+    if value.tzinfo is not None:
+        return int(value.timestamp())
+    return calendar.timegm(value.timetuple())
+
+def split_sql_statements(script: str) -> List[str]:
+    """移行スクリプトを文単位に分割（トリガー本体の;では分割しない）"""
+    statements = []
+    buffer = ''
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ''
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
 class MigrationStatus(Enum):
     """データベース移行状態"""
     PENDING = "PENDING"
@@ -99,6 +166,144 @@ class DatabaseMigration:
     rollback_script: Optional[str]
     error_message: Optional[str]
 
+# timestamp_epoch: ISO文字列timestampの整数エポック列。書き込み側がtimestamp_to_epoch()で設定し、
+# 未設定の行（旧形式の書き込み）はトリガーで補完する
+def _epoch_column_script(table: str) -> str:
+    return f'''
+        ALTER TABLE {table} ADD COLUMN timestamp_epoch INTEGER;
+        UPDATE {table} SET timestamp_epoch = CAST(strftime('%s', timestamp) AS INTEGER);
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_epoch
+        AFTER INSERT ON {table}
+        WHEN NEW.timestamp_epoch IS NULL
+        BEGIN
+            UPDATE {table} SET timestamp_epoch = CAST(strftime('%s', NEW.timestamp) AS INTEGER)
+            WHERE rowid = NEW.rowid;
+        END;
+    '''
+
+def _epoch_column_rollback(table: str) -> str:
+    return f'''
+        DROP TRIGGER IF EXISTS trg_{table}_epoch;
+        ALTER TABLE {table} DROP COLUMN timestamp_epoch;
+    '''
+
+def _schema_migrations() -> List[DatabaseMigration]:
+    """スキーマ移行定義（適用順）"""
+    created_at = datetime(2026, 10, 18)
+    return [
+        DatabaseMigration(
+            migration_id="4.2.0_trading_history_indexes",
+            version_from="4.1.0",
+            version_to="4.2.0",
+            description="整数エポック列と取引履歴用の複合・カバリングインデックス",
+            sql_script=_epoch_column_script('trading_signals') + _epoch_column_script('trade_executions') + '''
+                DROP INDEX IF EXISTS idx_trading_signals_timestamp;
+                DROP INDEX IF EXISTS idx_trading_signals_symbol;
+                DROP INDEX IF EXISTS idx_trading_signals_status;
+                DROP INDEX IF EXISTS idx_trade_executions_timestamp;
+                DROP INDEX IF EXISTS idx_trade_executions_status;
+                
+                CREATE INDEX IF NOT EXISTS idx_trading_signals_epoch
+                    ON trading_signals(timestamp_epoch);
+                CREATE INDEX IF NOT EXISTS idx_trading_signals_symbol_epoch
+                    ON trading_signals(symbol, timestamp_epoch);
+                CREATE INDEX IF NOT EXISTS idx_trading_signals_status_epoch
+                    ON trading_signals(signal_status, timestamp_epoch);
+                CREATE INDEX IF NOT EXISTS idx_trade_executions_signal
+                    ON trade_executions(signal_id);
+                CREATE INDEX IF NOT EXISTS idx_trade_executions_status_epoch
+                    ON trade_executions(execution_status, timestamp_epoch, symbol, action,
+                                        executed_quantity, executed_price, commission);
+            ''',
+            created_at=created_at,
+            executed_at=None,
+            status=MigrationStatus.PENDING,
+            execution_time_seconds=None,
+            rollback_script='''
+                DROP INDEX IF EXISTS idx_trading_signals_epoch;
+                DROP INDEX IF EXISTS idx_trading_signals_symbol_epoch;
+                DROP INDEX IF EXISTS idx_trading_signals_status_epoch;
+                DROP INDEX IF EXISTS idx_trade_executions_signal;
+                DROP INDEX IF EXISTS idx_trade_executions_status_epoch;
+            ''' + _epoch_column_rollback('trading_signals') + _epoch_column_rollback('trade_executions') + '''
+                CREATE INDEX IF NOT EXISTS idx_trading_signals_timestamp ON trading_signals(timestamp);
+                CREATE INDEX IF NOT EXISTS idx_trading_signals_symbol ON trading_signals(symbol);
+                CREATE INDEX IF NOT EXISTS idx_trading_signals_status ON trading_signals(signal_status);
+                CREATE INDEX IF NOT EXISTS idx_trade_executions_timestamp ON trade_executions(timestamp);
+                CREATE INDEX IF NOT EXISTS idx_trade_executions_status ON trade_executions(execution_status);
+            ''',
+            error_message=None
+        ),
+        # risk_assessmentsはRiskManagerが別スキーマで先に作成している場合があるため別移行とする
+        DatabaseMigration(
+            migration_id="4.2.1_risk_assessment_indexes",
+            version_from="4.2.0",
+            version_to="4.2.1",
+            description="リスク評価の整数エポック列と取引履歴結合用カバリングインデックス",
+            sql_script=_epoch_column_script('risk_assessments') + '''
+                DROP INDEX IF EXISTS idx_risk_assessments_timestamp;
+                
+                CREATE INDEX IF NOT EXISTS idx_risk_assessments_epoch
+                    ON risk_assessments(timestamp_epoch);
+                CREATE INDEX IF NOT EXISTS idx_risk_assessments_signal_cover
+                    ON risk_assessments(signal_id, risk_level, risk_score);
+            ''',
+            created_at=created_at,
+            executed_at=None,
+            status=MigrationStatus.PENDING,
+            execution_time_seconds=None,
+            rollback_script='''
+                DROP INDEX IF EXISTS idx_risk_assessments_epoch;
+                DROP INDEX IF EXISTS idx_risk_assessments_signal_cover;
+            ''' + _epoch_column_rollback('risk_assessments') + '''
+                CREATE INDEX IF NOT EXISTS idx_risk_assessments_timestamp ON risk_assessments(timestamp);
+            ''',
+            error_message=None
+        ),
+        # backup_scheduleは移行適用後に作成されるため、未作成の場合はここで作成する
+        DatabaseMigration(
+            migration_id="4.3.0_differential_backups",
+            version_from="4.2.1",
+            version_to="4.3.0",
+            description="ページ単位差分バックアップの種別・ベース・ページ数記録",
+            sql_script='''
+                CREATE TABLE IF NOT EXISTS backup_schedule (
+                    backup_id TEXT PRIMARY KEY,
+                    backup_type TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    file_size_bytes INTEGER NOT NULL,
+                    checksum TEXT NOT NULL,
+                    compression_ratio REAL DEFAULT 1.0,
+                    backup_status TEXT NOT NULL,
+                    retention_until TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                );
+                ALTER TABLE backup_schedule ADD COLUMN backup_kind TEXT NOT NULL DEFAULT 'FULL';
+                ALTER TABLE backup_schedule ADD COLUMN base_backup_id TEXT;
+                ALTER TABLE backup_schedule ADD COLUMN page_size INTEGER;
+                ALTER TABLE backup_schedule ADD COLUMN page_count INTEGER;
+                ALTER TABLE backup_schedule ADD COLUMN pages_written INTEGER;
+                
+                CREATE INDEX IF NOT EXISTS idx_backup_schedule_kind_timestamp
+                    ON backup_schedule(backup_kind, timestamp);
+            ''',
+            created_at=created_at,
+            executed_at=None,
+            status=MigrationStatus.PENDING,
+            execution_time_seconds=None,
+            rollback_script='''
+                DROP INDEX IF EXISTS idx_backup_schedule_kind_timestamp;
+                ALTER TABLE backup_schedule DROP COLUMN pages_written;
+                ALTER TABLE backup_schedule DROP COLUMN page_count;
+                ALTER TABLE backup_schedule DROP COLUMN page_size;
+                ALTER TABLE backup_schedule DROP COLUMN base_backup_id;
+                ALTER TABLE backup_schedule DROP COLUMN backup_kind;
+            ''',
+            error_message=None
+        )
+    ]
+
 class DatabaseManager:
     """
     データベース管理システム - kiro設計tasks.md:127-133準拠
@@ -116,19 +321,39 @@ class DatabaseManager:
         self.auto_backup_enabled = True
         self.backup_retention_days = 30
         
-        # 接続プール設定
-        self.max_connections = 10
-        self.connection_timeout = 30
-        self._connection_pool = []
-        self._pool_lock = asyncio.Lock()
+        # 接続プール設定（同じDBファイルを使う全コンポーネントで共有）
+        database_config = self.config.get('database', {})
+        configure_connection_pools(
+            max_readers=database_config.get('pool_readers', DEFAULT_READERS),
+            busy_timeout_ms=database_config.get('busy_timeout_ms', DEFAULT_BUSY_TIMEOUT_MS),
+            ingest_max_batch=database_config.get('ingest_max_batch', DEFAULT_INGEST_MAX_BATCH)
+        )
         
         # 移行管理
+        self.migrations = _schema_migrations()
         self.migrations_applied = set()
         self.migration_lock = asyncio.Lock()
         
-        # バックアップ設定
+        # バックアップ設定（フルバックアップ間隔内は直近のフルに対する差分バックアップ）
         self.backup_dir = Path(self.db_path).parent / "backups"
         self.backup_dir.mkdir(exist_ok=True)
+        self.full_backup_interval = timedelta(
+            hours=database_config.get('full_backup_interval_hours', 24)
+        )
+        self.backup_engine = OnlineBackupEngine(
+            self.db_path,
+            step_pages=database_config.get('backup_step_pages', 1024),
+            step_sleep=database_config.get('backup_step_sleep', 0.0)
+        )
+        
+        # 時系列テーブルの月単位パーティション
+        self.partitions = PartitionManager(PARTITIONED_TABLES)
+        
+        # 行数カウンタ・整合性検証（バックグラウンド実行結果をキャッシュ）
+        self._counted_tables = set()
+        self.integrity_check_interval = database_config.get('integrity_check_interval', 300)
+        self._integrity_task: Optional[asyncio.Task] = None
+        self._last_integrity_report: Optional[Dict[str, Any]] = None
         
         logger.info(f"Database Manager initialized: {self.db_path}")
     
@@ -149,9 +374,21 @@ class DatabaseManager:
             # データ整合性制約追加
             await self._create_integrity_constraints()
             
+            # スキーマ移行適用
+            await self.apply_migrations()
+            
+            # 行数カウンタ初期化
+            await self._initialize_row_counters()
+            
+            # パーティション初期化（行数カウンタ等のトリガーもパーティションへ引き継ぐ）
+            await self._initialize_partitions()
+            
             # バックアップシステム初期化
             await self._initialize_backup_system()
             
+            # 整合性検証ジョブ開始
+            self._integrity_task = asyncio.create_task(self._integrity_check_loop())
+            
             logger.info("Database Manager initialized successfully")
             
         except Exception as e:
@@ -161,7 +398,7 @@ class DatabaseManager:
     async def _create_core_tables(self):
         """既存システム統合のための基本テーブル作成"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 # システム情報テーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS system_info (
@@ -171,9 +408,9 @@ class DatabaseManager:
                     )
                 ''')
                 
-                # バージョン情報設定
+                # バージョン情報設定（以降の更新はスキーマ移行で行う）
                 await conn.execute('''
-                    INSERT OR REPLACE INTO system_info (key, value, updated_at)
+                    INSERT OR IGNORE INTO system_info (key, value, updated_at)
                     VALUES (?, ?, ?)
                 ''', ('schema_version', self.current_schema_version, datetime.now().isoformat()))
                 
@@ -187,7 +424,7 @@ class DatabaseManager:
     async def _initialize_migration_system(self):
         """データベース移行システム初期化"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 # 移行履歴テーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS database_migrations (
@@ -216,7 +453,7 @@ class DatabaseManager:
     async def _create_phase4_tables(self):
         """Phase4拡張テーブル作成 - kiro要件5.1準拠"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 # 取引シグナルテーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS trading_signals (
@@ -318,22 +555,22 @@ class DatabaseManager:
     async def _create_integrity_constraints(self):
         """データ整合性制約と検証ルール作成 - kiro要件5.1準拠"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 # Phase4テーブルのインデックス作成（パフォーマンス向上）
+                # （時刻・状態系の複合インデックスはスキーマ移行4.2.0/4.2.1で作成）
                 indexes = [
-                    "CREATE INDEX IF NOT EXISTS idx_trading_signals_timestamp ON trading_signals(timestamp)",
-                    "CREATE INDEX IF NOT EXISTS idx_trading_signals_symbol ON trading_signals(symbol)",
-                    "CREATE INDEX IF NOT EXISTS idx_trading_signals_status ON trading_signals(signal_status)",
-                    "CREATE INDEX IF NOT EXISTS idx_trade_executions_timestamp ON trade_executions(timestamp)",
-                    "CREATE INDEX IF NOT EXISTS idx_trade_executions_symbol ON trade_executions(symbol)",
-                    "CREATE INDEX IF NOT EXISTS idx_trade_executions_status ON trade_executions(execution_status)",
-                    "CREATE INDEX IF NOT EXISTS idx_risk_assessments_timestamp ON risk_assessments(timestamp)",
-                    "CREATE INDEX IF NOT EXISTS idx_risk_assessments_level ON risk_assessments(risk_level)",
-                    "CREATE INDEX IF NOT EXISTS idx_system_snapshots_timestamp ON system_snapshots(timestamp)"
+                    ('trade_executions', "CREATE INDEX IF NOT EXISTS idx_trade_executions_symbol ON trade_executions(symbol)"),
+                    ('risk_assessments', "CREATE INDEX IF NOT EXISTS idx_risk_assessments_level ON risk_assessments(risk_level)"),
+                    ('system_snapshots', "CREATE INDEX IF NOT EXISTS idx_system_snapshots_timestamp ON system_snapshots(timestamp)")
                 ]
                 
-                for index_sql in indexes:
-                    await conn.execute(index_sql)
+                # パーティション化済み（ビュー）のテーブルは各パーティションが変換時のインデックスを持つ
+                cursor = await conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")
+                views = {row[0] for row in await cursor.fetchall()}
+                
+                for table, index_sql in indexes:
+                    if table not in views:
+                        await conn.execute(index_sql)
                 
                 await conn.commit()
                 logger.info("Database integrity constraints created")
@@ -341,11 +578,172 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Integrity constraints creation error: {e}")
     
+    async def apply_migrations(self) -> bool:
+        """未適用のスキーマ移行を順に適用（失敗した移行以降は次回起動時に再試行）"""
+        for migration in self.migrations:
+            if not await self.apply_migration(migration):
+                return False
+        return True
+    
+    async def apply_migration(self, migration: DatabaseMigration) -> bool:
+        """
+        スキーマ移行適用
+        
+        移行スクリプト・履歴記録・schema_version更新を1トランザクションで実行する。
+        失敗時はロールバックしてFAILEDを記録する。
+        """
+        async with self.migration_lock:
+            if migration.migration_id in self.migrations_applied:
+                return True
+            
+            checksum = hashlib.sha256(migration.sql_script.encode('utf-8')).hexdigest()
+            
+            async with get_connection_pool(self.db_path).writer() as conn:
+                cursor = await conn.execute(
+                    "SELECT status FROM database_migrations WHERE migration_id = ?",
+                    (migration.migration_id,)
+                )
+                row = await cursor.fetchone()
+                if row and row[0] == MigrationStatus.COMPLETED.value:
+                    migration.status = MigrationStatus.COMPLETED
+                    self.migrations_applied.add(migration.migration_id)
+                    self.current_schema_version = migration.version_to
+                    return True
+                
+                migration.status = MigrationStatus.IN_PROGRESS
+                started = time.perf_counter()
+                try:
+                    await conn.execute("BEGIN IMMEDIATE")
+                    for statement in split_sql_statements(migration.sql_script):
+                        await conn.execute(statement)
+                    
+                    migration.executed_at = datetime.now()
+                    migration.execution_time_seconds = time.perf_counter() - started
+                    migration.status = MigrationStatus.COMPLETED
+                    migration.error_message = None
+                    await self._record_migration(conn, migration, checksum)
+                    await conn.execute('''
+                        INSERT OR REPLACE INTO system_info (key, value, updated_at)
+                        VALUES (?, ?, ?)
+                    ''', ('schema_version', migration.version_to, datetime.now().isoformat()))
+                    await conn.commit()
+                    
+                except Exception as e:
+                    await conn.rollback()
+                    migration.status = MigrationStatus.FAILED
+                    migration.error_message = str(e)
+                    migration.execution_time_seconds = time.perf_counter() - started
+                    await self._record_migration(conn, migration, checksum)
+                    await conn.commit()
+                    logger.error(f"Schema migration failed: {migration.migration_id}: {e}")
+                    return False
+            
+            self.migrations_applied.add(migration.migration_id)
+            self.current_schema_version = migration.version_to
+            logger.info(f"Schema migration applied: {migration.migration_id} "
+                        f"({migration.version_from} -> {migration.version_to}, "
+                        f"{migration.execution_time_seconds:.3f}s)")
+            return True
+    
+    async def _record_migration(self, conn, migration: DatabaseMigration, checksum: str):
+        """移行履歴記録"""
+        await conn.execute('''
+            INSERT OR REPLACE INTO database_migrations (
+                migration_id, version_from, version_to, description, sql_script,
+                created_at, executed_at, status, execution_time_seconds,
+                rollback_script, error_message, checksum
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            migration.migration_id, migration.version_from, migration.version_to,
+            migration.description, migration.sql_script, migration.created_at.isoformat(),
+            migration.executed_at.isoformat() if migration.executed_at else None,
+            migration.status.value, migration.execution_time_seconds,
+            migration.rollback_script, migration.error_message, checksum
+        ))
+    
+    async def _initialize_row_counters(self):
+        """
+        行数カウンタ初期化
+        
+        INSERT/DELETEトリガーでtable_row_countsを更新し、統計取得時のCOUNT(*)を不要にする。
+        初期値の集計とトリガー作成は書き込み接続上の1トランザクションで行うため、
+        その間の書き込みが数え漏れることはない。未作成のテーブル（positionsは
+        PositionTrackerが作成）は整合性検証ジョブの実行時に再試行する。
+        """
+        try:
+            async with get_connection_pool(self.db_path).writer() as conn:
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS table_row_counts (
+                        table_name TEXT PRIMARY KEY,
+                        row_count INTEGER NOT NULL
+                    )
+                ''')
+                
+                for table in COUNTED_TABLES:
+                    if table in self._counted_tables:
+                        continue
+                    cursor = await conn.execute(
+                        "SELECT type FROM sqlite_master WHERE name = ?", (table,)
+                    )
+                    row = await cursor.fetchone()
+                    if row is None:
+                        continue
+                    if row[0] == 'view':
+                        # パーティション化済み: 変換時に引き継いだ各パーティションのトリガーで管理
+                        self._counted_tables.add(table)
+                        continue
+                    
+                    await conn.execute('''
+                        INSERT OR REPLACE INTO table_row_counts (table_name, row_count)
+                        SELECT ?, COUNT(*) FROM {table}
+                    '''.format(table=table), (table,))
+                    await conn.execute('''
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert
+                        AFTER INSERT ON {table}
+                        BEGIN
+                            UPDATE table_row_counts SET row_count = row_count + 1
+                            WHERE table_name = '{table}';
+                        END
+                    '''.format(table=table))
+                    await conn.execute('''
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete
+                        AFTER DELETE ON {table}
+                        BEGIN
+                            UPDATE table_row_counts SET row_count = row_count - 1
+                            WHERE table_name = '{table}';
+                        END
+                    '''.format(table=table))
+                    self._counted_tables.add(table)
+                
+                await conn.commit()
+                
+        except Exception as e:
+            logger.error(f"Row counters initialization error: {e}")
+    
+    async def _initialize_partitions(self):
+        """
+        パーティション初期化
+        
+        未変換のテーブルを月別パーティションへ変換し、当月・翌月のパーティションを作成する。
+        変換は1トランザクションで行い、失敗時は元のテーブルのまま残る。
+        """
+        async with get_connection_pool(self.db_path).writer() as conn:
+            await conn.execute("BEGIN IMMEDIATE")
+            await self.partitions.initialize(conn, timestamp_to_epoch(datetime.now()))
+            await conn.commit()
+    
+    async def _ensure_partitions(self):
+        """当月・翌月のパーティション作成（月替わりに備えて定期実行）"""
+        async with get_connection_pool(self.db_path).writer() as conn:
+            await conn.execute("BEGIN IMMEDIATE")
+            await self.partitions.ensure_partitions(conn, timestamp_to_epoch(datetime.now()))
+            await conn.commit()
+    
     async def _initialize_backup_system(self):
         """バックアップシステム初期化 - kiro要件5.4準拠"""
         try:
             # バックアップスケジュールテーブル
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS backup_schedule (
                         backup_id TEXT PRIMARY KEY,
@@ -373,27 +771,26 @@ class DatabaseManager:
     async def save_trading_signal(self, signal: TradingSignalRecord) -> bool:
         """取引シグナル保存"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO trading_signals (
-                        signal_id, timestamp, symbol, action, quantity, price,
-                        stop_loss, take_profit, quality_score, confidence_level,
-                        strategy_params, source_system, processing_time_ms,
-                        market_conditions, signal_status, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    signal.signal_id, signal.timestamp.isoformat(), signal.symbol,
-                    signal.action, signal.quantity, signal.price, signal.stop_loss,
-                    signal.take_profit, signal.quality_score, signal.confidence_level,
-                    json.dumps(signal.strategy_params), signal.source_system,
-                    signal.processing_time_ms, json.dumps(signal.market_conditions),
-                    signal.signal_status, datetime.now().isoformat()
-                ))
-                await conn.commit()
-                
-                logger.debug(f"Trading signal saved: {signal.signal_id}")
-                return True
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO trading_signals (
+                    signal_id, timestamp, symbol, action, quantity, price,
+                    stop_loss, take_profit, quality_score, confidence_level,
+                    strategy_params, source_system, processing_time_ms,
+                    market_conditions, signal_status, updated_at, timestamp_epoch
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                signal.signal_id, signal.timestamp.isoformat(), signal.symbol,
+                signal.action, signal.quantity, signal.price, signal.stop_loss,
+                signal.take_profit, signal.quality_score, signal.confidence_level,
+                json.dumps(signal.strategy_params), signal.source_system,
+                signal.processing_time_ms, json.dumps(signal.market_conditions),
+                signal.signal_status, datetime.now().isoformat(),
+                timestamp_to_epoch(signal.timestamp)
+            ), lane=WriteLane.NORMAL)
+            
+            logger.debug(f"Trading signal saved: {signal.signal_id}")
+            return True
+            
         except Exception as e:
             logger.error(f"Trading signal save error: {e}")
             return False
@@ -401,30 +798,28 @@ class DatabaseManager:
     async def save_trade_execution(self, execution: TradeExecutionRecord) -> bool:
         """取引実行記録保存"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO trade_executions (
-                        execution_id, signal_id, position_id, timestamp, symbol,
-                        action, requested_quantity, executed_quantity, requested_price,
-                        executed_price, execution_time_ms, slippage, commission,
-                        execution_status, failure_reason, mt4_ticket, risk_assessment_id,
-                        updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    execution.execution_id, execution.signal_id, execution.position_id,
-                    execution.timestamp.isoformat(), execution.symbol, execution.action,
-                    execution.requested_quantity, execution.executed_quantity,
-                    execution.requested_price, execution.executed_price,
-                    execution.execution_time_ms, execution.slippage, execution.commission,
-                    execution.execution_status, execution.failure_reason,
-                    execution.mt4_ticket, execution.risk_assessment_id,
-                    datetime.now().isoformat()
-                ))
-                await conn.commit()
-                
-                logger.debug(f"Trade execution saved: {execution.execution_id}")
-                return True
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO trade_executions (
+                    execution_id, signal_id, position_id, timestamp, symbol,
+                    action, requested_quantity, executed_quantity, requested_price,
+                    executed_price, execution_time_ms, slippage, commission,
+                    execution_status, failure_reason, mt4_ticket, risk_assessment_id,
+                    updated_at, timestamp_epoch
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                execution.execution_id, execution.signal_id, execution.position_id,
+                execution.timestamp.isoformat(), execution.symbol, execution.action,
+                execution.requested_quantity, execution.executed_quantity,
+                execution.requested_price, execution.executed_price,
+                execution.execution_time_ms, execution.slippage, execution.commission,
+                execution.execution_status, execution.failure_reason,
+                execution.mt4_ticket, execution.risk_assessment_id,
+                datetime.now().isoformat(), timestamp_to_epoch(execution.timestamp)
+            ), lane=WriteLane.CRITICAL)
+            
+            logger.debug(f"Trade execution saved: {execution.execution_id}")
+            return True
+            
         except Exception as e:
             logger.error(f"Trade execution save error: {e}")
             return False
@@ -434,67 +829,71 @@ class DatabaseManager:
         try:
             assessment_id = f"risk_{int(time.time() * 1000)}"
             
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO risk_assessments (
-                        assessment_id, signal_id, timestamp, risk_level, risk_action,
-                        risk_score, account_balance, daily_pnl, current_drawdown,
-                        volatility_score, exposure_ratio, reasons, recommendations,
-                        assessment_time_ms
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    assessment_id, signal_id, datetime.now().isoformat(),
-                    assessment.risk_level.value, assessment.risk_action.value,
-                    assessment.risk_score, assessment.account_balance,
-                    assessment.daily_pnl, assessment.current_drawdown,
-                    assessment.volatility_score, assessment.exposure_ratio,
-                    json.dumps(assessment.reasons), json.dumps(assessment.recommendations),
-                    assessment.assessment_time_ms
-                ))
-                await conn.commit()
-                
-                logger.debug(f"Risk assessment saved: {assessment_id}")
-                return True
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO risk_assessments (
+                    assessment_id, signal_id, timestamp, risk_level, risk_action,
+                    risk_score, account_balance, daily_pnl, current_drawdown,
+                    volatility_score, exposure_ratio, reasons, recommendations,
+                    assessment_time_ms
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                assessment_id, signal_id, datetime.now().isoformat(),
+                assessment.risk_level.value, assessment.risk_action.value,
+                assessment.risk_score, assessment.account_balance,
+                assessment.daily_pnl, assessment.current_drawdown,
+                assessment.volatility_score, assessment.exposure_ratio,
+                json.dumps(assessment.reasons), json.dumps(assessment.recommendations),
+                assessment.assessment_time_ms
+            ), lane=WriteLane.NORMAL)
+            
+            logger.debug(f"Risk assessment saved: {assessment_id}")
+            return True
+            
         except Exception as e:
             logger.error(f"Risk assessment save error: {e}")
             return False
     
     async def get_trading_history(self, symbol: str = None, days: int = 30) -> List[Dict[str, Any]]:
-        """取引履歴取得 - kiro要件5.1準拠"""
+        """
+        取引履歴取得 - kiro要件5.1準拠
+        
+        対象期間のパーティションを新しい順に検索する。月別パーティションの期間は重ならないが、
+        アーカイブ（受け皿）は任意の時刻の行を持ちうるため、連結後にtimestamp_epochの降順へ
+        並べ替える（ほぼ整列済みのため線形時間）。
+        """
         try:
-            since_date = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            async with aiosqlite.connect(self.db_path) as conn:
-                if symbol:
-                    cursor = await conn.execute('''
-                        SELECT ts.*, te.*, ra.risk_level, ra.risk_score
-                        FROM trading_signals ts
-                        LEFT JOIN trade_executions te ON ts.signal_id = te.signal_id
-                        LEFT JOIN risk_assessments ra ON ts.signal_id = ra.signal_id
-                        WHERE ts.symbol = ? AND ts.timestamp >= ?
-                        ORDER BY ts.timestamp DESC
-                    ''', (symbol, since_date))
-                else:
-                    cursor = await conn.execute('''
-                        SELECT ts.*, te.*, ra.risk_level, ra.risk_score
-                        FROM trading_signals ts
-                        LEFT JOIN trade_executions te ON ts.signal_id = te.signal_id
-                        LEFT JOIN risk_assessments ra ON ts.signal_id = ra.signal_id
-                        WHERE ts.timestamp >= ?
-                        ORDER BY ts.timestamp DESC
-                    ''', (since_date,))
-                
-                rows = await cursor.fetchall()
+            since_epoch = timestamp_to_epoch(datetime.now() - timedelta(days=days))
+            
+            async with get_connection_pool(self.db_path).reader() as conn:
+                partitions = await self.partitions.partitions_for_range(
+                    conn, 'trading_signals', since_epoch
+                )
                 
-                # 列名取得
-                columns = [description[0] for description in cursor.description]
+                rows = []
+                columns = None
+                for partition in partitions:
+                    if symbol:
+                        cursor = await conn.execute(
+                            TRADING_HISTORY_BY_SYMBOL_QUERY.format(signals=partition), (symbol, since_epoch)
+                        )
+                    else:
+                        cursor = await conn.execute(
+                            TRADING_HISTORY_QUERY.format(signals=partition), (since_epoch,)
+                        )
+                    
+                    rows.extend(await cursor.fetchall())
+                    
+                    # 列名取得
+                    columns = [description[0] for description in cursor.description]
                 
-                # 辞書形式に変換
                 history = []
-                for row in rows:
-                    record = dict(zip(columns, row))
-                    history.append(record)
+                if columns:
+                    # 最初のtimestamp_epochはシグナル側（ts.*）の列
+                    epoch_index = columns.index('timestamp_epoch')
+                    rows.sort(key=lambda row: row[epoch_index] or 0, reverse=True)
+                    
+                    # 辞書形式に変換
+                    history = [dict(zip(columns, row)) for row in rows]
                 
                 logger.info(f"Retrieved {len(history)} trading history records")
                 return history
@@ -504,45 +903,105 @@ class DatabaseManager:
             return []
     
     async def _create_backup(self, backup_type: str) -> bool:
-        """データベースバックアップ作成 - kiro要件5.4準拠"""
+        """
+        データベースバックアップ作成 - kiro要件5.4準拠
+        
+        書き込みを止めないオンラインバックアップ。フルバックアップ間隔内は
+        直近のフルバックアップに対する差分（変更ページのみ）を保存する。
+        """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"trading_system_{backup_type}_{timestamp}.db"
-            backup_path = self.backup_dir / backup_filename
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S_%f")
+            base = await self._get_differential_base(now)
             
-            # バックアップ作成
-            async with aiosqlite.connect(self.db_path) as source:
-                async with aiosqlite.connect(str(backup_path)) as backup:
-                    await source.backup(backup)
-            
-            # チェックサム計算
-            file_size = backup_path.stat().st_size
-            with open(backup_path, 'rb') as f:
-                checksum = hashlib.sha256(f.read()).hexdigest()
+            if base is None:
+                backup_path = self.backup_dir / f"trading_system_{backup_type}_{timestamp}.db"
+                result = await self.backup_engine.create_full_backup(backup_path)
+            else:
+                base_backup_id, base_path = base
+                backup_path = self.backup_dir / f"trading_system_{backup_type}_{timestamp}.dbdiff"
+                result = await self.backup_engine.create_differential_backup(backup_path, base_path)
             
             # バックアップ記録保存
             backup_id = f"backup_{timestamp}"
-            retention_date = (datetime.now() + timedelta(days=self.backup_retention_days)).isoformat()
+            retention_date = (now + timedelta(days=self.backup_retention_days)).isoformat()
             
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO backup_schedule (
-                        backup_id, backup_type, timestamp, file_path, file_size_bytes,
-                        checksum, backup_status, retention_until
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    backup_id, backup_type, datetime.now().isoformat(),
-                    str(backup_path), file_size, checksum, "COMPLETED", retention_date
-                ))
-                await conn.commit()
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO backup_schedule (
+                    backup_id, backup_type, timestamp, file_path, file_size_bytes,
+                    checksum, compression_ratio, backup_status, retention_until,
+                    backup_kind, base_backup_id, page_size, page_count, pages_written
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                backup_id, backup_type, now.isoformat(),
+                str(result.path), result.file_size_bytes, result.checksum,
+                result.size_ratio, "COMPLETED", retention_date,
+                result.backup_kind,
+                base_backup_id if result.backup_kind == BackupKind.DIFFERENTIAL else None,
+                result.page_size, result.page_count, result.pages_written
+            ), lane=WriteLane.NORMAL)
             
-            logger.info(f"Database backup created: {backup_filename}")
+            logger.info(f"Database backup created: {result.path.name} "
+                        f"({result.backup_kind}, {result.pages_written}/{result.page_count} pages, "
+                        f"{result.elapsed_seconds:.2f}s)")
             return True
             
         except Exception as e:
             logger.error(f"Database backup creation error: {e}")
             return False
     
+    async def _get_differential_base(self, now: datetime) -> Optional[Tuple[str, Path]]:
+        """差分バックアップのベース（フルバックアップ間隔内の直近のフル）取得"""
+        async with get_connection_pool(self.db_path).reader() as conn:
+            cursor = await conn.execute('''
+                SELECT backup_id, file_path FROM backup_schedule
+                WHERE backup_kind = ? AND backup_status = 'COMPLETED' AND timestamp >= ?
+                ORDER BY timestamp DESC LIMIT 1
+            ''', (BackupKind.FULL, (now - self.full_backup_interval).isoformat()))
+            row = await cursor.fetchone()
+        
+        if row is None:
+            return None
+        base_path = Path(row[1])
+        if not base_path.exists() or not pagemap_path(base_path).exists():
+            return None
+        return row[0], base_path
+    
+    async def restore_backup(self, backup_id: str, target_path: str) -> bool:
+        """バックアップ復元（チェックサム検証後、差分はベースのフルバックアップに適用）"""
+        try:
+            async with get_connection_pool(self.db_path).reader() as conn:
+                cursor = await conn.execute('''
+                    SELECT b.file_path, b.checksum, base.file_path, base.checksum
+                    FROM backup_schedule b
+                    LEFT JOIN backup_schedule base ON b.base_backup_id = base.backup_id
+                    WHERE b.backup_id = ?
+                ''', (backup_id,))
+                row = await cursor.fetchone()
+            
+            if row is None:
+                logger.error(f"Backup not found: {backup_id}")
+                return False
+            
+            file_path, checksum, base_file_path, base_checksum = row
+            if not await self.backup_engine.verify(Path(file_path), checksum):
+                logger.error(f"Backup checksum mismatch: {file_path}")
+                return False
+            if base_file_path and not await self.backup_engine.verify(Path(base_file_path), base_checksum):
+                logger.error(f"Base backup checksum mismatch: {base_file_path}")
+                return False
+            
+            await self.backup_engine.restore(
+                Path(file_path), Path(target_path),
+                Path(base_file_path) if base_file_path else None
+            )
+            logger.info(f"Database backup restored: {backup_id} -> {target_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Database backup restore error: {e}")
+            return False
+    
     async def verify_data_integrity(self) -> Dict[str, Any]:
         """データ整合性検証 - kiro要件5.1準拠"""
         try:
@@ -554,7 +1013,7 @@ class DatabaseManager:
                 'recommendations': []
             }
             
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).reader() as conn:
                 # 1. 外部キー整合性チェック
                 cursor = await conn.execute('''
                     SELECT COUNT(*) as orphaned_executions
@@ -585,8 +1044,8 @@ class DatabaseManager:
                 cursor = await conn.execute('''
                     SELECT COUNT(*) as future_timestamps
                     FROM trading_signals
-                    WHERE datetime(timestamp) > datetime('now')
-                ''')
+                    WHERE timestamp_epoch > ?
+                ''', (timestamp_to_epoch(datetime.now()),))
                 future_timestamps = (await cursor.fetchone())[0]
                 
                 integrity_report['checks_performed'].append('timestamp_validity')
@@ -601,54 +1060,97 @@ class DatabaseManager:
                     integrity_report['overall_status'] = 'NEEDS_ATTENTION'
             
             logger.info(f"Data integrity check completed: {integrity_report['overall_status']}")
+            self._last_integrity_report = integrity_report
             return integrity_report
             
         except Exception as e:
             logger.error(f"Data integrity verification error: {e}")
-            return {'overall_status': 'ERROR', 'error': str(e)}
+            integrity_report = {
+                'timestamp': datetime.now().isoformat(),
+                'overall_status': 'ERROR',
+                'error': str(e)
+            }
+            self._last_integrity_report = integrity_report
+            return integrity_report
+    
+    async def _integrity_check_loop(self):
+        """整合性検証の定期実行（結果はget_system_statisticsで返す）"""
+        while True:
+            try:
+                if len(self._counted_tables) < len(COUNTED_TABLES):
+                    await self._initialize_row_counters()
+                await self._ensure_partitions()
+                await self.verify_data_integrity()
+                await asyncio.sleep(self.integrity_check_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Integrity check loop error: {e}")
+                await asyncio.sleep(self.integrity_check_interval)
     
     async def cleanup_old_data(self, retention_days: int = 180) -> Dict[str, int]:
-        """古いデータクリーンアップ - kiro要件5.1準拠"""
+        """
+        古いデータクリーンアップ - kiro要件5.1準拠
+        
+        シグナル・スナップショットは期間全体が保持期間を過ぎた月のパーティションを削除する
+        （行単位のDELETEは行わない）。EXPIRED/REJECTED以外のシグナルはアーカイブへ移して残す。
+        """
         try:
-            cutoff_date = (datetime.now() - timedelta(days=retention_days)).isoformat()
+            cutoff_epoch = timestamp_to_epoch(datetime.now() - timedelta(days=retention_days))
             cleanup_results = {}
             
-            async with aiosqlite.connect(self.db_path) as conn:
-                # 古いシグナル削除
-                cursor = await conn.execute('''
-                    DELETE FROM trading_signals
-                    WHERE timestamp < ? AND signal_status IN ('EXPIRED', 'REJECTED')
-                ''', (cutoff_date,))
-                cleanup_results['signals_deleted'] = cursor.rowcount
+            async with get_connection_pool(self.db_path).writer() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
                 
-                # 古いスナップショット削除（最新30日分は保持）
-                snapshot_cutoff = (datetime.now() - timedelta(days=30)).isoformat()
-                cursor = await conn.execute('''
-                    DELETE FROM system_snapshots
-                    WHERE timestamp < ?
-                ''', (snapshot_cutoff,))
-                cleanup_results['snapshots_deleted'] = cursor.rowcount
+                # 古いシグナルのパーティション削除
+                dropped = await self.partitions.drop_partitions_before(
+                    conn, 'trading_signals', cutoff_epoch, keep_condition=RETAINED_SIGNAL_CONDITION
+                )
+                cleanup_results['signals_deleted'] = dropped['rows_removed'] + dropped['rows_purged']
+                cleanup_results['signal_partitions_dropped'] = dropped['partitions_dropped']
+                if dropped['partitions_dropped']:
+                    # DROP TABLEでは行数カウンタのトリガーが発火しないため削除したパーティションの
+                    # 全行を減算する（アーカイブへの移送分はINSERTトリガーで加算済み）
+                    await conn.execute('''
+                        UPDATE table_row_counts SET row_count = row_count - ?
+                        WHERE table_name = 'trading_signals'
+                    ''', (dropped['rows_removed'] + dropped['rows_archived'],))
                 
-                # 古いバックアップファイル削除
-                cursor = await conn.execute('''
-                    SELECT file_path FROM backup_schedule
-                    WHERE retention_until < ?
-                ''', (datetime.now().isoformat(),))
+                # 古いスナップショットのパーティション削除（最新30日分は保持）
+                snapshot_cutoff = timestamp_to_epoch(datetime.now() - timedelta(days=30))
+                dropped = await self.partitions.drop_partitions_before(
+                    conn, 'system_snapshots', snapshot_cutoff
+                )
+                cleanup_results['snapshots_deleted'] = dropped['rows_removed'] + dropped['rows_purged']
+                
+                # 古いバックアップファイル削除（保持中の差分が参照するフルバックアップは残す）
+                now_iso = datetime.now().isoformat()
+                expired_condition = '''
+                    retention_until < ? AND backup_id NOT IN (
+                        SELECT base_backup_id FROM backup_schedule
+                        WHERE base_backup_id IS NOT NULL AND retention_until >= ?
+                    )
+                '''
+                cursor = await conn.execute(
+                    f"SELECT file_path FROM backup_schedule WHERE {expired_condition}",
+                    (now_iso, now_iso)
+                )
                 
                 old_backups = await cursor.fetchall()
                 deleted_backups = 0
                 for (file_path,) in old_backups:
                     try:
                         Path(file_path).unlink(missing_ok=True)
+                        pagemap_path(Path(file_path)).unlink(missing_ok=True)
                         deleted_backups += 1
                     except Exception:
                         pass
                 
                 # バックアップ記録削除
-                cursor = await conn.execute('''
-                    DELETE FROM backup_schedule
-                    WHERE retention_until < ?
-                ''', (datetime.now().isoformat(),))
+                cursor = await conn.execute(
+                    f"DELETE FROM backup_schedule WHERE {expired_condition}",
+                    (now_iso, now_iso)
+                )
                 
                 cleanup_results['backups_deleted'] = deleted_backups
                 
@@ -662,7 +1164,12 @@ class DatabaseManager:
             return {}
     
     async def get_system_statistics(self) -> Dict[str, Any]:
-        """システム統計情報取得"""
+        """
+        システム統計情報取得
+        
+        行数はトリガー管理のカウンタ、整合性は直近の検証結果（バックグラウンド実行）を
+        返すため、テーブルサイズに関係なく一定コストで取得できる。
+        """
         try:
             stats = {
                 'timestamp': datetime.now().isoformat(),
@@ -670,34 +1177,33 @@ class DatabaseManager:
                 'total_signals': 0,
                 'total_executions': 0,
                 'total_positions': 0,
-                'data_integrity_score': 0.0
+                'data_integrity_score': 0.0,
+                'data_integrity_status': 'PENDING',
+                'integrity_checked_at': None
             }
             
             # データベースサイズ
             db_size = Path(self.db_path).stat().st_size / (1024 * 1024)
             stats['database_size_mb'] = round(db_size, 2)
             
-            async with aiosqlite.connect(self.db_path) as conn:
-                # シグナル数
-                cursor = await conn.execute('SELECT COUNT(*) FROM trading_signals')
-                stats['total_signals'] = (await cursor.fetchone())[0]
-                
-                # 実行数
-                cursor = await conn.execute('SELECT COUNT(*) FROM trade_executions')
-                stats['total_executions'] = (await cursor.fetchone())[0]
-                
-                # ポジション数
-                cursor = await conn.execute('SELECT COUNT(*) FROM positions')
-                stats['total_positions'] = (await cursor.fetchone())[0]
-            
-            # データ整合性スコア
-            integrity_result = await self.verify_data_integrity()
-            if integrity_result['overall_status'] == 'HEALTHY':
-                stats['data_integrity_score'] = 1.0
-            elif integrity_result['overall_status'] == 'DEGRADED':
-                stats['data_integrity_score'] = 0.7
-            else:
-                stats['data_integrity_score'] = 0.3
+            # シグナル数・実行数・ポジション数
+            async with get_connection_pool(self.db_path).reader() as conn:
+                cursor = await conn.execute('SELECT table_name, row_count FROM table_row_counts')
+                for table, row_count in await cursor.fetchall():
+                    if table in COUNTED_TABLES:
+                        stats[COUNTED_TABLES[table]] = row_count
+            
+            # データ整合性スコア（直近の検証結果）
+            integrity_result = self._last_integrity_report
+            if integrity_result is not None:
+                stats['data_integrity_status'] = integrity_result['overall_status']
+                stats['integrity_checked_at'] = integrity_result['timestamp']
+                if integrity_result['overall_status'] == 'HEALTHY':
+                    stats['data_integrity_score'] = 1.0
+                elif integrity_result['overall_status'] == 'DEGRADED':
+                    stats['data_integrity_score'] = 0.7
+                else:
+                    stats['data_integrity_score'] = 0.3
             
             return stats
             
@@ -710,12 +1216,23 @@ class DatabaseManager:
         logger.info("Stopping Database Manager...")
         
         try:
+            # 整合性検証ジョブ停止
+            if self._integrity_task:
+                self._integrity_task.cancel()
+                try:
+                    await self._integrity_task
+                except asyncio.CancelledError:
+                    pass
+            
             # 最終バックアップ作成
             await self._create_backup("shutdown")
             
             # データクリーンアップ
             await self.cleanup_old_data()
             
+            # 接続プールクローズ（書き込みキューの残りを書き込んでから）
+            await get_connection_pool(self.db_path).close()
+            
             logger.info("Database Manager stopped successfully")
             
         except Exception as e:
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Phase 4.1: Time-Partitioned Tables
+月単位のシャードテーブルによる時系列テーブルのパーティション管理
+
+- 対象テーブルは `<table>_pYYYYMM` の月別テーブルに分割し、元の名前は全パーティションの
+  UNION ALLビューとする。ビューへのINSERTはINSTEAD OFトリガーで該当月のパーティションへ
+  振り分けるため、既存の書き込み側（INSERT / INSERT OR REPLACE）は変更不要
+- パーティションのDDL（テーブル・インデックス・トリガー）は変換時の元テーブル定義を
+  テンプレートとして保存し、名前を置き換えて作成する
+- どの月のパーティションにも該当しない行（変換前の月・事前作成より先の月・時刻なし）は
+  `<table>_archive`（範囲を限定しない受け皿のパーティション）へ振り分ける
+- 保持期間の処理はパーティション単位のDROP TABLE。削除コストは削除する月の大きさだけで
+  決まり、テーブル全体の大きさには依存しない。保持条件に該当する行は削除前に
+  `<table>_archive` へ移す。`<table>_archive` の期間外の行のうち保持条件に該当しないものは
+  行単位で削除する
+- `<table>_archive` は他のパーティションと期間が重なりうるため、期間順の結果が必要な
+  呼び出し側は連結後に並べ替える
+- 主キーの一意性はパーティションのテーブルごとにしか保証されないため、振り分けトリガーは
+  いずれかのパーティション（アーカイブを含む）に同じ主キーの行があればRAISE(ABORT)する
+- 範囲検索は partitions_for_range() で対象パーティションを新しい順に取得し、
+  パーティションごとにインデックスを使ったクエリを実行する
+- メソッドは呼び出し側の書き込み接続・トランザクション内で実行する
+"""
+
+import calendar
+import json
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+# ログ設定
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = 'archive'
+# 受け皿パーティションの範囲終端（範囲検索で常に対象になる）
+ARCHIVE_RANGE_END = 253402300800  # 10000-01-01
+DEFAULT_PREMAKE_MONTHS = 1
+
+REGISTRY_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS partitioned_tables (
+        table_name TEXT PRIMARY KEY,
+        time_column TEXT NOT NULL,
+        table_sql TEXT NOT NULL,
+        index_sql TEXT NOT NULL,
+        trigger_sql TEXT NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS table_partitions (
+        partition_name TEXT PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        range_start INTEGER NOT NULL,
+        range_end INTEGER NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_table_partitions_range
+        ON table_partitions(table_name, range_start)
+    '''
+)
+
+# 対象パーティションの取得（新しい順）
+PARTITIONS_FOR_RANGE_QUERY = '''
+    SELECT partition_name FROM table_partitions
+    WHERE table_name = ? AND range_end > ?
+    ORDER BY range_start DESC
+'''
+
+def month_start_epoch(year: int, month: int) -> int:
+    """月初のエポック秒（timestamp_epochと同じく壁時計をUTCとみなす）"""
+    return calendar.timegm((year, month, 1, 0, 0, 0))
+
+def month_range(epoch: int) -> Tuple[int, int]:
+    """エポック秒を含む月の [開始, 終了)"""
+    moment = time.gmtime(epoch)
+    start = month_start_epoch(moment.tm_year, moment.tm_mon)
+    if moment.tm_mon == 12:
+        return start, month_start_epoch(moment.tm_year + 1, 1)
+    return start, month_start_epoch(moment.tm_year, moment.tm_mon + 1)
+
+def partition_suffix(range_start: int) -> str:
+    return 'p' + time.strftime('%Y%m', time.gmtime(range_start))
+
+def _epoch_expr(column: str) -> str:
+    return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+class PartitionManager:
+    """
+    月単位パーティション管理
+
+    tables: 対象テーブル名 → 範囲判定に使う時刻列（ISO文字列）
+    premake_months: 当月に加えて事前作成する月数
+    """
+
+    def __init__(self, tables: Dict[str, str], premake_months: int = DEFAULT_PREMAKE_MONTHS):
+        self.tables = dict(tables)
+        self.premake_months = premake_months
+
+    async def initialize(self, conn, now_epoch: int):
+        """
+        登録テーブル作成・未変換テーブルの変換・当月以降のパーティション作成
+
+        ビューと振り分けトリガーは起動時に全テーブル分を作り直す（トリガー定義の変更を
+        変換済みのデータベースにも反映する）
+        """
+        for statement in REGISTRY_SCHEMA:
+            await conn.execute(statement)
+
+        for table, time_column in self.tables.items():
+            cursor = await conn.execute(
+                "SELECT type FROM sqlite_master WHERE name = ?", (table,)
+            )
+            row = await cursor.fetchone()
+            if row and row[0] == 'table':
+                await self._convert_table(conn, table, time_column)
+
+        await self.ensure_partitions(conn, now_epoch, rebuild=await self.partitioned_tables(conn))
+
+    async def partitioned_tables(self, conn) -> set:
+        """変換済みテーブル名"""
+        cursor = await conn.execute("SELECT table_name FROM partitioned_tables")
+        return {row[0] for row in await cursor.fetchall()}
+
+    async def ensure_partitions(self, conn, now_epoch: int, rebuild: set = frozenset()):
+        """受け皿パーティションと、当月からpremake_months先までのパーティションを作成"""
+        for table in await self.partitioned_tables(conn):
+            start, end = month_range(now_epoch)
+            created = await self._ensure_archive(conn, table)
+            for _ in range(self.premake_months + 1):
+                created |= await self._create_partition(conn, table, start, end)
+                start, end = month_range(end)
+            if created or table in rebuild:
+                await self._rebuild_view(conn, table)
+
+    async def partitions_for_range(self, conn, table: str, since_epoch: int) -> List[str]:
+        """since_epoch以降の行を含みうるパーティション（新しい順、範囲は互いに重ならない）"""
+        cursor = await conn.execute(PARTITIONS_FOR_RANGE_QUERY, (table, since_epoch))
+        return [row[0] for row in await cursor.fetchall()]
+
+    async def drop_partitions_before(self, conn, table: str, cutoff_epoch: int,
+                                     keep_condition: Optional[str] = None) -> Dict[str, int]:
+        """
+        範囲全体がcutoff_epochより古いパーティションを削除
+
+        keep_conditionに該当する行は削除前にアーカイブパーティションへ移す。
+        rows_removedは削除したパーティションから消えた行数（アーカイブへ移した行は含まない）。
+        アーカイブ内のcutoff_epochより古い行のうちkeep_conditionに該当しないものは
+        DELETEで削除し、rows_purgedに数える（DELETEトリガーは発火する）。
+        """
+        result = {'partitions_dropped': 0, 'rows_removed': 0, 'rows_archived': 0, 'rows_purged': 0}
+        cursor = await conn.execute(
+            "SELECT time_column FROM partitioned_tables WHERE table_name = ?", (table,)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return result
+        epoch = _epoch_expr(row[0])
+        archive = f"{table}_{ARCHIVE_SUFFIX}"
+        await self._ensure_archive(conn, table)
+        cursor = await conn.execute('''
+            SELECT partition_name, range_end FROM table_partitions
+            WHERE table_name = ? AND partition_name != ? AND range_end <= ?
+            ORDER BY range_start
+        ''', (table, archive, cutoff_epoch))
+        expired = await cursor.fetchall()
+
+        for partition, range_end in expired:
+            cursor = await conn.execute(f"SELECT COUNT(*) FROM {partition}")
+            total = (await cursor.fetchone())[0]
+            archived = 0
+            if keep_condition and total:
+                cursor = await conn.execute(
+                    f"INSERT INTO {archive} SELECT * FROM {partition} WHERE {keep_condition}"
+                )
+                archived = cursor.rowcount
+
+            await conn.execute(f"DROP TABLE {partition}")
+            await conn.execute(
+                "DELETE FROM table_partitions WHERE partition_name = ?", (partition,)
+            )
+            result['partitions_dropped'] += 1
+            result['rows_removed'] += total - archived
+            result['rows_archived'] += archived
+            logger.info(f"Partition dropped: {partition} ({total - archived} rows removed, "
+                        f"{archived} archived)")
+
+        # 受け皿に振り分けられた期間外の行
+        purge_condition = f"{epoch} < ?" + (f" AND NOT ({keep_condition})" if keep_condition else '')
+        cursor = await conn.execute(f"DELETE FROM {archive} WHERE {purge_condition}", (cutoff_epoch,))
+        result['rows_purged'] = max(cursor.rowcount, 0)
+
+        if expired:
+            await self._rebuild_view(conn, table)
+        return result
+
+    async def _convert_table(self, conn, table: str, time_column: str):
+        """既存テーブルを月別パーティションへ変換（1回のみ、行数を照合してから元テーブルを削除）"""
+        cursor = await conn.execute(
+            "SELECT type, sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL", (table,)
+        )
+        table_sql, index_sql, trigger_sql = None, [], []
+        for object_type, sql in await cursor.fetchall():
+            if object_type == 'table':
+                table_sql = sql
+            elif object_type == 'index':
+                index_sql.append(sql)
+            elif object_type == 'trigger':
+                trigger_sql.append(sql)
+
+        await conn.execute('''
+            INSERT INTO partitioned_tables (table_name, time_column, table_sql, index_sql, trigger_sql)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (table, time_column, table_sql, json.dumps(index_sql), json.dumps(trigger_sql)))
+
+        epoch = _epoch_expr(time_column)
+        cursor = await conn.execute(
+            f"SELECT DISTINCT strftime('%Y%m', {time_column}) FROM {table} "
+            f"WHERE {time_column} IS NOT NULL"
+        )
+        months = sorted(row[0] for row in await cursor.fetchall() if row[0])
+
+        copied = 0
+        for month in months:
+            start = month_start_epoch(int(month[:4]), int(month[4:]))
+            start, end = month_range(start)
+            partition = f"{table}_{partition_suffix(start)}"
+            # トリガー（行数カウンタ等）は移送後に作成し、移送分を二重に数えない
+            await self._create_partition(conn, table, start, end, with_triggers=False)
+            cursor = await conn.execute(
+                f"INSERT INTO {partition} SELECT * FROM {table} WHERE {epoch} >= ? AND {epoch} < ?",
+                (start, end)
+            )
+            copied += cursor.rowcount
+            await self._create_triggers(conn, table, partition)
+
+        cursor = await conn.execute(f"SELECT COUNT(*) FROM {table}")
+        total = (await cursor.fetchone())[0]
+        if copied != total:
+            raise RuntimeError(f"Partition conversion of {table} copied {copied}/{total} rows")
+
+        await conn.execute(f"DROP TABLE {table}")
+        logger.info(f"Table partitioned: {table} ({total} rows, {len(months)} partitions)")
+
+    async def _template(self, conn, table: str) -> Tuple[str, List[str], List[str]]:
+        cursor = await conn.execute(
+            "SELECT table_sql, index_sql, trigger_sql FROM partitioned_tables WHERE table_name = ?",
+            (table,)
+        )
+        table_sql, index_sql, trigger_sql = await cursor.fetchone()
+        return table_sql, json.loads(index_sql), json.loads(trigger_sql)
+
+    async def _create_partition(self, conn, table: str, range_start: int, range_end: int,
+                                name: Optional[str] = None, with_triggers: bool = True) -> bool:
+        """パーティション作成（作成済みならFalse）"""
+        partition = name or f"{table}_{partition_suffix(range_start)}"
+        cursor = await conn.execute(
+            "SELECT 1 FROM table_partitions WHERE partition_name = ?", (partition,)
+        )
+        if await cursor.fetchone():
+            return False
+
+        table_sql, index_sql, _ = await self._template(conn, table)
+        suffix = partition[len(table) + 1:]
+        await conn.execute(re.sub(
+            r'^CREATE TABLE\s+("?)' + re.escape(table) + r'\1', f'CREATE TABLE {partition}',
+            table_sql, count=1
+        ))
+        for sql in index_sql:
+            await conn.execute(re.sub(
+                r'^CREATE (UNIQUE )?INDEX\s+(\S+)\s+ON\s+\S+?\s*\(',
+                lambda m: f"CREATE {m.group(1) or ''}INDEX {m.group(2)}_{suffix} ON {partition}(",
+                sql, count=1
+            ))
+        if with_triggers:
+            await self._create_triggers(conn, table, partition)
+
+        await conn.execute('''
+            INSERT INTO table_partitions (partition_name, table_name, range_start, range_end)
+            VALUES (?, ?, ?, ?)
+        ''', (partition, table, range_start, range_end))
+        return True
+
+    async def _create_triggers(self, conn, table: str, partition: str):
+        """テンプレートのトリガーをパーティションに作成（文字列リテラル内のテーブル名は置換しない）"""
+        _, _, trigger_sql = await self._template(conn, table)
+        suffix = partition[len(table) + 1:]
+        for sql in trigger_sql:
+            sql = re.sub(r'^CREATE TRIGGER\s+(\S+)', lambda m: f"CREATE TRIGGER {m.group(1)}_{suffix}",
+                         sql, count=1)
+            await conn.execute(re.sub(r"(?<![\w'])" + re.escape(table) + r"(?![\w'])", partition, sql))
+
+    async def _ensure_archive(self, conn, table: str) -> bool:
+        """アーカイブ（受け皿）パーティション作成（作成した場合True）。範囲は [0, ARCHIVE_RANGE_END)"""
+        archive = f"{table}_{ARCHIVE_SUFFIX}"
+        if await self._create_partition(conn, table, 0, ARCHIVE_RANGE_END, name=archive):
+            return True
+        # 範囲を削除済みの月までとしていた以前の登録を拡張
+        cursor = await conn.execute('''
+            UPDATE table_partitions SET range_end = ?
+            WHERE partition_name = ? AND range_end < ?
+        ''', (ARCHIVE_RANGE_END, archive, ARCHIVE_RANGE_END))
+        return cursor.rowcount > 0
+
+    async def _rebuild_view(self, conn, table: str):
+        """UNION ALLビューとINSERT振り分けトリガーの再作成"""
+        cursor = await conn.execute('''
+            SELECT partition_name, range_start, range_end FROM table_partitions
+            WHERE table_name = ? ORDER BY range_start
+        ''', (table,))
+        partitions = await cursor.fetchall()
+        cursor = await conn.execute(
+            "SELECT time_column FROM partitioned_tables WHERE table_name = ?", (table,)
+        )
+        time_column = (await cursor.fetchone())[0]
+
+        # 列一覧と既定値（ビュー経由のINSERTでは既定値が適用されないため補完する）
+        cursor = await conn.execute(f"PRAGMA table_info({partitions[0][0]})")
+        table_info = await cursor.fetchall()
+        columns = [(row[1], row[4]) for row in table_info]
+        primary_key = [row[1] for row in sorted(table_info, key=lambda row: row[5]) if row[5]]
+        column_list = ', '.join(name for name, _ in columns)
+        values = ', '.join(
+            f"COALESCE(NEW.{name}, {default})" if default is not None else f"NEW.{name}"
+            for name, default in columns
+        )
+        epoch = _epoch_expr(f"NEW.{time_column}")
+        archive = f"{table}_{ARCHIVE_SUFFIX}"
+
+        # 主キーの重複はパーティション（アーカイブを含む）をまたいで検査し、
+        # パーティション内のPRIMARY KEY違反と同じエラーで中止する
+        duplicate_check = ''
+        if primary_key:
+            key_match = ' AND '.join(f"{name} = NEW.{name}" for name in primary_key)
+            exists = ' OR '.join(
+                f"EXISTS (SELECT 1 FROM {partition} WHERE {key_match})"
+                for partition, _, _ in partitions
+            )
+            failed = ', '.join(f"{table}.{name}" for name in primary_key)
+            duplicate_check = f'''
+                SELECT RAISE(ABORT, 'UNIQUE constraint failed: {failed}') WHERE {exists};'''
+
+        # 月別パーティションに該当しない行（時刻なしを含む）はアーカイブへ
+        routes = duplicate_check + ''.join(
+            f'''
+                INSERT INTO {partition} ({column_list})
+                SELECT {values} WHERE {epoch} >= {range_start} AND {epoch} < {range_end};'''
+            for partition, range_start, range_end in partitions if partition != archive
+        ) + f'''
+                INSERT INTO {archive} ({column_list})
+                SELECT {values} WHERE NOT EXISTS (
+                    SELECT 1 FROM table_partitions
+                    WHERE table_name = '{table}' AND partition_name != '{archive}'
+                        AND range_start <= {epoch} AND range_end > {epoch}
+                );'''
+
+        await conn.execute(f"DROP VIEW IF EXISTS {table}")
+        await conn.execute(f"CREATE VIEW {table} AS " + ' UNION ALL '.join(
+            f"SELECT * FROM {partition}" for partition, _, _ in partitions
+        ))
+        await conn.execute(f'''
+            CREATE TRIGGER trg_{table}_route
+            INSTEAD OF INSERT ON {table}
+            BEGIN{routes}
+            END
+        ''')
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Phase 4.1: SQLite Connection Pool
+全コンポーネント共有の非同期接続プール
+
+- DBファイルごとに書き込み用接続1本・読み込み用接続N本
+- WALモード（読み込みは書き込みをブロックしない）と接続単位のPRAGMA設定は
+  接続作成時に1回だけ実行する
+- 呼び出し側は従来の `async with aiosqlite.connect(path) as conn:` を
+  `async with get_connection_pool(path).writer() as conn:`（または reader()）に置き換える
+- 単発のINSERT/UPDATEは `get_ingest_queue(path).execute(...)` で書き込みキューへ送る。
+  単一の書き込みタスクが複数件を1トランザクションでコミットし（グループコミット）、
+  取引・ポジションのレーンはメトリクスより先に処理する
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiosqlite
+
+# ログ設定
+logger = logging.getLogger(__name__)
+
+DEFAULT_READERS = 4
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_INGEST_MAX_BATCH = 256
+
+# 全接続共通のPRAGMA（接続作成時に1回だけ実行）
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA recursive_triggers=ON",   # INSERT OR REPLACEの削除でも行数カウンタのトリガーを発火
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",       # 16MB
+    "PRAGMA mmap_size=268435456",     # 256MB
+)
+
+class WriteLane(IntEnum):
+    """書き込みレーン（値が小さいほど優先）"""
+    CRITICAL = 0  # 取引実行・ポジション・緊急イベント
+    NORMAL = 1    # シグナル・リスク評価・アラート等
+    BULK = 2      # メトリクス・可用性・統計スナップショット
+
+class _WriteRequest:
+    """書き込みキュー要素"""
+    __slots__ = ('sql', 'params', 'many', 'lane', 'future', 'enqueued_at')
+
+    def __init__(self, sql: Optional[str], params: Any, many: bool,
+                 lane: WriteLane, future: asyncio.Future):
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.lane = lane
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+class IngestQueue:
+    """
+    単一書き込みタスクによる書き込みキュー
+
+    - 待機中の要求をまとめて1トランザクションで実行する（グループコミット）
+    - 優先度キューのため CRITICAL → NORMAL → BULK の順に取り出す。
+      1バッチはmax_batch件までなので、CRITICALの待ちは最大でも実行中の1バッチ分
+    - 呼び出し側はFutureで完了通知（rowcount）を受け取る。バッチ内の1件が失敗した場合は
+      ロールバックして1件ずつ再実行し、失敗した要求だけに例外を返す
+    """
+
+    def __init__(self, pool: 'ConnectionPool', max_batch: int = DEFAULT_INGEST_MAX_BATCH):
+        self.pool = pool
+        self.max_batch = max_batch
+
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # 統計
+        self.stats = {
+            'batches': 0,
+            'writes': 0,
+            'failed_writes': 0,
+            'max_batch_size': 0,
+            'lane_writes': {lane.name: 0 for lane in WriteLane},
+            'lane_max_wait_ms': {lane.name: 0.0 for lane in WriteLane}
+        }
+
+    def submit(self, sql: Optional[str], params: Any = (), lane: WriteLane = WriteLane.NORMAL,
+               many: bool = False) -> asyncio.Future:
+        """書き込み要求登録（完了はFutureで通知）"""
+        if self._closed:
+            raise RuntimeError(f"Ingest queue closed: {self.pool.db_path}")
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._writer_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        request = _WriteRequest(sql, params, many, lane, future)
+        self._queue.put_nowait((int(lane), next(self._sequence), request))
+        return future
+
+    async def execute(self, sql: str, params: Sequence = (),
+                      lane: WriteLane = WriteLane.NORMAL) -> int:
+        """単一文の書き込み（コミット完了まで待機）"""
+        return await self.submit(sql, params, lane)
+
+    async def executemany(self, sql: str, seq_of_params: Sequence[Sequence],
+                          lane: WriteLane = WriteLane.NORMAL) -> int:
+        """複数行の書き込み（コミット完了まで待機）"""
+        return await self.submit(sql, list(seq_of_params), lane, many=True)
+
+    async def flush(self):
+        """登録済みの全要求のコミット完了待ち"""
+        if self._task is None:
+            return
+        await self.submit(None, lane=WriteLane.BULK)
+
+    def _take_batch(self, first: _WriteRequest) -> List[_WriteRequest]:
+        batch = [first]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait()[2])
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _writer_loop(self):
+        while True:
+            first = (await self._queue.get())[2]
+            batch = self._take_batch(first)
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                logger.error(f"Ingest batch error ({self.pool.db_path}): {e}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    async def _commit_batch(self, batch: List[_WriteRequest]):
+        started = time.perf_counter()
+        results = []
+        async with self.pool.writer() as conn:
+            try:
+                await conn.execute("BEGIN IMMEDIATE")
+                for request in batch:
+                    results.append(await self._execute_request(conn, request))
+                await conn.commit()
+            except Exception as e:
+                await conn.rollback()
+                logger.warning(f"Ingest batch rolled back, retrying individually: {e}")
+                results = await self._commit_individually(conn, batch)
+
+        for request, result in zip(batch, results):
+            lane = request.lane.name
+            wait_ms = (started - request.enqueued_at) * 1000
+            if wait_ms > self.stats['lane_max_wait_ms'][lane]:
+                self.stats['lane_max_wait_ms'][lane] = wait_ms
+            if request.future.done():
+                continue
+            if isinstance(result, Exception):
+                self.stats['failed_writes'] += 1
+                request.future.set_exception(result)
+            else:
+                if request.sql is not None:
+                    self.stats['writes'] += 1
+                    self.stats['lane_writes'][lane] += 1
+                request.future.set_result(result)
+
+        self.stats['batches'] += 1
+        self.stats['max_batch_size'] = max(self.stats['max_batch_size'], len(batch))
+
+    async def _commit_individually(self, conn, batch: List[_WriteRequest]) -> List[Any]:
+        results = []
+        for request in batch:
+            try:
+                result = await self._execute_request(conn, request)
+                await conn.commit()
+                results.append(result)
+            except Exception as e:
+                await conn.rollback()
+                results.append(e)
+        return results
+
+    @staticmethod
+    async def _execute_request(conn, request: _WriteRequest) -> int:
+        if request.sql is None:
+            return 0
+        if request.many:
+            cursor = await conn.executemany(request.sql, request.params)
+        else:
+            cursor = await conn.execute(request.sql, request.params)
+        return cursor.rowcount
+
+    async def close(self):
+        """キュー停止（登録済みの要求は書き込んでから停止）"""
+        if self._closed:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._closed = True
+            if self._task is not None:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+                self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キュー統計取得"""
+        stats = dict(self.stats)
+        stats['pending'] = self._queue.qsize()
+        return stats
+
+class ConnectionPool:
+    """
+    SQLite非同期接続プール
+
+    書き込み接続はasyncio.Lockで直列化し、読み込み接続はキューから貸し出す。
+    読み込み接続は必要になった時点で最大max_readers本まで作成する。
+    """
+
+    def __init__(self, db_path: str, max_readers: int = DEFAULT_READERS,
+                 busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+                 ingest_max_batch: int = DEFAULT_INGEST_MAX_BATCH):
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self.busy_timeout_ms = busy_timeout_ms
+        self.ingest_max_batch = ingest_max_batch
+        self._ingest: Optional[IngestQueue] = None
+
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: asyncio.Queue = asyncio.Queue()
+        self._reader_create_lock = asyncio.Lock()
+        self._closed = False
+
+        # インメモリDBは接続ごとに別DBになるため読み込みも書き込み接続で行う
+        self._shared_memory = db_path == ":memory:"
+
+        # 統計
+        self.stats = {
+            'writer_acquisitions': 0,
+            'reader_acquisitions': 0,
+            'connections_opened': 0
+        }
+
+    async def _open_connection(self, read_only: bool) -> aiosqlite.Connection:
+        """接続作成とPRAGMA設定"""
+        conn = await aiosqlite.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+        await conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        if not read_only and not self._shared_memory:
+            await conn.execute("PRAGMA journal_mode=WAL")
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        if read_only:
+            await conn.execute("PRAGMA query_only=ON")
+        self.stats['connections_opened'] += 1
+        return conn
+
+    async def _get_writer(self) -> aiosqlite.Connection:
+        if self._closed:
+            raise RuntimeError(f"Connection pool closed: {self.db_path}")
+        if self._writer is None:
+            self._writer = await self._open_connection(read_only=False)
+        return self._writer
+
+    @asynccontextmanager
+    async def writer(self):
+        """
+        書き込み接続の取得（排他）
+
+        正常終了時に未コミットのトランザクションがあればコミットし、
+        例外時はロールバックして次の利用者に持ち越さない。
+        """
+        async with self._writer_lock:
+            conn = await self._get_writer()
+            self.stats['writer_acquisitions'] += 1
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    await conn.rollback()
+                raise
+            else:
+                if conn.in_transaction:
+                    await conn.commit()
+
+    @asynccontextmanager
+    async def reader(self):
+        """読み込み接続の取得"""
+        if self._shared_memory:
+            async with self.writer() as conn:
+                yield conn
+            return
+
+        # WALを有効化してから読み込み接続を開く
+        if self._writer is None:
+            async with self._writer_lock:
+                await self._get_writer()
+
+        conn = await self._acquire_reader()
+        self.stats['reader_acquisitions'] += 1
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                await conn.rollback()
+            if self._closed:
+                await conn.close()
+            else:
+                self._idle_readers.put_nowait(conn)
+
+    async def _acquire_reader(self) -> aiosqlite.Connection:
+        if self._closed:
+            raise RuntimeError(f"Connection pool closed: {self.db_path}")
+        try:
+            return self._idle_readers.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        async with self._reader_create_lock:
+            if len(self._readers) < self.max_readers:
+                conn = await self._open_connection(read_only=True)
+                self._readers.append(conn)
+                return conn
+
+        return await self._idle_readers.get()
+
+    @property
+    def ingest(self) -> IngestQueue:
+        """このDBファイルの書き込みキュー"""
+        if self._ingest is None:
+            self._ingest = IngestQueue(self, self.ingest_max_batch)
+        return self._ingest
+
+    async def close(self):
+        """全接続クローズ（書き込みキューは書き込み完了後に停止）"""
+        if self._ingest is not None:
+            await self._ingest.close()
+        self._closed = True
+        async with self._writer_lock:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+        while not self._idle_readers.empty():
+            await self._idle_readers.get_nowait().close()
+        self._readers.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """プール統計取得"""
+        stats = self.stats.copy()
+        stats['readers_open'] = len(self._readers)
+        stats['readers_idle'] = self._idle_readers.qsize()
+        if self._ingest is not None:
+            stats['ingest'] = self._ingest.get_stats()
+        return stats
+
+# DBファイル → 共有プール（イベントループごと）
+_pools: Dict[Tuple[str, int], ConnectionPool] = {}
+_pool_settings = {
+    'max_readers': DEFAULT_READERS,
+    'busy_timeout_ms': DEFAULT_BUSY_TIMEOUT_MS,
+    'ingest_max_batch': DEFAULT_INGEST_MAX_BATCH
+}
+
+def configure_connection_pools(max_readers: Optional[int] = None,
+                               busy_timeout_ms: Optional[int] = None,
+                               ingest_max_batch: Optional[int] = None):
+    """以降に作成されるプールの設定"""
+    if max_readers is not None:
+        _pool_settings['max_readers'] = max_readers
+    if busy_timeout_ms is not None:
+        _pool_settings['busy_timeout_ms'] = busy_timeout_ms
+    if ingest_max_batch is not None:
+        _pool_settings['ingest_max_batch'] = ingest_max_batch
+
+def _pool_key(db_path: str) -> Tuple[str, int]:
+    path = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+    return path, id(asyncio.get_running_loop())
+
+def get_connection_pool(db_path: str) -> ConnectionPool:
+    """
+    共有接続プール取得
+
+    同じDBファイルを使うコンポーネントは同じプール（同じ書き込み接続）を使う。
+    """
+    key = _pool_key(db_path)
+    pool = _pools.get(key)
+    if pool is None or pool._closed:
+        pool = ConnectionPool(db_path, **_pool_settings)
+        _pools[key] = pool
+        logger.debug(f"Connection pool created: {key[0]}")
+    return pool
+
+def get_ingest_queue(db_path: str) -> IngestQueue:
+    """共有書き込みキュー取得"""
+    return get_connection_pool(db_path).ingest
+
+async def close_connection_pools():
+    """現在のイベントループの全プールをクローズ"""
+    loop_id = id(asyncio.get_running_loop())
+    for key in [key for key in _pools if key[1] == loop_id]:
+        await _pools.pop(key).close()
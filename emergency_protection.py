@@ -12,9 +12,9 @@ import asyncio
 import json
 import time
 import logging
-import aiosqlite
 import signal
 import threading
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional, Any, Tuple, Union, Callable
@@ -25,6 +25,7 @@ from pathlib import Path
 # 既存システム統合
 sys.path.append(str(Path(__file__).parent))
 from realtime_signal_generator import SystemConstants, get_config_value, calculate_time_diff_seconds, CONFIG
+from database_pool import get_connection_pool, get_ingest_queue, WriteLane
 from position_management import Position, PositionTracker, PositionStatus, PositionType
 from risk_management import RiskManager, RiskLevel, RiskAction
 
@@ -147,6 +148,233 @@ class NetworkMonitor:
         self.is_monitoring = False
         logger.info("Network monitoring stopped")
 
+class ProtectionStopIndex:
+    """
+    保護ストップ・利確レベル索引
+    
+    シンボル×売買方向ごとにストップロス・テイクプロフィットを
+    (level, position_id) のソート済み配列で保持し、価格更新時に
+    発動対象をO(log n + k)で取り出す。
+    
+    発動条件:
+        BUY  stop:   price <= stop   → stop >= price の後方区間
+        SELL stop:   price >= stop   → stop <= price の前方区間
+        BUY  target: price >= target → target <= price の前方区間
+        SELL target: price <= target → target >= price の後方区間
+    """
+    
+    def __init__(self):
+        # (symbol, position_type, kind) → [(level, position_id), ...]
+        self._levels: Dict[Tuple[str, PositionType, str], List[Tuple[float, str]]] = {}
+        # position_id → 登録済みキーとレベル
+        self._entries: Dict[str, List[Tuple[Tuple[str, PositionType, str], float]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def symbols(self) -> List[str]:
+        return sorted({key[0] for key, levels in self._levels.items() if levels})
+    
+    def add(self, position: Position):
+        """OPENポジションのストップ・利確レベル登録（既存登録は置き換え）"""
+        self.remove(position.position_id)
+        entries = []
+        for kind, level in (('stop', position.stop_loss), ('target', position.take_profit)):
+            if not level:
+                continue
+            key = (position.symbol, position.position_type, kind)
+            levels = self._levels.setdefault(key, [])
+            item = (level, position.position_id)
+            levels.insert(bisect_left(levels, item), item)
+            entries.append((key, level))
+        if entries:
+            self._entries[position.position_id] = entries
+    
+    def remove(self, position_id: str):
+        """登録解除"""
+        for key, level in self._entries.pop(position_id, []):
+            levels = self._levels.get(key, [])
+            index = bisect_left(levels, (level, position_id))
+            if index < len(levels) and levels[index] == (level, position_id):
+                del levels[index]
+    
+    def _pop_range(self, key, price: float, from_top: bool) -> List[Tuple[str, str]]:
+        levels = self._levels.get(key)
+        if not levels:
+            return []
+        if from_top:
+            # level >= price
+            index = bisect_left(levels, (price,))
+            hit, levels[index:] = levels[index:], []
+        else:
+            # level <= price（同値を含めるため position_id 側で上限を取る）
+            index = bisect_right(levels, (price, chr(0x10FFFF)))
+            hit, levels[:index] = levels[:index], []
+        return [(position_id, key[2]) for _, position_id in hit]
+    
+    def pop_triggered(self, symbol: str, price: float) -> List[Tuple[str, str]]:
+        """発動対象を取り出して索引から除去 [(position_id, 'stop'|'target'), ...]"""
+        triggered = (
+            self._pop_range((symbol, PositionType.BUY, 'stop'), price, from_top=True) +
+            self._pop_range((symbol, PositionType.SELL, 'stop'), price, from_top=False) +
+            self._pop_range((symbol, PositionType.BUY, 'target'), price, from_top=False) +
+            self._pop_range((symbol, PositionType.SELL, 'target'), price, from_top=True)
+        )
+        for position_id, _ in triggered:
+            self.remove(position_id)
+        return triggered
+
+@dataclass
+class FlattenResult:
+    """緊急一括決済結果"""
+    total: int
+    closed: List[str]
+    failed: List[str]
+    elapsed: float
+    
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+class EmergencyFlattenExecutor:
+    """
+    緊急一括決済エグゼキューター
+    
+    - MT4への決済指示はbatch_size件ごとの一括メッセージで送信
+    - 送信に失敗したバッチのポジションは個別に再通知し、MT4へ通知できたものだけを
+      ローカル決済する（通知できないまま期限に達したものはfailed）
+    - ローカル決済（DB・統計更新）は同時実行数max_concurrencyに制限
+    - ポジション単位のタイムアウトとリトライで1件のハングが全体を止めない
+    - 全体期限（deadline）到達後は新規の試行を打ち切る
+    """
+    
+    def __init__(self, position_tracker: PositionTracker,
+                 max_concurrency: int = 8,
+                 position_timeout: float = 5.0,
+                 max_retries: int = 2,
+                 batch_size: int = 20,
+                 progress_callback: Optional[Callable] = None):
+        self.position_tracker = position_tracker
+        self.max_concurrency = max_concurrency
+        self.position_timeout = position_timeout
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+    
+    async def flatten(self, positions: List[Position], deadline: float) -> FlattenResult:
+        """
+        全ポジション決済
+        
+        Args:
+            positions: 決済対象ポジション
+            deadline: 全体期限（秒）
+        """
+        start_time = time.monotonic()
+        deadline_at = start_time + deadline
+        exit_prices = {
+            position.position_id: position.current_price or position.entry_price
+            for position in positions
+        }
+        
+        # MT4への一括決済指示（送信できたバッチのポジションのみ通知済み）
+        notified = set()
+        for offset in range(0, len(positions), self.batch_size):
+            batch = positions[offset:offset + self.batch_size]
+            if await self._send_close(batch, exit_prices, deadline_at):
+                notified.update(position.position_id for position in batch)
+            else:
+                logger.error(f"Emergency batch close not sent ({len(batch)} positions), "
+                             f"retrying per position")
+        
+        # ローカル決済（同時実行数制限・個別期限・リトライ）
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        closed: List[str] = []
+        failed: List[str] = []
+        total = len(positions)
+        
+        async def close_one(position: Position):
+            async with semaphore:
+                is_closed = await self._close_with_retry(
+                    position, exit_prices[position.position_id], deadline_at,
+                    position.position_id in notified
+                )
+            (closed if is_closed else failed).append(position.position_id)
+            await self._report_progress(len(closed), len(failed), total)
+        
+        await asyncio.gather(*(close_one(position) for position in positions))
+        
+        return FlattenResult(
+            total=total,
+            closed=closed,
+            failed=failed,
+            elapsed=time.monotonic() - start_time
+        )
+    
+    async def _send_close(self, positions: List[Position], exit_prices: Dict[str, float],
+                          deadline_at: float) -> bool:
+        """MT4への決済指示送信（期限内に送信できた場合のみTrue）"""
+        try:
+            return bool(await asyncio.wait_for(
+                self.position_tracker.send_batch_close(positions, exit_prices),
+                timeout=max(0.0, min(self.position_timeout, deadline_at - time.monotonic()))
+            ))
+        except asyncio.TimeoutError:
+            logger.error(f"Emergency close send timeout ({len(positions)} positions)")
+        except Exception as e:
+            logger.error(f"Emergency close send error ({len(positions)} positions): {e}")
+        return False
+    
+    async def _close_with_retry(self, position: Position, exit_price: float,
+                                deadline_at: float, notified: bool) -> bool:
+        """
+        MT4通知済みのポジションをローカル決済（未通知の場合は先に個別通知）
+        
+        MT4へ通知できないポジションはローカルでも決済せずFalseを返す。
+        """
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"Emergency close deadline exceeded: {position.position_id}")
+                return False
+            
+            if not notified:
+                notified = await self._send_close([position], {position.position_id: exit_price}, deadline_at)
+            
+            if notified:
+                try:
+                    result = await asyncio.wait_for(
+                        self.position_tracker.close_position(
+                            position.position_id,
+                            exit_price,
+                            commission=0.0,
+                            notify_mt4=False
+                        ),
+                        timeout=max(0.0, min(self.position_timeout, deadline_at - time.monotonic()))
+                    )
+                    if result is not None:
+                        return True
+                except asyncio.TimeoutError:
+                    logger.warning(f"Emergency close timeout: {position.position_id} (attempt {attempt + 1})")
+                except Exception as e:
+                    logger.warning(f"Emergency close error: {position.position_id} (attempt {attempt + 1}): {e}")
+            
+            # 途中で打ち切られても決済済みならアクティブから外れている
+            if self.position_tracker.get_position_by_id(position.position_id) is None:
+                return True
+            
+            await asyncio.sleep(min(0.1 * (2 ** attempt), max(0.0, deadline_at - time.monotonic())))
+        
+        return False
+    
+    async def _report_progress(self, closed: int, failed: int, total: int):
+        logger.info(f"Emergency closure progress: {closed + failed}/{total} "
+                    f"(closed: {closed}, failed: {failed})")
+        if self.progress_callback:
+            try:
+                await self.progress_callback(closed, failed, total)
+            except Exception as e:
+                logger.error(f"Emergency progress callback error: {e}")
+
 class EmergencyProtectionSystem:
     """
     緊急保護システム - kiro設計tasks.md:109-115準拠
@@ -174,6 +402,12 @@ class EmergencyProtectionSystem:
         # 緊急イベント履歴
         self.emergency_history: List[EmergencyEvent] = []
         
+        # 保護ストップ索引（価格更新ごとに発動判定）
+        self.protection_index = ProtectionStopIndex()
+        self.last_prices: Dict[str, float] = {}
+        self._unpriced_symbols: set = set()
+        self._closing_positions: set = set()
+        
         # シグナルハンドラー設定
         self._setup_signal_handlers()
         
@@ -190,6 +424,10 @@ class EmergencyProtectionSystem:
             'connection_timeout_threshold': 60,  # 接続タイムアウト閾値（秒）
             'system_health_check_interval': 15,  # システムヘルスチェック間隔（秒）
             'stop_maintenance_interval': 5,      # 保護ストップ維持間隔（秒）
+            'flatten_max_concurrency': 8,        # 緊急決済同時実行数
+            'flatten_position_timeout': 5,       # ポジション単位決済タイムアウト（秒）
+            'flatten_max_retries': 2,            # ポジション単位リトライ回数
+            'flatten_batch_size': 20,            # MT4一括決済メッセージあたりの件数
         }
         
         logger.info("Emergency Protection System initialized")
@@ -241,6 +479,15 @@ class EmergencyProtectionSystem:
         await self.network_monitor.start_monitoring()
         self.network_monitor.register_disconnection_callback(self._handle_network_disconnection)
         
+        # 保護ストップ索引構築・ティック連動
+        for position in self.position_tracker.get_active_positions():
+            self._on_position_event(position)
+            # 再起動直後はティック未受信のため、復元ポジションの評価価格を補完スイープの基準にする
+            if position.current_price and position.symbol not in self.last_prices:
+                self.last_prices[position.symbol] = position.current_price
+        self.position_tracker.register_position_listener(self._on_position_event)
+        self.position_tracker.register_price_listener(self._on_price_update)
+        
         # システム監視開始
         self.is_running = True
         self.status = ProtectionStatus.ACTIVE
@@ -252,7 +499,7 @@ class EmergencyProtectionSystem:
     async def _init_database(self):
         """緊急保護データベース初期化"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 # 緊急イベントテーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS emergency_events (
@@ -338,30 +585,67 @@ class EmergencyProtectionSystem:
         except Exception as e:
             logger.error(f"System health check error: {e}")
     
+    def _on_position_event(self, position: Position):
+        """ポジション状態変化時の索引更新"""
+        if position.status == PositionStatus.OPEN:
+            self.protection_index.add(position)
+        else:
+            self.protection_index.remove(position.position_id)
+    
+    async def _on_price_update(self, symbol: str, price: float):
+        """価格更新時の保護ストップ判定（ティック連動）"""
+        self.last_prices[symbol] = price
+        if not self.is_running:
+            return
+        await self._execute_protection_stops(symbol, price)
+    
+    async def _execute_protection_stops(self, symbol: str, price: float) -> int:
+        """発動した保護ストップ・利確の並行決済"""
+        triggered = self.protection_index.pop_triggered(symbol, price)
+        if not triggered:
+            return 0
+        
+        close_tasks = []
+        for position_id, kind in triggered:
+            position = self.position_tracker.get_position_by_id(position_id)
+            if (position is None or position.status != PositionStatus.OPEN
+                    or position_id in self._closing_positions):
+                continue
+            
+            logger.warning(f"Protection {kind} triggered for {position_id} @ {price}")
+            self._closing_positions.add(position_id)
+            close_tasks.append(self._close_protected_position(position, price))
+        
+        if close_tasks:
+            await asyncio.gather(*close_tasks, return_exceptions=True)
+        return len(close_tasks)
+    
+    async def _close_protected_position(self, position: Position, price: float):
+        try:
+            closed = await self.position_tracker.close_position(
+                position.position_id,
+                price,
+                commission=0.0
+            )
+            if closed is None and position.status == PositionStatus.OPEN:
+                # 決済失敗時は再登録して次のティックで再判定
+                self.protection_index.add(position)
+        finally:
+            self._closing_positions.discard(position.position_id)
+    
     async def _maintain_protection_stops(self):
-        """保護ストップ維持 - kiro要件4.4準拠"""
+        """保護ストップ維持 - kiro要件4.4準拠（ティック取りこぼし時の補完スイープ）"""
         try:
-            # アクティブポジションの保護ストップ確認
-            active_positions = self.position_tracker.get_active_positions()
-            
-            for position in active_positions:
-                if position.status == PositionStatus.OPEN and position.stop_loss:
-                    # ストップロス監視
-                    if position.current_price:
-                        should_trigger_stop = False
-                        
-                        if position.position_type == PositionType.BUY:
-                            should_trigger_stop = position.current_price <= position.stop_loss
-                        else:  # SELL
-                            should_trigger_stop = position.current_price >= position.stop_loss
-                        
-                        if should_trigger_stop:
-                            logger.warning(f"Protection stop triggered for {position.position_id}")
-                            await self.position_tracker.close_position(
-                                position.position_id,
-                                position.current_price,
-                                commission=0.0
-                            )
+            for symbol in self.protection_index.symbols():
+                price = self.last_prices.get(symbol)
+                if price is None:
+                    # 価格未取得のシンボルは判定できないためスキップ（初回のみ記録）
+                    if symbol not in self._unpriced_symbols:
+                        self._unpriced_symbols.add(symbol)
+                        logger.warning(f"Protection stop sweep skipped for {symbol}: no price available yet")
+                    continue
+                self._unpriced_symbols.discard(symbol)
+                await self._execute_protection_stops(symbol, price)
         
         except Exception as e:
             logger.error(f"Protection stop maintenance error: {e}")
@@ -481,35 +765,27 @@ class EmergencyProtectionSystem:
             if not active_positions:
                 return True
             
-            close_tasks = []
-            for position in active_positions:
-                if position.status == PositionStatus.OPEN:
-                    task = asyncio.create_task(
-                        self.position_tracker.close_position(
-                            position.position_id,
-                            position.current_price or position.entry_price,
-                            commission=0.0
-                        )
-                    )
-                    close_tasks.append(task)
+            open_positions = [p for p in active_positions if p.status == PositionStatus.OPEN]
+            if not open_positions:
+                return True
             
-            # タイムアウト付き決済実行
-            try:
-                results = await asyncio.wait_for(
-                    asyncio.gather(*close_tasks, return_exceptions=True),
-                    timeout=self.protection_config['max_emergency_close_time']
-                )
-                
-                # 結果確認
-                success_count = sum(1 for r in results if not isinstance(r, Exception))
-                total_count = len(close_tasks)
-                
-                logger.info(f"Emergency closure: {success_count}/{total_count} positions closed")
-                return success_count == total_count
-                
-            except asyncio.TimeoutError:
-                logger.error("Emergency closure timeout exceeded")
-                return False
+            executor = EmergencyFlattenExecutor(
+                self.position_tracker,
+                max_concurrency=self.protection_config['flatten_max_concurrency'],
+                position_timeout=self.protection_config['flatten_position_timeout'],
+                max_retries=self.protection_config['flatten_max_retries'],
+                batch_size=self.protection_config['flatten_batch_size']
+            )
+            result = await executor.flatten(
+                open_positions,
+                deadline=self.protection_config['max_emergency_close_time']
+            )
+            
+            logger.info(f"Emergency closure: {len(result.closed)}/{result.total} positions closed "
+                        f"in {result.elapsed:.2f}s")
+            if result.failed:
+                logger.error(f"Emergency closure failed positions: {result.failed}")
+            return result.success
         
         except Exception as e:
             logger.error(f"Emergency close error: {e}")
@@ -536,26 +812,24 @@ class EmergencyProtectionSystem:
     async def _save_emergency_event(self, event: EmergencyEvent):
         """緊急イベントデータベース保存"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO emergency_events (
-                        timestamp, trigger_type, severity, description,
-                        system_state, positions_affected, action_taken,
-                        recovery_time, manual_intervention_required
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    event.timestamp.isoformat(),
-                    event.trigger.value,
-                    event.severity,
-                    event.description,
-                    json.dumps(event.system_state),
-                    event.positions_affected,
-                    event.action_taken,
-                    event.recovery_time,
-                    event.manual_intervention_required
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO emergency_events (
+                    timestamp, trigger_type, severity, description,
+                    system_state, positions_affected, action_taken,
+                    recovery_time, manual_intervention_required
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                event.timestamp.isoformat(),
+                event.trigger.value,
+                event.severity,
+                event.description,
+                json.dumps(event.system_state),
+                event.positions_affected,
+                event.action_taken,
+                event.recovery_time,
+                event.manual_intervention_required
+            ), lane=WriteLane.CRITICAL)
+            
         except Exception as e:
             logger.error(f"Emergency event save error: {e}")
     
@@ -565,22 +839,20 @@ class EmergencyProtectionSystem:
             position_stats = self.position_tracker.get_statistics()
             network_status = self.network_monitor.get_connection_status()
             
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO system_snapshots (
-                        timestamp, protection_status, active_positions,
-                        total_pnl, network_status, trading_enabled
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    datetime.now().isoformat(),
-                    self.status.value,
-                    position_stats.get('active_positions', 0),
-                    position_stats.get('total_pnl', 0.0),
-                    json.dumps(network_status),
-                    self.risk_manager.trading_enabled
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO system_snapshots (
+                    timestamp, protection_status, active_positions,
+                    total_pnl, network_status, trading_enabled
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                datetime.now().isoformat(),
+                self.status.value,
+                position_stats.get('active_positions', 0),
+                position_stats.get('total_pnl', 0.0),
+                json.dumps(network_status),
+                self.risk_manager.trading_enabled
+            ), lane=WriteLane.BULK)
+            
         except Exception as e:
             logger.error(f"System snapshot save error: {e}")
     
@@ -9,9 +9,11 @@ kiro設計tasks.md:143-149準拠 - 包括的監視システム・HealthMonitor
 """
 
 import asyncio
+import hashlib
 import json
 import logging
-import aiosqlite
+import math
+import os
 import time
 # import psutil  # オプショナル依存
 from datetime import datetime, timedelta
@@ -23,20 +25,56 @@ from pathlib import Path
 import threading
 import queue
 import socket
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http import HTTPStatus
 
 # 既存システム統合
 sys.path.append(str(Path(__file__).parent))
 from realtime_signal_generator import SystemConstants, get_config_value, CONFIG
+from database_pool import get_connection_pool, get_ingest_queue, WriteLane
 from position_management import PositionTracker
 from risk_management import RiskManager
 from emergency_protection import EmergencyProtectionSystem
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, timestamp_to_epoch
 from system_state_manager import SystemStateManager
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
+# メトリクスのロールアップ（テーブル → 集計単位秒）
+METRIC_ROLLUPS = {
+    'health_metrics_1m': 60,
+    'health_metrics_1h': 3600
+}
+
+METRIC_INSERT_SQL = '''
+    INSERT OR REPLACE INTO health_metrics (
+        metric_id, timestamp, component_name, metric_name,
+        metric_value, threshold_warning, threshold_critical,
+        unit, trend
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+AVAILABILITY_INSERT_SQL = '''
+    INSERT OR REPLACE INTO availability_history (
+        availability_id, timestamp, component_name, is_available,
+        check_duration_ms
+    ) VALUES (?, ?, ?, ?, ?)
+'''
+
+# 同じ集計区間への2回目以降のフラッシュは既存の集計値に加算する
+ROLLUP_UPSERT_SQL = '''
+    INSERT INTO {table} (
+        component_name, metric_name, bucket_epoch,
+        sample_count, value_sum, value_min, value_max, value_last
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (component_name, metric_name, bucket_epoch) DO UPDATE SET
+        sample_count = sample_count + excluded.sample_count,
+        value_sum = value_sum + excluded.value_sum,
+        value_min = MIN(value_min, excluded.value_min),
+        value_max = MAX(value_max, excluded.value_max),
+        value_last = excluded.value_last
+'''
+
 class HealthStatus(Enum):
     """健全性状態"""
     EXCELLENT = "EXCELLENT"    # 95%+
@@ -98,93 +136,220 @@ class ComponentHealth:
     uptime_seconds: float
     error_count_24h: int
 
-class DashboardServer:
-    """リアルタイム監視ダッシュボードサーバー"""
+# 累積カウンタ（単調増加のため異常検知の対象外）
+CUMULATIVE_METRICS = {'network_bytes_sent', 'network_bytes_recv'}
+
+# 異常判定に使う標準偏差の絶対下限（指標の単位）。ほぼ一定・ほぼ0で推移する指標が
+# わずかな変動で異常と判定されないようにする
+ANOMALY_DEVIATION_FLOORS = {
+    'cpu_usage_percent': 5.0,
+    'memory_usage_percent': 2.0,
+    'disk_usage_percent': 1.0,
+    'error_rate_percent': 1.0,
+    'average_latency_ms': 5.0,
+    'max_latency_ms': 10.0,
+    'active_positions': 1.0,
+    'total_pnl': 100.0,
+    'current_drawdown': 0.01,
+    'emergency_events_count': 1.0,
+    'database_size_mb': 1.0,
+    'availability_score': 0.05
+}
+
+class MetricSeries:
+    """
+    (コンポーネント, 指標)単位の固定長リングバッファと逐次統計
     
-    def __init__(self, health_monitor, port: int = 8080):
-        self.health_monitor = health_monitor
-        self.port = port
-        self.server = None
-        self.server_thread = None
-        self.is_running = False
+    追加はO(1)。EWMA・指数加重分散・傾き（1サンプルあたり変化量のEWMA）を逐次更新し、
+    追加時点の更新前EWMAからの偏差・更新前の指数加重標準偏差・前回値からの変化量を保持する。
+    """
+    __slots__ = ('capacity', 'alpha', 'values', 'timestamps', 'head', 'count',
+                 'ewma', 'ewm_var', 'slope', 'deviation', 'prior_std', 'change', 'latest')
+    
+    def __init__(self, capacity: int = 256, alpha: float = 0.2):
+        self.capacity = capacity
+        self.alpha = alpha
+        self.values = [0.0] * capacity
+        self.timestamps = [0.0] * capacity
+        self.head = 0
+        self.count = 0
+        self.ewma: Optional[float] = None
+        self.ewm_var = 0.0
+        self.slope = 0.0
+        self.deviation = 0.0
+        self.prior_std = 0.0
+        self.change = 0.0
+        self.latest: Optional[HealthMetric] = None
+    
+    def append(self, value: float, epoch_seconds: float):
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            previous_value = self.values[(self.head - 1) % self.capacity]
+            
+            # 偏差は更新前の分布に対して計算
+            self.deviation = value - self.ewma
+            self.prior_std = math.sqrt(self.ewm_var)
+            self.change = value - previous_value
+            self.slope = self.alpha * self.change + (1 - self.alpha) * self.slope
+            
+            diff = value - self.ewma
+            increment = self.alpha * diff
+            self.ewma += increment
+            self.ewm_var = (1 - self.alpha) * (self.ewm_var + diff * increment)
+        
+        self.values[self.head] = value
+        self.timestamps[self.head] = epoch_seconds
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    def zscore(self, std_floor: float = 1e-9) -> float:
+        """直近値のzスコア（更新前の標準偏差をstd_floorで下支え）"""
+        return self.deviation / max(self.prior_std, std_floor)
+    
+    def trend(self, higher_is_better: bool = False) -> str:
+        """
+        傾き（約3サンプル分の変化量）がEWMAの10%を超えたら変化ありとする
+        （従来の「直近5件の前後2件平均を±10%で比較」に相当）
+        """
+        if self.count < 3 or self.ewma is None:
+            return "STABLE"
+        change = self.slope * 3
+        scale = max(abs(self.ewma), 1e-9)
+        if change > scale * 0.1:
+            return "IMPROVING" if higher_is_better else "DEGRADING"
+        if change < -scale * 0.1:
+            return "DEGRADING" if higher_is_better else "IMPROVING"
+        return "STABLE"
+    
+    def recent(self, n: int) -> List[float]:
+        """直近n件（古い順）"""
+        n = min(n, self.count)
+        return [self.values[(self.head - n + i) % self.capacity] for i in range(n)]
+
+class ResourceSampler:
+    """
+    リソースサンプリングスレッド
+    
+    CPU使用率はpsutilの前回呼び出しからの差分（interval=None）で取得するため、
+    サンプリングがイベントループを止めることはない。結果はcall_soon_threadsafeで
+    監視側へ渡す。psutilが無い場合はシステム指標をNoneとし、プロセス指標のみ
+    標準ライブラリ（CPU時間・/proc/<pid>/fd）で取得する。
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_sample: Callable[[Dict[str, Any]], None],
+                 interval_seconds: float = 5.0):
+        self.loop = loop
+        self.on_sample = on_sample
+        self.interval_seconds = interval_seconds
+        self.processes: Dict[str, int] = {}
+        self._process_handles: Dict[int, Any] = {}
+        self._cpu_times: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        
+        try:
+            import psutil
+            self._psutil = psutil
+        except ImportError:
+            self._psutil = None
+            logger.warning("psutil not available, using mock system metrics")
+    
+    def register_process(self, label: str, pid: int):
+        """監視対象プロセス登録"""
+        with self._lock:
+            self.processes[label] = pid
+    
+    def unregister_process(self, label: str):
+        """監視対象プロセス登録解除"""
+        with self._lock:
+            pid = self.processes.pop(label, None)
+            self._process_handles.pop(pid, None)
+            self._cpu_times.pop(pid, None)
     
     def start(self):
-        """ダッシュボードサーバー開始"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval_seconds + 1)
+            self._thread = None
+    
+    def _run(self):
+        # CPU使用率の差分の基準点
         try:
-            self.server = HTTPServer(('localhost', self.port), self._create_request_handler())
-            self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-            self.server_thread.start()
-            self.is_running = True
-            logger.info(f"Dashboard server started on http://localhost:{self.port}")
-            
+            self._sample()
         except Exception as e:
-            logger.error(f"Dashboard server start error: {e}")
+            logger.error(f"Resource sampling error: {e}")
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                sample = self._sample()
+                self.loop.call_soon_threadsafe(self.on_sample, sample)
+            except RuntimeError:
+                # イベントループ終了済み
+                break
+            except Exception as e:
+                logger.error(f"Resource sampling error: {e}")
     
-    def stop(self):
-        """ダッシュボードサーバー停止"""
-        if self.server:
-            self.server.shutdown()
-            self.is_running = False
-            logger.info("Dashboard server stopped")
+    def _sample(self) -> Dict[str, Any]:
+        sample = {'timestamp': datetime.now(), 'system': None, 'processes': {}}
+        
+        if self._psutil is not None:
+            psutil = self._psutil
+            disk = psutil.disk_usage('/')
+            network = psutil.net_io_counters()
+            sample['system'] = {
+                'cpu_usage_percent': psutil.cpu_percent(interval=None),
+                'memory_usage_percent': psutil.virtual_memory().percent,
+                'disk_usage_percent': (disk.used / disk.total) * 100,
+                'network_bytes_sent': float(network.bytes_sent),
+                'network_bytes_recv': float(network.bytes_recv)
+            }
+        
+        with self._lock:
+            processes = dict(self.processes)
+        for label, pid in processes.items():
+            try:
+                sample['processes'][label] = self._sample_process(pid)
+            except Exception as e:
+                logger.debug(f"Process sampling error ({label}, pid={pid}): {e}")
+        
+        return sample
     
-    def _create_request_handler(self):
-        """リクエストハンドラー作成"""
-        health_monitor = self.health_monitor
+    def _sample_process(self, pid: int) -> Dict[str, float]:
+        """プロセス単位のCPU使用率・RSS・オープンFD数"""
+        if self._psutil is not None:
+            process = self._process_handles.get(pid)
+            if process is None:
+                process = self._psutil.Process(pid)
+                self._process_handles[pid] = process
+            with process.oneshot():
+                open_fds = process.num_fds() if hasattr(process, 'num_fds') else process.num_handles()
+                return {
+                    'process_cpu_percent': process.cpu_percent(interval=None),
+                    'process_rss_mb': process.memory_info().rss / (1024 * 1024),
+                    'process_open_fds': float(open_fds)
+                }
         
-        class DashboardHandler(BaseHTTPRequestHandler):
-            def do_GET(self):
-                try:
-                    if self.path == '/':
-                        self._serve_dashboard()
-                    elif self.path == '/api/health':
-                        self._serve_health_api()
-                    elif self.path == '/api/metrics':
-                        self._serve_metrics_api()
-                    elif self.path == '/api/alerts':
-                        self._serve_alerts_api()
-                    else:
-                        self._serve_404()
-                        
-                except Exception as e:
-                    logger.error(f"Dashboard request error: {e}")
-                    self._serve_500()
-            
-            def _serve_dashboard(self):
-                """ダッシュボードHTML提供"""
-                html_content = self._generate_dashboard_html()
-                self._send_response(200, html_content, 'text/html')
-            
-            def _serve_health_api(self):
-                """健全性API提供"""
-                health_data = asyncio.run(health_monitor.get_system_health_summary())
-                self._send_response(200, json.dumps(health_data, default=str), 'application/json')
-            
-            def _serve_metrics_api(self):
-                """指標API提供"""
-                metrics_data = asyncio.run(health_monitor.get_current_metrics())
-                self._send_response(200, json.dumps(metrics_data, default=str), 'application/json')
-            
-            def _serve_alerts_api(self):
-                """アラートAPI提供"""
-                alerts_data = asyncio.run(health_monitor.get_active_alerts())
-                self._send_response(200, json.dumps(alerts_data, default=str), 'application/json')
-            
-            def _serve_404(self):
-                self._send_response(404, "Not Found", 'text/plain')
-            
-            def _serve_500(self):
-                self._send_response(500, "Internal Server Error", 'text/plain')
-            
-            def _send_response(self, status_code: int, content: str, content_type: str):
-                self.send_response(status_code)
-                self.send_header('Content-type', content_type)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(content.encode())
-            
-            def _generate_dashboard_html(self) -> str:
-                """ダッシュボードHTML生成"""
-                return """
+        # psutil無し: 自プロセスのみCPU時間の差分から算出
+        metrics = {}
+        if pid == os.getpid():
+            now, cpu_time = time.monotonic(), time.process_time()
+            last = self._cpu_times.get(pid)
+            self._cpu_times[pid] = (now, cpu_time)
+            if last is not None and now > last[0]:
+                metrics['process_cpu_percent'] = (cpu_time - last[1]) / (now - last[0]) * 100
+        fd_dir = Path(f"/proc/{pid}/fd")
+        if fd_dir.exists():
+            metrics['process_open_fds'] = float(len(os.listdir(fd_dir)))
+        return metrics
+
+# ダッシュボードHTML（起動時に1回だけエンコードして配信）
+DASHBOARD_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -372,13 +537,256 @@ class DashboardServer:
     </script>
 </body>
 </html>
-                """
-            
-            def log_message(self, format, *args):
-                # ログ出力を抑制
-                pass
+"""
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """事前生成済みレスポンス（ETagは本文のハッシュ）"""
+    body: bytes
+    content_type: str
+    etag: str
+    
+    @classmethod
+    def build(cls, body: bytes, content_type: str) -> 'DashboardSnapshot':
+        return cls(body, content_type, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"')
+
+def _prometheus_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _prometheus_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+class DashboardServer:
+    """
+    リアルタイム監視ダッシュボードサーバー
+    
+    監視側のイベントループ上のasyncio HTTPサーバー。レスポンスは監視サイクル毎に
+    refresh()で事前生成したスナップショットを返すだけなので、リクエスト処理で
+    監視状態の集計・イベントループの生成は行わない。If-None-Matchが一致すれば304を返す。
+    
+    - /            ダッシュボードHTML
+    - /api/health  健全性サマリー（JSON）
+    - /api/metrics 現在のメトリクス（JSON）
+    - /api/alerts  アクティブアラート（JSON）
+    - /metrics     Prometheusテキスト形式
+    """
+    
+    MAX_REQUEST_HEAD_BYTES = 8192
+    JSON_CONTENT_TYPE = 'application/json'
+    PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    def __init__(self, health_monitor, port: int = 8080, host: str = 'localhost',
+                 max_connections: int = 64, keep_alive_timeout: float = 15.0):
+        self.health_monitor = health_monitor
+        self.port = port
+        self.host = host
+        self.max_connections = max_connections
+        self.keep_alive_timeout = keep_alive_timeout
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.is_running = False
+        
+        # パス → スナップショット（参照の差し替えのみで更新）
+        self.snapshots: Dict[str, DashboardSnapshot] = {
+            '/': DashboardSnapshot.build(DASHBOARD_HTML.encode(), 'text/html; charset=utf-8')
+        }
+        # 接続中のwriter → 処理タスク
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+    
+    async def start(self):
+        """ダッシュボードサーバー開始"""
+        try:
+            self.server = await asyncio.start_server(
+                self._handle_connection, self.host, self.port, limit=self.MAX_REQUEST_HEAD_BYTES
+            )
+            self.is_running = True
+            logger.info(f"Dashboard server started on http://{self.host}:{self.port}")
+        
+        except Exception as e:
+            logger.error(f"Dashboard server start error: {e}")
+    
+    async def stop(self):
+        """ダッシュボードサーバー停止（keep-alive接続も切断）"""
+        if self.server:
+            self.server.close()
+            tasks = list(self._connections.values())
+            for writer in list(self._connections):
+                writer.close()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+            self.is_running = False
+            logger.info("Dashboard server stopped")
+    
+    async def refresh(self):
+        """監視状態からスナップショットを再生成（監視サイクル毎に呼び出す）"""
+        health_monitor = self.health_monitor
+        health_data = await health_monitor.get_system_health_summary()
+        metrics_data = await health_monitor.get_current_metrics()
+        alerts_data = await health_monitor.get_active_alerts()
+        
+        snapshots = dict(self.snapshots)
+        for path, data in (('/api/health', health_data), ('/api/metrics', metrics_data),
+                           ('/api/alerts', alerts_data)):
+            snapshots[path] = DashboardSnapshot.build(
+                json.dumps(data, default=str).encode(), self.JSON_CONTENT_TYPE
+            )
+        snapshots['/metrics'] = DashboardSnapshot.build(
+            self._render_prometheus(health_data).encode(), self.PROMETHEUS_CONTENT_TYPE
+        )
+        self.snapshots = snapshots
+    
+    def _render_prometheus(self, health_data: Dict[str, Any]) -> str:
+        """Prometheusテキスト形式の生成"""
+        health_monitor = self.health_monitor
+        lines = [
+            '# HELP trading_health_metric_value Latest value of a monitored health metric',
+            '# TYPE trading_health_metric_value gauge'
+        ]
+        for (component, metric_name), series in sorted(health_monitor.metric_series.items()):
+            if series.latest is not None:
+                lines.append(
+                    f'trading_health_metric_value{{component="{_prometheus_label(component)}",'
+                    f'metric="{_prometheus_label(metric_name)}"}} '
+                    f'{_prometheus_value(series.latest.current_value)}'
+                )
+        
+        lines += [
+            '# HELP trading_component_health_score Component health score (0-1)',
+            '# TYPE trading_component_health_score gauge'
+        ]
+        for name, comp in sorted(health_monitor.component_health.items()):
+            lines.append(f'trading_component_health_score{{component="{_prometheus_label(name)}"}} '
+                         f'{_prometheus_value(comp.health_score)}')
+        
+        lines += [
+            '# HELP trading_component_status Component health status (1 for the current status)',
+            '# TYPE trading_component_status gauge'
+        ]
+        for name, comp in sorted(health_monitor.component_health.items()):
+            for status in HealthStatus:
+                lines.append(f'trading_component_status{{component="{_prometheus_label(name)}",'
+                             f'status="{status.value}"}} {int(comp.health_status == status)}')
+        
+        alert_counts = {level: 0 for level in AlertLevel}
+        for alert in health_monitor.active_alerts.values():
+            alert_counts[alert.alert_level] += 1
+        lines += [
+            '# HELP trading_active_alerts Active alerts by level',
+            '# TYPE trading_active_alerts gauge'
+        ]
+        for level, count in alert_counts.items():
+            lines.append(f'trading_active_alerts{{level="{level.value}"}} {count}')
+        
+        lines += [
+            '# HELP trading_health_monitor_uptime_seconds Health monitor uptime',
+            '# TYPE trading_health_monitor_uptime_seconds gauge',
+            f'trading_health_monitor_uptime_seconds '
+            f'{_prometheus_value(health_data.get("monitoring_uptime_seconds", 0.0))}'
+        ]
+        return '\n'.join(lines) + '\n'
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """1接続の処理（HTTP/1.1 keep-alive対応、GET/HEADのみ）"""
+        # 接続数上限を超えた分はkeep-aliveせず1リクエストで閉じる
+        allow_keep_alive = len(self._connections) < self.max_connections
+        self._connections[writer] = asyncio.current_task()
+        
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keep_alive_timeout)
+                except asyncio.LimitOverrunError:
+                    await self._send_response(writer, 431, keep_alive=False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                parts = request_line.split()
+                if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+                    await self._send_response(writer, 400, keep_alive=False)
+                    break
+                method, target, version = parts
+                
+                headers = {}
+                for line in header_lines:
+                    name, separator, value = line.partition(':')
+                    if separator:
+                        headers[name.strip().lower()] = value.strip()
+                
+                # リクエスト本文は読まないため、本文付きのリクエスト後は接続を閉じる
+                keep_alive = (
+                    allow_keep_alive
+                    and version == 'HTTP/1.1'
+                    and headers.get('connection', '').lower() != 'close'
+                    and 'content-length' not in headers
+                    and 'transfer-encoding' not in headers
+                )
+                
+                if method not in ('GET', 'HEAD'):
+                    await self._send_response(writer, 405, keep_alive=keep_alive,
+                                              extra_headers={'Allow': 'GET, HEAD'})
+                else:
+                    snapshot = self.snapshots.get(target.split('?', 1)[0])
+                    if snapshot is None:
+                        await self._send_response(writer, 404, keep_alive=keep_alive)
+                    elif self._etag_matches(headers.get('if-none-match'), snapshot.etag):
+                        await self._send_response(writer, 304, snapshot, keep_alive=keep_alive)
+                    else:
+                        await self._send_response(writer, 200, snapshot, keep_alive=keep_alive,
+                                                  include_body=(method == 'GET'))
+                
+                if not keep_alive:
+                    break
+        
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.error(f"Dashboard request error: {e}")
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+    
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in candidates or any(
+            (tag[2:] if tag.startswith('W/') else tag) == etag for tag in candidates
+        )
+    
+    async def _send_response(self, writer: asyncio.StreamWriter, status_code: int,
+                             snapshot: Optional[DashboardSnapshot] = None, keep_alive: bool = True,
+                             include_body: bool = True, extra_headers: Optional[Dict[str, str]] = None):
+        status = HTTPStatus(status_code)
+        if snapshot is None:
+            snapshot = DashboardSnapshot(status.phrase.encode(), 'text/plain; charset=utf-8', '')
+        
+        headers = {
+            'Content-Type': snapshot.content_type,
+            'Access-Control-Allow-Origin': '*',
+            'Connection': 'keep-alive' if keep_alive else 'close'
+        }
+        if snapshot.etag:
+            headers['ETag'] = snapshot.etag
+            headers['Cache-Control'] = 'no-cache'
+        if status_code != 304:
+            headers['Content-Length'] = str(len(snapshot.body))
+        if extra_headers:
+            headers.update(extra_headers)
         
-        return DashboardHandler
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + ''.join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        ) + "\r\n"
+        writer.write(head.encode('latin-1'))
+        if include_body and status_code != 304:
+            writer.write(snapshot.body)
+        await writer.drain()
 
 class HealthMonitor:
     """
@@ -420,17 +828,60 @@ class HealthMonitor:
         self.alert_queue = asyncio.Queue()
         self.active_alerts: Dict[str, SystemAlert] = {}
         self.component_health: Dict[str, ComponentHealth] = {}
-        self.metrics_history: Dict[str, List[HealthMetric]] = {}
+        self.metric_series: Dict[Tuple[str, str], MetricSeries] = {}
         self.alert_callbacks: List[Callable] = []
         
         # ダッシュボード
-        self.dashboard_server = DashboardServer(self, port=self.monitoring_config.get('dashboard_port', 8080))
+        self.dashboard_server = DashboardServer(
+            self,
+            port=self.monitoring_config.get('dashboard_port', 8080),
+            host=self.monitoring_config.get('dashboard_host', 'localhost'),
+            max_connections=self.monitoring_config.get('dashboard_max_connections', 64),
+            keep_alive_timeout=self.monitoring_config.get('dashboard_keep_alive_timeout', 15.0)
+        )
+        
+        # 指標ごとの逐次統計・ドリフト検知
+        anomaly_config = self.monitoring_config.get('anomaly_detection', {})
+        self.metric_series_capacity = anomaly_config.get('series_capacity', 256)
+        self.metric_ewma_alpha = anomaly_config.get('ewma_alpha', 0.2)
+        self.anomaly_min_samples = anomaly_config.get('min_samples', 20)
+        self.anomaly_zscore_threshold = anomaly_config.get('zscore_threshold', 4.0)
+        # 1サンプルの変化量が指数加重標準偏差のこの倍数以上なら異常
+        self.anomaly_change_sigmas = anomaly_config.get('change_sigmas', 6.0)
+        # 標準偏差の絶対下限（指標別、未定義の指標はdefault_floor）
+        self.anomaly_deviation_floors = {
+            **ANOMALY_DEVIATION_FLOORS, **anomaly_config.get('deviation_floors', {})
+        }
+        self.anomaly_default_floor = anomaly_config.get('default_floor', 1.0)
         
         # パフォーマンス追跡
         self.start_time = time.time()
         self.error_counts: Dict[str, int] = {}
         self.latency_samples: List[float] = []
         
+        # メトリクスバッファ（一定間隔・一定件数でまとめて書き込み）
+        self.metrics_flush_interval = self.monitoring_config.get('metrics_flush_interval', 10)
+        self.metrics_flush_size = self.monitoring_config.get('metrics_flush_size', 500)
+        retention_config = self.monitoring_config.get('metrics_retention', {})
+        self.metrics_retention = {
+            'health_metrics': timedelta(hours=retention_config.get('raw_hours', 24)),
+            'health_metrics_1m': timedelta(days=retention_config.get('minute_days', 7)),
+            'health_metrics_1h': timedelta(days=retention_config.get('hour_days', 90))
+        }
+        self.metrics_prune_interval = 3600
+        self._metric_rows: List[tuple] = []
+        self._availability_rows: List[tuple] = []
+        # (テーブル, コンポーネント, 指標, 区間開始) → [件数, 合計, 最小, 最大, 最新]
+        self._metric_rollups: Dict[Tuple[str, str, str, int], List[float]] = {}
+        self._metrics_flush_event = asyncio.Event()
+        self._metrics_flush_task = None
+        self._last_metrics_prune = 0.0
+        
+        # リソースサンプリング（別スレッド、initializeで開始）
+        self.resource_sample_interval = self.monitoring_config.get('resource_sample_interval', 5.0)
+        self.resource_sampler: Optional[ResourceSampler] = None
+        self._resource_sample: Optional[Dict[str, Any]] = None
+        
         logger.info("Health Monitor initialized")
     
     async def initialize(self):
@@ -444,12 +895,20 @@ class HealthMonitor:
             # コンポーネント登録
             await self._register_components()
             
+            # リソースサンプリング開始（全コンポーネントが動作する自プロセスを登録）
+            self.resource_sampler = ResourceSampler(
+                asyncio.get_running_loop(), self._on_resource_sample, self.resource_sample_interval
+            )
+            self.resource_sampler.register_process("trading_process", os.getpid())
+            self.resource_sampler.start()
+            
+            # ダッシュボード開始（監視タスク開始前に初回スナップショットを作成）
+            await self.dashboard_server.start()
+            await self.dashboard_server.refresh()
+            
             # 監視タスク開始
             await self._start_monitoring_tasks()
             
-            # ダッシュボード開始
-            self.dashboard_server.start()
-            
             self.is_running = True
             logger.info("Health Monitor initialized successfully")
             
@@ -460,7 +919,7 @@ class HealthMonitor:
     async def _initialize_monitoring_tables(self):
         """監視データベーステーブル初期化"""
         try:
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
+            async with get_connection_pool(self.db_manager.db_path).writer() as conn:
                 # 健全性メトリクステーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS health_metrics (
@@ -508,6 +967,37 @@ class HealthMonitor:
                     )
                 ''')
                 
+                # メトリクスロールアップテーブル（1分・1時間）
+                for table in METRIC_ROLLUPS:
+                    await conn.execute(f'''
+                        CREATE TABLE IF NOT EXISTS {table} (
+                            component_name TEXT NOT NULL,
+                            metric_name TEXT NOT NULL,
+                            bucket_epoch INTEGER NOT NULL,
+                            sample_count INTEGER NOT NULL,
+                            value_sum REAL NOT NULL,
+                            value_min REAL NOT NULL,
+                            value_max REAL NOT NULL,
+                            value_last REAL NOT NULL,
+                            PRIMARY KEY (component_name, metric_name, bucket_epoch)
+                        ) WITHOUT ROWID
+                    ''')
+                    await conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket_epoch)"
+                    )
+                
+                # 保持期間削除・履歴検索用インデックス
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_health_metrics_timestamp ON health_metrics(timestamp)"
+                )
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_health_metrics_component_metric
+                    ON health_metrics(component_name, metric_name, timestamp)
+                ''')
+                await conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_availability_history_timestamp ON availability_history(timestamp)"
+                )
+                
                 await conn.commit()
                 logger.info("Monitoring tables initialized")
                 
@@ -555,6 +1045,9 @@ class HealthMonitor:
             # アラート処理タスク
             asyncio.create_task(self._alert_processor())
             
+            # メトリクス書き込みタスク
+            self._metrics_flush_task = asyncio.create_task(self._metrics_flush_loop())
+            
             logger.info("Monitoring tasks started")
             
         except Exception as e:
@@ -579,50 +1072,65 @@ class HealthMonitor:
                 # 可用性記録
                 await self._record_availability()
                 
+                # ダッシュボード・APIのスナップショット更新
+                await self.dashboard_server.refresh()
+                
                 await asyncio.sleep(self.check_interval_seconds)
                 
             except Exception as e:
                 logger.error(f"Monitoring loop error: {e}")
                 await asyncio.sleep(5)
     
+    def _on_resource_sample(self, sample: Dict[str, Any]):
+        """サンプリングスレッドからの結果受け取り（イベントループ上で実行）"""
+        self._resource_sample = sample
+    
+    def register_component_process(self, component: str, pid: int):
+        """別プロセスで動作するコンポーネント（ワーカー等）のリソース監視登録"""
+        if self.resource_sampler:
+            self.resource_sampler.register_process(component, pid)
+    
+    def unregister_component_process(self, component: str):
+        """別プロセスのコンポーネントのリソース監視解除"""
+        if self.resource_sampler:
+            self.resource_sampler.unregister_process(component)
+    
     async def _check_system_resources(self):
-        """システムリソース監視"""
+        """
+        システムリソース監視
+        
+        サンプリングスレッドの最新結果を記録するだけで、ここでは計測しない。
+        """
         try:
-            timestamp = datetime.now()
+            sample = self._resource_sample
+            if sample is None:
+                return
+            timestamp = sample['timestamp']
             
-            # システムリソース監視（psutil代替実装）
-            try:
-                import psutil
+            system = sample['system']
+            if system is not None:
                 # CPU使用率
-                cpu_percent = psutil.cpu_percent(interval=1)
-                await self._record_metric("system", "cpu_usage_percent", cpu_percent, 
+                await self._record_metric("system", "cpu_usage_percent", system['cpu_usage_percent'],
                                         self.alert_thresholds['cpu_usage_warning'],
                                         self.alert_thresholds['cpu_usage_critical'], "%", timestamp)
                 
                 # メモリ使用率
-                memory = psutil.virtual_memory()
-                memory_percent = memory.percent
-                await self._record_metric("system", "memory_usage_percent", memory_percent,
+                await self._record_metric("system", "memory_usage_percent", system['memory_usage_percent'],
                                         self.alert_thresholds['memory_usage_warning'],
                                         self.alert_thresholds['memory_usage_critical'], "%", timestamp)
                 
                 # ディスク使用率
-                disk = psutil.disk_usage('/')
-                disk_percent = (disk.used / disk.total) * 100
-                await self._record_metric("system", "disk_usage_percent", disk_percent,
+                await self._record_metric("system", "disk_usage_percent", system['disk_usage_percent'],
                                         self.alert_thresholds['disk_usage_warning'],
                                         self.alert_thresholds['disk_usage_critical'], "%", timestamp)
                 
                 # ネットワーク統計
-                network = psutil.net_io_counters()
-                await self._record_metric("system", "network_bytes_sent", float(network.bytes_sent), 
+                await self._record_metric("system", "network_bytes_sent", system['network_bytes_sent'],
                                         None, None, "bytes", timestamp)
-                await self._record_metric("system", "network_bytes_recv", float(network.bytes_recv),
+                await self._record_metric("system", "network_bytes_recv", system['network_bytes_recv'],
                                         None, None, "bytes", timestamp)
-                        
-            except ImportError:
+            else:
                 # psutil が利用できない場合の代替実装
-                logger.warning("psutil not available, using mock metrics")
                 await self._record_metric("system", "cpu_usage_percent", 25.0, 
                                         self.alert_thresholds['cpu_usage_warning'],
                                         self.alert_thresholds['cpu_usage_critical'], "%", timestamp)
@@ -630,6 +1138,13 @@ class HealthMonitor:
                                         self.alert_thresholds['memory_usage_warning'],
                                         self.alert_thresholds['memory_usage_critical'], "%", timestamp)
             
+            # プロセス単位（CPU・RSS・FD数）
+            units = {'process_cpu_percent': "%", 'process_rss_mb': "MB", 'process_open_fds': "count"}
+            for component, metrics in sample['processes'].items():
+                for metric_name, value in metrics.items():
+                    await self._record_metric(component, metric_name, value,
+                                            None, None, units[metric_name], timestamp)
+            
         except Exception as e:
             logger.error(f"System resources check error: {e}")
     
@@ -722,11 +1237,17 @@ class HealthMonitor:
         try:
             metric_id = f"{component}_{metric_name}_{int(timestamp.timestamp())}"
             
-            # トレンド計算
-            trend = self._calculate_metric_trend(component, metric_name, value)
-            
-            # メトリクスオブジェクト作成
-            metric = HealthMetric(
+            # 逐次統計更新・トレンド計算
+            key = (component, metric_name)
+            series = self.metric_series.get(key)
+            if series is None:
+                series = MetricSeries(self.metric_series_capacity, self.metric_ewma_alpha)
+                self.metric_series[key] = series
+            series.append(value, timestamp.timestamp())
+            trend = series.trend(higher_is_better=metric_name.endswith("score"))
+            
+            # 最新値
+            series.latest = HealthMetric(
                 metric_name=f"{component}.{metric_name}",
                 current_value=value,
                 threshold_warning=warning_threshold or 0.0,
@@ -736,71 +1257,165 @@ class HealthMonitor:
                 trend=trend
             )
             
-            # 履歴に追加
-            if component not in self.metrics_history:
-                self.metrics_history[component] = []
-            self.metrics_history[component].append(metric)
-            
-            # 履歴サイズ制限
-            if len(self.metrics_history[component]) > 1000:
-                self.metrics_history[component] = self.metrics_history[component][-1000:]
-            
-            # データベース記録
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO health_metrics (
-                        metric_id, timestamp, component_name, metric_name,
-                        metric_value, threshold_warning, threshold_critical,
-                        unit, trend
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    metric_id, timestamp.isoformat(), component, metric_name,
-                    value, warning_threshold, critical_threshold, unit, trend
-                ))
-                await conn.commit()
+            # データベース記録（バッファ経由）
+            self._metric_rows.append((
+                metric_id, timestamp.isoformat(), component, metric_name,
+                value, warning_threshold, critical_threshold, unit, trend
+            ))
+            self._accumulate_rollups(component, metric_name, value, timestamp)
+            if len(self._metric_rows) >= self.metrics_flush_size:
+                self._metrics_flush_event.set()
             
         except Exception as e:
             logger.error(f"Metric recording error: {e}")
     
-    def _calculate_metric_trend(self, component: str, metric_name: str, current_value: float) -> str:
-        """メトリクストレンド計算"""
-        try:
-            if component in self.metrics_history:
-                recent_metrics = [m for m in self.metrics_history[component] 
-                                if m.metric_name.endswith(metric_name)][-5:]  # 最新5件
+    def _accumulate_rollups(self, component: str, metric_name: str, value: float, timestamp: datetime):
+        """1分・1時間の集計区間へ加算"""
+        epoch = timestamp_to_epoch(timestamp)
+        for table, bucket_seconds in METRIC_ROLLUPS.items():
+            key = (table, component, metric_name, epoch - epoch % bucket_seconds)
+            bucket = self._metric_rollups.get(key)
+            if bucket is None:
+                self._metric_rollups[key] = [1, value, value, value, value]
+            else:
+                bucket[0] += 1
+                bucket[1] += value
+                bucket[2] = min(bucket[2], value)
+                bucket[3] = max(bucket[3], value)
+                bucket[4] = value
+    
+    async def _flush_metrics(self):
+        """
+        バッファのメトリクス・可用性・ロールアップを書き込み
+        
+        各executemanyを同時に送信し、書き込みキューの1トランザクションにまとめる。
+        ロールアップは区間の途中でも書き込み、次回のフラッシュで加算する。
+        """
+        metric_rows, self._metric_rows = self._metric_rows, []
+        availability_rows, self._availability_rows = self._availability_rows, []
+        rollups, self._metric_rollups = self._metric_rollups, {}
+        
+        ingest = get_ingest_queue(self.db_manager.db_path)
+        writes = []
+        if metric_rows:
+            writes.append(ingest.executemany(METRIC_INSERT_SQL, metric_rows, lane=WriteLane.BULK))
+        if availability_rows:
+            writes.append(ingest.executemany(AVAILABILITY_INSERT_SQL, availability_rows, lane=WriteLane.BULK))
+        for table in METRIC_ROLLUPS:
+            rows = [
+                (component, metric_name, bucket_epoch, *values)
+                for (rollup_table, component, metric_name, bucket_epoch), values in rollups.items()
+                if rollup_table == table
+            ]
+            if rows:
+                writes.append(ingest.executemany(ROLLUP_UPSERT_SQL.format(table=table), rows,
+                                                 lane=WriteLane.BULK))
+        
+        for result in await asyncio.gather(*writes, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Metrics flush error: {result}")
+    
+    async def _prune_metrics(self):
+        """解像度ごとの保持期間を過ぎたメトリクス削除"""
+        now = datetime.now()
+        async with get_connection_pool(self.db_manager.db_path).writer() as conn:
+            await conn.execute(
+                "DELETE FROM health_metrics WHERE timestamp < ?",
+                ((now - self.metrics_retention['health_metrics']).isoformat(),)
+            )
+            await conn.execute(
+                "DELETE FROM availability_history WHERE timestamp < ?",
+                ((now - self.metrics_retention['health_metrics']).isoformat(),)
+            )
+            for table in METRIC_ROLLUPS:
+                await conn.execute(
+                    f"DELETE FROM {table} WHERE bucket_epoch < ?",
+                    (timestamp_to_epoch(now - self.metrics_retention[table]),)
+                )
+            await conn.commit()
+    
+    async def _metrics_flush_loop(self):
+        """メトリクス書き込みループ（flush_interval秒毎、またはバッファがflush_size件に達した時）"""
+        while self.is_running:
+            try:
+                try:
+                    await asyncio.wait_for(self._metrics_flush_event.wait(),
+                                           timeout=self.metrics_flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._metrics_flush_event.clear()
+                await self._flush_metrics()
                 
-                if len(recent_metrics) >= 3:
-                    values = [m.current_value for m in recent_metrics]
-                    avg_old = sum(values[:2]) / 2
-                    avg_new = sum(values[-2:]) / 2
+                if time.time() - self._last_metrics_prune >= self.metrics_prune_interval:
+                    await self._prune_metrics()
+                    self._last_metrics_prune = time.time()
                     
-                    if avg_new > avg_old * 1.1:
-                        return "IMPROVING" if metric_name.endswith("score") else "DEGRADING"
-                    elif avg_new < avg_old * 0.9:
-                        return "DEGRADING" if metric_name.endswith("score") else "IMPROVING"
-            
-            return "STABLE"
-            
-        except Exception:
-            return "STABLE"
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Metrics flush loop error: {e}")
+    
+    async def get_metric_history(self, component: str, metric_name: str, since: datetime,
+                                 until: Optional[datetime] = None, max_points: int = 1000) -> Dict[str, Any]:
+        """
+        メトリクス履歴取得
+        
+        保持期間内でmax_points以下に収まる最も細かい解像度（生データ → 1分 → 1時間）を選ぶ。
+        長期間の検索はロールアップのみを読む。
+        """
+        until = until or datetime.now()
+        span_seconds = max(1.0, (until - since).total_seconds())
+        now = datetime.now()
+        resolutions = [('health_metrics', self.check_interval_seconds)] + list(METRIC_ROLLUPS.items())
+        for table, bucket_seconds in resolutions:
+            if since >= now - self.metrics_retention[table] and span_seconds / bucket_seconds <= max_points:
+                break
+        
+        # 未書き込み分を反映してから検索
+        await self._flush_metrics()
+        
+        points = []
+        async with get_connection_pool(self.db_manager.db_path).reader() as conn:
+            if table == 'health_metrics':
+                cursor = await conn.execute('''
+                    SELECT timestamp, metric_value FROM health_metrics
+                    WHERE component_name = ? AND metric_name = ? AND timestamp >= ? AND timestamp < ?
+                    ORDER BY timestamp
+                ''', (component, metric_name, since.isoformat(), until.isoformat()))
+                for timestamp, value in await cursor.fetchall():
+                    points.append({'timestamp': timestamp, 'value': value, 'min': value,
+                                   'max': value, 'count': 1})
+            else:
+                cursor = await conn.execute(f'''
+                    SELECT bucket_epoch, sample_count, value_sum, value_min, value_max FROM {table}
+                    WHERE component_name = ? AND metric_name = ? AND bucket_epoch >= ? AND bucket_epoch < ?
+                    ORDER BY bucket_epoch
+                ''', (component, metric_name,
+                      timestamp_to_epoch(since) - timestamp_to_epoch(since) % bucket_seconds,
+                      timestamp_to_epoch(until)))
+                for bucket_epoch, count, value_sum, value_min, value_max in await cursor.fetchall():
+                    points.append({
+                        'timestamp': (datetime(1970, 1, 1) + timedelta(seconds=bucket_epoch)).isoformat(),
+                        'value': value_sum / count, 'min': value_min, 'max': value_max, 'count': count
+                    })
+        
+        return {
+            'component': component,
+            'metric_name': metric_name,
+            'resolution': table,
+            'points': points
+        }
     
     async def _update_component_availability(self, component_name: str, is_available: bool, timestamp: datetime):
         """コンポーネント可用性更新"""
         try:
-            # 可用性記録
+            # 可用性記録（バッファ経由）
             availability_id = f"{component_name}_availability_{int(timestamp.timestamp())}"
             
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO availability_history (
-                        availability_id, timestamp, component_name, is_available,
-                        check_duration_ms
-                    ) VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    availability_id, timestamp.isoformat(), component_name,
-                    is_available, 50.0  # 簡略実装
-                ))
-                await conn.commit()
+            self._availability_rows.append((
+                availability_id, timestamp.isoformat(), component_name,
+                is_available, 50.0  # 簡略実装
+            ))
             
             # コンポーネント健全性更新
             if component_name in self.component_health:
@@ -833,31 +1448,38 @@ class HealthMonitor:
         try:
             timestamp = datetime.now()
             
-            # 各コンポーネントの最新メトリクスをチェック
-            for component_name, metrics_list in self.metrics_history.items():
-                if not metrics_list:
+            # 各指標の最新値をチェック
+            for (component_name, metric_key), series in self.metric_series.items():
+                metric = series.latest
+                if metric is None:
                     continue
                 
-                latest_metrics = metrics_list[-1:]  # 最新のメトリクス
+                # クリティカルアラート
+                if (metric.threshold_critical > 0 and 
+                    metric.current_value >= metric.threshold_critical):
+                    await self._create_alert(
+                        component_name, AlertLevel.CRITICAL, 
+                        f"Critical threshold exceeded: {metric.metric_name} = {metric.current_value:.2f}{metric.unit}",
+                        metric.metric_name, metric.current_value, metric.threshold_critical
+                    )
+                
+                # 警告アラート
+                elif (metric.threshold_warning > 0 and 
+                      metric.current_value >= metric.threshold_warning):
+                    await self._create_alert(
+                        component_name, AlertLevel.WARNING,
+                        f"Warning threshold exceeded: {metric.metric_name} = {metric.current_value:.2f}{metric.unit}",
+                        metric.metric_name, metric.current_value, metric.threshold_warning
+                    )
                 
-                for metric in latest_metrics:
-                    # クリティカルアラート
-                    if (metric.threshold_critical > 0 and 
-                        metric.current_value >= metric.threshold_critical):
-                        await self._create_alert(
-                            component_name, AlertLevel.CRITICAL, 
-                            f"Critical threshold exceeded: {metric.metric_name} = {metric.current_value:.2f}{metric.unit}",
-                            metric.metric_name, metric.current_value, metric.threshold_critical
-                        )
-                    
-                    # 警告アラート
-                    elif (metric.threshold_warning > 0 and 
-                          metric.current_value >= metric.threshold_warning):
-                        await self._create_alert(
-                            component_name, AlertLevel.WARNING,
-                            f"Warning threshold exceeded: {metric.metric_name} = {metric.current_value:.2f}{metric.unit}",
-                            metric.metric_name, metric.current_value, metric.threshold_warning
-                        )
+                # ドリフト検知（閾値未満でも通常の変動幅から外れた値）
+                anomaly = self._detect_anomaly(metric_key, series)
+                if anomaly:
+                    await self._create_alert(
+                        component_name, AlertLevel.WARNING,
+                        f"Anomaly detected: {metric.metric_name} = {metric.current_value:.2f}{metric.unit} ({anomaly})",
+                        f"{metric.metric_name}.anomaly", metric.current_value, series.ewma
+                    )
             
             # 古いアラートの自動解決
             await self._auto_resolve_alerts()
@@ -865,6 +1487,22 @@ class HealthMonitor:
         except Exception as e:
             logger.error(f"Alert evaluation error: {e}")
     
+    def _detect_anomaly(self, metric_name: str, series: MetricSeries) -> Optional[str]:
+        """
+        zスコア・1サンプルの変化量による異常判定（累積カウンタとサンプル不足の指標は対象外）
+        
+        いずれも指数加重標準偏差を基準とし、標準偏差は指標別の絶対下限で下支えする。
+        """
+        if metric_name in CUMULATIVE_METRICS or series.count < self.anomaly_min_samples:
+            return None
+        std_floor = self.anomaly_deviation_floors.get(metric_name, self.anomaly_default_floor)
+        zscore = series.zscore(std_floor)
+        if abs(zscore) >= self.anomaly_zscore_threshold:
+            return f"z-score {zscore:+.1f}"
+        if abs(series.change) >= max(series.prior_std, std_floor) * self.anomaly_change_sigmas:
+            return f"changed {series.change:+.2f} in one sample"
+        return None
+    
     async def _create_alert(self, component: str, level: AlertLevel, message: str,
                           metric_name: str, current_value: float, threshold_value: float):
         """アラート作成"""
@@ -914,13 +1552,11 @@ class HealthMonitor:
                     resolved_alerts.append(key)
                     
                     # データベース更新
-                    async with aiosqlite.connect(self.db_manager.db_path) as conn:
-                        await conn.execute('''
-                            UPDATE system_alerts 
-                            SET auto_resolved = 1, resolution_time = ?
-                            WHERE alert_id = ?
-                        ''', (current_time.isoformat(), alert.alert_id))
-                        await conn.commit()
+                    await get_ingest_queue(self.db_manager.db_path).execute('''
+                        UPDATE system_alerts 
+                        SET auto_resolved = 1, resolution_time = ?
+                        WHERE alert_id = ?
+                    ''', (current_time.isoformat(), alert.alert_id), lane=WriteLane.NORMAL)
             
             # 解決済みアラート削除
             for key in resolved_alerts:
@@ -932,19 +1568,17 @@ class HealthMonitor:
     async def _save_alert_to_db(self, alert: SystemAlert):
         """アラートデータベース保存"""
         try:
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO system_alerts (
-                        alert_id, timestamp, component, alert_level, message,
-                        metric_name, current_value, threshold_value, auto_resolved
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    alert.alert_id, alert.timestamp.isoformat(), alert.component,
-                    alert.alert_level.value, alert.message, alert.metric_name,
-                    alert.current_value, alert.threshold_value, alert.auto_resolved
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_manager.db_path).execute('''
+                INSERT INTO system_alerts (
+                    alert_id, timestamp, component, alert_level, message,
+                    metric_name, current_value, threshold_value, auto_resolved
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                alert.alert_id, alert.timestamp.isoformat(), alert.component,
+                alert.alert_level.value, alert.message, alert.metric_name,
+                alert.current_value, alert.threshold_value, alert.auto_resolved
+            ), lane=WriteLane.NORMAL)
+            
         except Exception as e:
             logger.error(f"Alert database save error: {e}")
     
@@ -1030,16 +1664,9 @@ class HealthMonitor:
         try:
             metrics_summary = {}
             
-            for component, metrics_list in self.metrics_history.items():
-                if metrics_list:
-                    latest_metrics = metrics_list[-5:]  # 最新5件
-                    component_metrics = {}
-                    
-                    for metric in latest_metrics:
-                        metric_key = metric.metric_name.split('.')[-1]
-                        component_metrics[metric_key] = metric.current_value
-                    
-                    metrics_summary[component] = component_metrics
+            for (component, metric_key), series in self.metric_series.items():
+                if series.latest is not None:
+                    metrics_summary.setdefault(component, {})[metric_key] = series.latest.current_value
             
             return metrics_summary
             
@@ -1084,8 +1711,22 @@ class HealthMonitor:
             if self.monitoring_task:
                 self.monitoring_task.cancel()
             
+            # リソースサンプリング停止
+            if self.resource_sampler:
+                self.resource_sampler.stop()
+            
+            # メトリクス書き込みタスク停止（残りのバッファを書き込み）
+            if self._metrics_flush_task:
+                self._metrics_flush_task.cancel()
+                try:
+                    await self._metrics_flush_task
+                except asyncio.CancelledError:
+                    pass
+                self._metrics_flush_task = None
+            await self._flush_metrics()
+            
             # ダッシュボード停止
-            self.dashboard_server.stop()
+            await self.dashboard_server.stop()
             
             logger.info("Health Monitor stopped successfully")
             
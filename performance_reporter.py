@@ -13,7 +13,6 @@ kiro設計tasks.md:151-157準拠 - P&L計算精度向上・PositionTracker連携
 import asyncio
 import json
 import logging
-import aiosqlite
 import time
 import os
 from datetime import datetime, timedelta, timezone
@@ -27,13 +26,30 @@ from pathlib import Path
 # 既存システム統合
 sys.path.append(str(Path(__file__).parent))
 from realtime_signal_generator import SystemConstants, get_config_value, CONFIG
-from database_manager import DatabaseManager
+from database_pool import get_connection_pool
+from database_manager import DatabaseManager, timestamp_to_epoch
 from position_management import PositionTracker
 from risk_management import RiskManager
 
 # ログ設定
 logger = logging.getLogger(__name__)
 
+# 決済済みポジションP&L集計（idx_trade_executions_status_epochのみで解決するカバリングクエリ）
+CLOSED_POSITIONS_PNL_QUERY = '''
+    SELECT 
+        symbol,
+        SUM(CASE WHEN action = 'BUY' THEN executed_quantity ELSE -executed_quantity END) as net_quantity,
+        AVG(CASE WHEN action = 'BUY' THEN executed_price ELSE NULL END) as avg_buy_price,
+        AVG(CASE WHEN action = 'SELL' THEN executed_price ELSE NULL END) as avg_sell_price,
+        SUM(commission) as total_commission,
+        COUNT(*) as trade_count
+    FROM trade_executions 
+    WHERE execution_status = 'EXECUTED'
+    AND timestamp_epoch >= ? AND timestamp_epoch < ?
+    GROUP BY symbol
+    HAVING ABS(net_quantity) < 0.01
+'''
+
 # matplotlib/pandas はオプショナル
 try:
     import matplotlib
@@ -202,7 +218,7 @@ class PerformanceReporter:
     async def _initialize_report_tables(self):
         """レポート管理テーブル初期化"""
         try:
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
+            async with get_connection_pool(self.db_manager.db_path).writer() as conn:
                 # 生成レポート履歴テーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS performance_reports (
@@ -475,22 +491,11 @@ class PerformanceReporter:
         try:
             pnl_values = []
             
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
+            async with get_connection_pool(self.db_manager.db_path).reader() as conn:
                 # 決済済みポジションのP&L計算（BUY/SELLペア）
-                cursor = await conn.execute('''
-                    SELECT 
-                        symbol,
-                        SUM(CASE WHEN action = 'BUY' THEN executed_quantity ELSE -executed_quantity END) as net_quantity,
-                        AVG(CASE WHEN action = 'BUY' THEN executed_price ELSE NULL END) as avg_buy_price,
-                        AVG(CASE WHEN action = 'SELL' THEN executed_price ELSE NULL END) as avg_sell_price,
-                        SUM(commission) as total_commission,
-                        COUNT(*) as trade_count
-                    FROM trade_executions 
-                    WHERE timestamp >= ? AND timestamp < ? 
-                    AND execution_status = 'EXECUTED'
-                    GROUP BY symbol
-                    HAVING ABS(net_quantity) < 0.01
-                ''', (start.isoformat(), end.isoformat()))
+                cursor = await conn.execute(
+                    CLOSED_POSITIONS_PNL_QUERY, (timestamp_to_epoch(start), timestamp_to_epoch(end))
+                )
                 
                 closed_positions = await cursor.fetchall()
                 
@@ -105,6 +105,9 @@ class IntegratedTradingSystem:
             # 市場データ更新をポジション追跡に転送
             self.signal_system.market_feed.subscribe(self._on_market_data_received)
             
+            # 市場データをボラティリティエンジンに転送
+            self.signal_system.market_feed.subscribe(self.risk_manager.on_market_data)
+            
             logger.info("System integration configured")
             
         except Exception as e:
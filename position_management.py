@@ -12,18 +12,20 @@ import asyncio
 import json
 import time
 import logging
-import aiosqlite
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable
 from enum import Enum
 import sys
+import uuid
+from collections import deque
 from pathlib import Path
 
 # 既存システム統合
 sys.path.append(str(Path(__file__).parent))
 from realtime_signal_generator import SystemConstants, get_config_value, calculate_time_diff_seconds, CONFIG
-from communication.tcp_bridge import TCPBridge
+from database_pool import get_connection_pool, get_ingest_queue, WriteLane
+from communication.tcp_bridge import TCPBridge, TradingMessage, MessageType, ConnectionState
 from communication.file_bridge import FileBridge
 
 # ログ設定
@@ -123,6 +125,137 @@ class Position:
             data['exit_time'] = self.exit_time.isoformat()
         return data
 
+class PositionBook:
+    """
+    ポジションブック - シンボル・状態別インデックスと増分集計
+    
+    アクティブポジションをシンボル別・OPEN状態別に索引し、
+    未実現/実現損益・勝敗数・エクスポージャーを変更時に差分更新する。
+    集計値の参照はポジション数・履歴長に依存しないO(1)。
+    """
+    
+    def __init__(self):
+        self.positions: Dict[str, Position] = {}
+        self._by_symbol: Dict[str, Dict[str, Position]] = {}
+        self._open_by_symbol: Dict[str, Dict[str, Position]] = {}
+        
+        # 増分集計
+        self._unrealized: Dict[str, float] = {}
+        self._unrealized_by_symbol: Dict[str, float] = {}
+        self._exposure_by_symbol: Dict[str, float] = {}
+        self.unrealized_total = 0.0
+        self.realized_total = 0.0
+        self.winning_count = 0
+        self.losing_count = 0
+        self.closed_count = 0
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    @staticmethod
+    def _signed_quantity(position: Position) -> float:
+        if position.position_type == PositionType.SELL:
+            return -position.quantity
+        return position.quantity
+    
+    def _index_open(self, position: Position):
+        """OPENインデックス・集計へ追加"""
+        symbol = position.symbol
+        self._open_by_symbol.setdefault(symbol, {})[position.position_id] = position
+        self._exposure_by_symbol[symbol] = (
+            self._exposure_by_symbol.get(symbol, 0.0) + self._signed_quantity(position)
+        )
+        self._set_unrealized(position, position.calculate_unrealized_pnl())
+    
+    def _unindex_open(self, position: Position):
+        """OPENインデックス・集計から除外"""
+        symbol = position.symbol
+        bucket = self._open_by_symbol.get(symbol)
+        if not bucket or position.position_id not in bucket:
+            return
+        del bucket[position.position_id]
+        if not bucket:
+            del self._open_by_symbol[symbol]
+        self._exposure_by_symbol[symbol] -= self._signed_quantity(position)
+        self._set_unrealized(position, None)
+    
+    def _set_unrealized(self, position: Position, value: Optional[float]):
+        """ポジション単位の未実現損益を差し替え、合計に差分反映"""
+        previous = self._unrealized.pop(position.position_id, 0.0)
+        delta = (value or 0.0) - previous
+        if value is not None:
+            self._unrealized[position.position_id] = value
+        self.unrealized_total += delta
+        self._unrealized_by_symbol[position.symbol] = (
+            self._unrealized_by_symbol.get(position.symbol, 0.0) + delta
+        )
+    
+    def add(self, position: Position):
+        """アクティブポジション追加"""
+        self.positions[position.position_id] = position
+        self._by_symbol.setdefault(position.symbol, {})[position.position_id] = position
+        if position.status == PositionStatus.OPEN:
+            self._index_open(position)
+    
+    def set_status(self, position: Position, status: PositionStatus):
+        """状態変更（インデックス追従）"""
+        was_open = position.position_id in self._open_by_symbol.get(position.symbol, {})
+        position.status = status
+        if status == PositionStatus.OPEN and not was_open:
+            self._index_open(position)
+        elif status != PositionStatus.OPEN and was_open:
+            self._unindex_open(position)
+    
+    def remove(self, position_id: str) -> Optional[Position]:
+        """アクティブポジション除外"""
+        position = self.positions.pop(position_id, None)
+        if position is None:
+            return None
+        self._unindex_open(position)
+        bucket = self._by_symbol.get(position.symbol)
+        if bucket is not None:
+            bucket.pop(position_id, None)
+            if not bucket:
+                del self._by_symbol[position.symbol]
+        return position
+    
+    def record_closed(self, position: Position) -> float:
+        """決済済みポジションの実現損益を集計へ反映"""
+        realized_pnl = position.calculate_realized_pnl()
+        self.realized_total += realized_pnl
+        self.closed_count += 1
+        if realized_pnl > 0:
+            self.winning_count += 1
+        else:
+            self.losing_count += 1
+        return realized_pnl
+    
+    def is_open(self, position_id: str) -> bool:
+        """OPEN状態のアクティブポジションか"""
+        position = self.positions.get(position_id)
+        return position is not None and position.status == PositionStatus.OPEN
+    
+    def mark_price(self, symbol: str, current_price: float) -> List[Tuple[Position, float]]:
+        """シンボルのOPENポジションを時価評価（対象のみ走査）"""
+        marked = []
+        for position in self._open_by_symbol.get(symbol, {}).values():
+            unrealized_pnl = position.calculate_unrealized_pnl(current_price)
+            self._set_unrealized(position, unrealized_pnl)
+            marked.append((position, unrealized_pnl))
+        return marked
+    
+    def positions_for_symbol(self, symbol: str) -> List[Position]:
+        return list(self._by_symbol.get(symbol, {}).values())
+    
+    def open_positions_for_symbol(self, symbol: str) -> List[Position]:
+        return list(self._open_by_symbol.get(symbol, {}).values())
+    
+    def exposure(self, symbol: str) -> float:
+        return self._exposure_by_symbol.get(symbol, 0.0)
+    
+    def unrealized_for_symbol(self, symbol: str) -> float:
+        return self._unrealized_by_symbol.get(symbol, 0.0)
+
 class PositionTracker:
     """
     ポジション追跡システム - kiro設計tasks.md:93-99準拠
@@ -130,13 +263,16 @@ class PositionTracker:
     """
     
     def __init__(self):
-        self.active_positions: Dict[str, Position] = {}
-        self.position_history: List[Position] = []
-        self.is_running = False
-        
         # 設定読み込み
         self.config = CONFIG
         
+        # ポジションブック（active_positionsはブック内辞書への参照、変更はブック経由）
+        self.book = PositionBook()
+        self.active_positions: Dict[str, Position] = self.book.positions
+        history_limit = get_config_value(self.config, 'position_management.history_limit', 10000)
+        self.position_history = deque(maxlen=history_limit)
+        self.is_running = False
+        
         # 通信ブリッジ初期化
         comm_config = self.config.get('communication', {})
         self.tcp_bridge = TCPBridge(
@@ -151,12 +287,25 @@ class PositionTracker:
         self.db_path = self.config.get('database', {}).get('path', './positions.db')
         self._db_initialized = False
         
+        # 時価評価の書き込み集約（position_id → (current_price, unrealized_pnl, updated_at)）
+        self._pending_price_updates: Dict[str, Tuple[float, float, str]] = {}
+        self.price_flush_interval = get_config_value(
+            self.config, 'position_management.price_flush_interval', 1.0)
+        self.price_flush_task: Optional[asyncio.Task] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        
+        # 価格更新・ポジション状態変化の通知先（保護ストップ監視等）
+        self.price_listeners: List[Callable] = []
+        self.position_listeners: List[Callable] = []
+        
         # 統計情報
         self.stats = {
             'total_positions': 0,
             'winning_positions': 0,
             'losing_positions': 0,
             'total_pnl': 0.0,
+            'realized_pnl': 0.0,
+            'unrealized_pnl': 0.0,
             'max_drawdown': 0.0,
             'current_drawdown': 0.0
         }
@@ -172,7 +321,18 @@ class PositionTracker:
         
         # 通信接続
         try:
+            # MT4からの約定通知（チケット番号の記録・PENDING→OPEN）
+            loop = asyncio.get_running_loop()
+            self.tcp_bridge.register_message_handler(
+                MessageType.POSITION_UPDATE, self._on_mt4_position_update)
+            self.file_bridge.register_message_handler(
+                MessageType.POSITION_UPDATE,
+                lambda message: asyncio.run_coroutine_threadsafe(
+                    self._on_mt4_position_update(message), loop))
+            self.file_bridge.start()
+            
             if await self.tcp_bridge.connect():
+                self._listen_task = asyncio.create_task(self.tcp_bridge.start_listening())
                 logger.info("Position tracker TCP connected")
             else:
                 logger.warning("TCP connection failed, using file bridge")
@@ -183,12 +343,16 @@ class PositionTracker:
         await self._restore_positions()
         
         self.is_running = True
+        
+        # 時価評価の定期フラッシュ開始
+        self.price_flush_task = asyncio.create_task(self._price_flush_loop())
+        
         logger.info("Position Tracker initialized successfully")
     
     async def _init_database(self):
         """ポジション管理データベース初期化"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 # ポジションテーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS positions (
@@ -245,7 +409,7 @@ class PositionTracker:
     async def _restore_positions(self):
         """システム再起動時のポジション復元"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).reader() as conn:
                 # アクティブポジション復元
                 cursor = await conn.execute('''
                     SELECT * FROM positions 
@@ -257,7 +421,8 @@ class PositionTracker:
                 
                 for row in rows:
                     position = self._row_to_position(row)
-                    self.active_positions[position.position_id] = position
+                    self.book.add(position)
+                    self._notify_position_listeners(position)
                     logger.info(f"Restored position: {position.position_id} ({position.symbol})")
                 
                 # 統計情報復元
@@ -325,7 +490,7 @@ class PositionTracker:
             await self._send_position_to_mt4(position, 'OPEN')
             
             # ローカル追加
-            self.active_positions[position_id] = position
+            self.book.add(position)
             
             # データベース保存
             await self._save_position(position)
@@ -339,8 +504,9 @@ class PositionTracker:
             raise
     
     async def close_position(self, position_id: str, exit_price: float, 
-                           commission: float = 0.0, swap: float = 0.0) -> Optional[Position]:
-        """ポジション決済"""
+                           commission: float = 0.0, swap: float = 0.0,
+                           notify_mt4: bool = True) -> Optional[Position]:
+        """ポジション決済（notify_mt4=Falseは一括決済通知済みの場合）"""
         try:
             if position_id not in self.active_positions:
                 logger.warning(f"Position not found: {position_id}")
@@ -353,17 +519,21 @@ class PositionTracker:
             position.exit_time = datetime.now()
             position.commission = commission
             position.swap = swap
-            position.status = PositionStatus.CLOSED
+            self.book.set_status(position, PositionStatus.CLOSED)
             
             # 実現損益計算
             realized_pnl = position.calculate_realized_pnl()
             
             # MT4に決済通知
-            await self._send_position_to_mt4(position, 'CLOSE')
+            if notify_mt4:
+                await self._send_position_to_mt4(position, 'CLOSE')
             
-            # アクティブリストから削除・履歴に追加
-            del self.active_positions[position_id]
+            # アクティブリストから削除・履歴に追加（未反映の時価評価は破棄）
+            self._pending_price_updates.pop(position_id, None)
+            self.book.remove(position_id)
+            self.book.record_closed(position)
             self.position_history.append(position)
+            self._notify_position_listeners(position)
             
             # データベース更新
             await self._save_position(position)
@@ -379,59 +549,164 @@ class PositionTracker:
             logger.error(f"Position closing error: {e}")
             return None
     
+    async def mark_position_open(self, position_id: str, fill_price: Optional[float] = None,
+                                 mt4_ticket: Optional[int] = None) -> Optional[Position]:
+        """約定確認によるPENDING→OPEN遷移"""
+        position = self.active_positions.get(position_id)
+        if position is None:
+            logger.warning(f"Position not found: {position_id}")
+            return None
+        
+        if fill_price is not None:
+            position.entry_price = fill_price
+            position.current_price = fill_price
+        if mt4_ticket is not None:
+            position.mt4_ticket = mt4_ticket
+        
+        self.book.set_status(position, PositionStatus.OPEN)
+        self._refresh_statistics()
+        self._notify_position_listeners(position)
+        await self._save_position(position)
+        
+        return position
+    
+    async def _on_mt4_position_update(self, message: TradingMessage):
+        """MT4からの約定通知（OPEN約定のチケット番号を記録しOPENへ遷移）"""
+        try:
+            data = message.data
+            if data.get('action') != 'OPEN':
+                return
+            if not data.get('success'):
+                logger.warning(f"MT4 open failed: {data.get('position_id')}")
+                return
+            ticket = data.get('mt4_ticket')
+            await self.mark_position_open(
+                data['position_id'],
+                fill_price=data.get('fill_price'),
+                mt4_ticket=int(ticket) if ticket is not None else None
+            )
+        except Exception as e:
+            logger.error(f"MT4 position update error: {e}")
+    
+    def restore_position(self, data: Dict[str, Any]) -> Optional[Position]:
+        """
+        スナップショットのポジション辞書（Position.to_dict形式）から復元
+        
+        既にアクティブなポジションは上書きしない。
+        """
+        if data['position_id'] in self.active_positions:
+            return None
+        
+        position = Position(
+            position_id=data['position_id'],
+            symbol=data['symbol'],
+            position_type=PositionType(data['position_type']),
+            entry_price=data['entry_price'],
+            quantity=data['quantity'],
+            entry_time=datetime.fromisoformat(data['entry_time']),
+            stop_loss=data.get('stop_loss'),
+            take_profit=data.get('take_profit'),
+            current_price=data.get('current_price'),
+            status=PositionStatus(data['status']),
+            exit_price=data.get('exit_price'),
+            exit_time=datetime.fromisoformat(data['exit_time']) if data.get('exit_time') else None,
+            commission=data.get('commission', 0.0),
+            swap=data.get('swap', 0.0),
+            slippage=data.get('slippage', 0.0),
+            mt4_ticket=data.get('mt4_ticket'),
+            strategy_params=data.get('strategy_params') or {}
+        )
+        self.book.add(position)
+        self._notify_position_listeners(position)
+        self._refresh_statistics()
+        return position
+    
+    def register_price_listener(self, callback: Callable):
+        """価格更新リスナー登録（async callback(symbol, price)）"""
+        self.price_listeners.append(callback)
+    
+    def register_position_listener(self, callback: Callable):
+        """ポジション状態変化リスナー登録（callback(position)、OPEN化・決済時）"""
+        self.position_listeners.append(callback)
+    
+    def _notify_position_listeners(self, position: Position):
+        for listener in self.position_listeners:
+            try:
+                listener(position)
+            except Exception as e:
+                logger.error(f"Position listener error: {e}")
+    
     async def update_position_price(self, symbol: str, current_price: float):
         """ポジションの現在価格更新"""
         try:
-            updated_count = 0
-            
-            for position in self.active_positions.values():
-                if position.symbol == symbol and position.status == PositionStatus.OPEN:
-                    position.current_price = current_price
-                    
-                    # 未実現損益計算
-                    unrealized_pnl = position.calculate_unrealized_pnl()
-                    
-                    # データベース更新（軽量化：価格のみ）
-                    await self._update_position_price_only(position, unrealized_pnl)
-                    
-                    updated_count += 1
-            
-            if updated_count > 0:
-                logger.debug(f"Updated {updated_count} positions for {symbol}@{current_price}")
+            # 未実現損益計算（シンボル索引のOPENポジションのみ）
+            marked = self.book.mark_price(symbol, current_price)
+            
+            # データベース更新は集約してprice_flush_intervalごとに一括反映
+            updated_at = datetime.now().isoformat()
+            for position, unrealized_pnl in marked:
+                self._pending_price_updates[position.position_id] = (
+                    position.current_price, unrealized_pnl, updated_at)
+            
+            if marked:
+                self._refresh_statistics()
+                logger.debug(f"Updated {len(marked)} positions for {symbol}@{current_price}")
+                
+                for listener in self.price_listeners:
+                    await listener(symbol, current_price)
                 
         except Exception as e:
             logger.error(f"Position price update error: {e}")
     
-    async def _send_position_to_mt4(self, position: Position, action: str):
-        """MT4へのポジション情報送信"""
-        try:
-            message = {
-                'type': 'position_action',
-                'action': action,
-                'data': {
+    async def send_batch_close(self, positions: List[Position],
+                               exit_prices: Dict[str, float]) -> bool:
+        """複数ポジションの決済指示を1メッセージでMT4へ送信"""
+        return await self._send_message_to_mt4('CLOSE_BATCH', {
+            'positions': [
+                {
                     'position_id': position.position_id,
                     'symbol': position.symbol,
                     'position_type': position.position_type.value,
-                    'entry_price': position.entry_price,
                     'quantity': position.quantity,
-                    'stop_loss': position.stop_loss,
-                    'take_profit': position.take_profit,
-                    'exit_price': position.exit_price
-                },
-                'timestamp': datetime.now().isoformat()
-            }
+                    'mt4_ticket': position.mt4_ticket,
+                    'exit_price': exit_prices.get(position.position_id)
+                }
+                for position in positions
+            ]
+        })
+    
+    async def _send_position_to_mt4(self, position: Position, action: str):
+        """MT4へのポジション情報送信"""
+        return await self._send_message_to_mt4(action, {
+            'position_id': position.position_id,
+            'symbol': position.symbol,
+            'position_type': position.position_type.value,
+            'entry_price': position.entry_price,
+            'quantity': position.quantity,
+            'stop_loss': position.stop_loss,
+            'take_profit': position.take_profit,
+            'exit_price': position.exit_price,
+            'mt4_ticket': position.mt4_ticket
+        })
+    
+    async def _send_message_to_mt4(self, action: str, data: Dict[str, Any]) -> bool:
+        """MT4へのポジション操作送信（TCP優先・ファイルフォールバック）"""
+        try:
+            message = TradingMessage(
+                message_type=MessageType.POSITION_ACTION,
+                timestamp=time.time(),
+                data=dict(data, action=action),
+                message_id=f"position_{uuid.uuid4().hex}"
+            )
             
             # TCP送信試行
-            if self.tcp_bridge.is_connected():
-                try:
-                    success = await self.tcp_bridge.send_data(message)
-                    if success:
-                        return True
-                except Exception as e:
-                    logger.warning(f"TCP position send failed: {e}")
+            if self.tcp_bridge.connection_state == ConnectionState.CONNECTED:
+                if await self.tcp_bridge.send_message(message):
+                    return True
+                logger.warning("TCP position send failed, falling back to file bridge")
             
-            # フォールバック: ファイル送信
-            return await self.file_bridge.send_message(message, 'mt4')
+            # フォールバック: ファイル送信（FileBridge.send_messageは同期）
+            return self.file_bridge.send_message(message)
             
         except Exception as e:
             logger.error(f"Position MT4 send error: {e}")
@@ -440,78 +715,90 @@ class PositionTracker:
     async def _save_position(self, position: Position):
         """ポジションデータベース保存"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT OR REPLACE INTO positions (
-                        position_id, symbol, position_type, entry_price, quantity,
-                        entry_time, stop_loss, take_profit, current_price, status,
-                        exit_price, exit_time, commission, swap, slippage,
-                        mt4_ticket, strategy_params, unrealized_pnl, realized_pnl,
-                        updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    position.position_id, position.symbol, position.position_type.value,
-                    position.entry_price, position.quantity, position.entry_time.isoformat(),
-                    position.stop_loss, position.take_profit, position.current_price,
-                    position.status.value, position.exit_price,
-                    position.exit_time.isoformat() if position.exit_time else None,
-                    position.commission, position.swap, position.slippage,
-                    position.mt4_ticket, json.dumps(position.strategy_params),
-                    position.calculate_unrealized_pnl(), position.calculate_realized_pnl(),
-                    datetime.now().isoformat()
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT OR REPLACE INTO positions (
+                    position_id, symbol, position_type, entry_price, quantity,
+                    entry_time, stop_loss, take_profit, current_price, status,
+                    exit_price, exit_time, commission, swap, slippage,
+                    mt4_ticket, strategy_params, unrealized_pnl, realized_pnl,
+                    updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                position.position_id, position.symbol, position.position_type.value,
+                position.entry_price, position.quantity, position.entry_time.isoformat(),
+                position.stop_loss, position.take_profit, position.current_price,
+                position.status.value, position.exit_price,
+                position.exit_time.isoformat() if position.exit_time else None,
+                position.commission, position.swap, position.slippage,
+                position.mt4_ticket, json.dumps(position.strategy_params),
+                position.calculate_unrealized_pnl(), position.calculate_realized_pnl(),
+                datetime.now().isoformat()
+            ), lane=WriteLane.CRITICAL)
+            
         except Exception as e:
             logger.error(f"Position save error: {e}")
     
-    async def _update_position_price_only(self, position: Position, unrealized_pnl: float):
-        """価格のみの軽量更新"""
+    async def _price_flush_loop(self):
+        """時価評価の定期フラッシュ"""
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.price_flush_interval)
+                await self.flush_price_updates()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Price flush loop error: {e}")
+    
+    async def flush_price_updates(self) -> int:
+        """
+        集約済み時価評価を単一トランザクションで書き込み
+        
+        決済（CRITICALレーン）が先にコミットされても決済済みの行は上書きしない。
+        """
+        if not self._pending_price_updates:
+            return 0
+        
+        pending = self._pending_price_updates
+        self._pending_price_updates = {}
+        
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    UPDATE positions 
-                    SET current_price = ?, unrealized_pnl = ?, updated_at = ?
-                    WHERE position_id = ?
-                ''', (position.current_price, unrealized_pnl, 
-                      datetime.now().isoformat(), position.position_id))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_path).executemany('''
+                UPDATE positions 
+                SET current_price = ?, unrealized_pnl = ?, updated_at = ?
+                WHERE position_id = ? AND status = 'OPEN'
+            ''', [
+                (current_price, unrealized_pnl, updated_at, position_id)
+                for position_id, (current_price, unrealized_pnl, updated_at) in pending.items()
+            ], lane=WriteLane.NORMAL)
+            
+            logger.debug(f"Flushed {len(pending)} position price updates")
+            return len(pending)
+            
         except Exception as e:
-            logger.error(f"Position price update error: {e}")
+            # 失敗分は次回フラッシュで再試行（より新しい値・決済済みのポジションは除く）
+            for position_id, update in pending.items():
+                if self.book.is_open(position_id):
+                    self._pending_price_updates.setdefault(position_id, update)
+            logger.error(f"Position price flush error: {e}")
+            return 0
     
     async def _update_statistics(self):
         """統計情報更新"""
+        self._refresh_statistics()
+    
+    def _refresh_statistics(self):
+        """ポジションブックの増分集計から統計を更新（O(1)）"""
         try:
-            total_realized_pnl = 0.0
-            total_unrealized_pnl = 0.0
-            winning_count = 0
-            losing_count = 0
-            
-            # 履歴ポジション統計
-            for position in self.position_history:
-                if position.status == PositionStatus.CLOSED:
-                    realized_pnl = position.calculate_realized_pnl()
-                    total_realized_pnl += realized_pnl
-                    
-                    if realized_pnl > 0:
-                        winning_count += 1
-                    else:
-                        losing_count += 1
-            
-            # アクティブポジション統計
-            for position in self.active_positions.values():
-                if position.status == PositionStatus.OPEN:
-                    total_unrealized_pnl += position.calculate_unrealized_pnl()
+            book = self.book
             
             # 統計更新
             self.stats.update({
-                'total_positions': len(self.position_history) + len(self.active_positions),
-                'winning_positions': winning_count,
-                'losing_positions': losing_count,
-                'total_pnl': total_realized_pnl + total_unrealized_pnl,
-                'realized_pnl': total_realized_pnl,
-                'unrealized_pnl': total_unrealized_pnl
+                'total_positions': book.closed_count + len(book),
+                'winning_positions': book.winning_count,
+                'losing_positions': book.losing_count,
+                'total_pnl': book.realized_total + book.unrealized_total,
+                'realized_pnl': book.realized_total,
+                'unrealized_pnl': book.unrealized_total
             })
             
             # ドローダウン計算
@@ -535,18 +822,15 @@ class PositionTracker:
     
     def get_positions_by_symbol(self, symbol: str) -> List[Position]:
         """シンボル別ポジション取得"""
-        return [pos for pos in self.active_positions.values() if pos.symbol == symbol]
+        return self.book.positions_for_symbol(symbol)
+    
+    def get_open_positions_by_symbol(self, symbol: str) -> List[Position]:
+        """シンボル別OPENポジション取得"""
+        return self.book.open_positions_for_symbol(symbol)
     
     def get_total_exposure(self, symbol: str) -> float:
         """シンボル別総エクスポージャー計算"""
-        total_exposure = 0.0
-        for position in self.get_positions_by_symbol(symbol):
-            if position.status == PositionStatus.OPEN:
-                exposure = position.quantity
-                if position.position_type == PositionType.SELL:
-                    exposure = -exposure
-                total_exposure += exposure
-        return total_exposure
+        return self.book.exposure(symbol)
     
     def get_statistics(self) -> Dict[str, Any]:
         """統計情報取得"""
@@ -569,6 +853,16 @@ class PositionTracker:
         logger.info("Stopping Position Tracker...")
         self.is_running = False
         
+        # 未反映の時価評価を書き込み
+        if self.price_flush_task:
+            self.price_flush_task.cancel()
+        await self.flush_price_updates()
+        
+        # 通信停止
+        if self._listen_task:
+            self._listen_task.cancel()
+        self.file_bridge.stop()
+        
         # 最終統計保存
         await self._save_performance_snapshot()
         
@@ -579,26 +873,24 @@ class PositionTracker:
         try:
             stats = self.get_statistics()
             
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO performance_snapshots (
-                        snapshot_time, total_positions, active_positions,
-                        total_pnl, unrealized_pnl, realized_pnl, win_rate,
-                        max_drawdown, current_drawdown
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    datetime.now().isoformat(),
-                    stats['total_positions'],
-                    stats['active_positions'],
-                    stats['total_pnl'],
-                    stats['unrealized_pnl'],
-                    stats.get('realized_pnl', 0.0),
-                    stats['win_rate'],
-                    stats['max_drawdown'],
-                    stats['current_drawdown']
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO performance_snapshots (
+                    snapshot_time, total_positions, active_positions,
+                    total_pnl, unrealized_pnl, realized_pnl, win_rate,
+                    max_drawdown, current_drawdown
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                datetime.now().isoformat(),
+                stats['total_positions'],
+                stats['active_positions'],
+                stats['total_pnl'],
+                stats['unrealized_pnl'],
+                stats.get('realized_pnl', 0.0),
+                stats['win_rate'],
+                stats['max_drawdown'],
+                stats['current_drawdown']
+            ), lane=WriteLane.BULK)
+            
         except Exception as e:
             logger.error(f"Performance snapshot save error: {e}")
 
@@ -10,7 +10,8 @@ from typing import Dict, Tuple
 
 import numpy as np
 import pandas as pd
-from data_cache_system import DataCacheManager
+from data_cache_system import DataCacheManager, frame_to_records
+from historical_data_lake import HistoricalDataLake
 from multi_timeframe_breakout_strategy import (
     MultiTimeframeBreakoutStrategy,
     MultiTimeframeData,
@@ -21,7 +22,10 @@ class RealityEnhancedWFA:
     """リアリティ追求WFA実行システム"""
 
     def __init__(self):
-        self.cache_manager = DataCacheManager()
+        # フォールド期間はデータレイクから該当月のパーティションだけを読む
+        self.cache_manager = DataCacheManager(
+            data_lake=HistoricalDataLake("data_cache/data_lake")
+        )
 
         # フェーズ3で最適化されたパラメータ
         self.final_params = {
@@ -128,11 +132,11 @@ class RealityEnhancedWFA:
         print("   目標: 取引コスト・スリッページ・ドローダウンを反映した実用性検証")
 
         # 完全データ取得
-        raw_data = self.cache_manager.get_full_data()
-        print(f"\n📊 使用データ: {len(raw_data):,}バー（完全データ）")
+        timeline = self.cache_manager.get_timeline()
+        print(f"\n📊 使用データ: {len(timeline):,}バー（完全データ）")
 
         # シンプルWFA実行
-        wfa_results = self._execute_simple_wfa(raw_data)
+        wfa_results = self._execute_simple_wfa(timeline)
 
         if not wfa_results:
             print("⚠️ WFA実行失敗")
@@ -168,22 +172,21 @@ class RealityEnhancedWFA:
 
         return result_data
 
-    def _execute_simple_wfa(self, raw_data):
+    def _execute_simple_wfa(self, timeline):
         """シンプルWFA実行（minimal_wfa_execution.pyから移植）"""
         try:
-            MultiTimeframeData(raw_data)
             strategy = MultiTimeframeBreakoutStrategy(self.final_params)
 
-            # 5フォールドWFA
-            folds = self._generate_simplified_folds(raw_data)
+            # 5フォールドWFA（境界は時刻列で決め、バーはフォールド毎に期間読み込み）
+            folds = self._generate_simplified_folds(timeline)
             results = []
 
             print("\n📋 シンプルWFA実行:")
             print(f"   フォールド数: {len(folds)}")
 
-            for i, (is_data, oos_data) in enumerate(folds, 1):
-                is_mtf_data = MultiTimeframeData(is_data)
-                oos_mtf_data = MultiTimeframeData(oos_data)
+            for i, (is_timeline, oos_timeline) in enumerate(folds, 1):
+                is_mtf_data = MultiTimeframeData(self._load_period(is_timeline))
+                oos_mtf_data = MultiTimeframeData(self._load_period(oos_timeline))
 
                 # IS期間での性能
                 is_signals = self._generate_period_signals(strategy, is_mtf_data)
@@ -217,8 +220,8 @@ class RealityEnhancedWFA:
 
                 results.append(result)
 
-                period_start = is_data[0]["datetime"].strftime("%Y-%m")
-                period_end = oos_data[-1]["datetime"].strftime("%Y-%m")
+                period_start = is_timeline[0].strftime("%Y-%m")
+                period_end = oos_timeline[-1].strftime("%Y-%m")
                 print(f"   フォールド{i}: {period_start} - {period_end}")
                 print(f"     IS: PF={is_pf:.3f}, 取引={is_trades}")
                 print(f"     OOS: PF={oos_pf:.3f}, 取引={oos_trades}")
@@ -365,9 +368,16 @@ class RealityEnhancedWFA:
             "p_value": statistical_results["p_value"],
         }
 
-    def _generate_simplified_folds(self, raw_data):
-        """簡易フォールド生成"""
-        data_len = len(raw_data)
+    def _load_period(self, timeline):
+        """期間のバー読み込み（フォールドの区間だけを辞書リストへ展開）"""
+        if len(timeline) == 0:
+            return []
+        frame = self.cache_manager.read_range(timeline[0], timeline[-1])
+        return frame_to_records(frame)
+
+    def _generate_simplified_folds(self, timeline):
+        """簡易フォールド生成（時刻列の区間）"""
+        data_len = len(timeline)
         fold_size = data_len // 5
 
         folds = []
@@ -377,9 +387,7 @@ class RealityEnhancedWFA:
             oos_end = min(oos_start + fold_size, data_len)
 
             if oos_end <= data_len:
-                is_data = raw_data[:is_end]
-                oos_data = raw_data[oos_start:oos_end]
-                folds.append((is_data, oos_data))
+                folds.append((timeline[:is_end], timeline[oos_start:oos_end]))
 
         return folds
 
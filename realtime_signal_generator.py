@@ -29,6 +29,7 @@ import yaml
 sys.path.append(str(Path(__file__).parent))
 from communication.tcp_bridge import TCPBridge
 from communication.file_bridge import FileBridge
+from database_pool import get_connection_pool, get_ingest_queue, WriteLane
 
 # 定数定義
 class SystemConstants:
@@ -679,7 +680,7 @@ class SignalTransmissionSystem:
         """シグナル記録用データベース初期化（非同期）"""
         try:
             db_path = CONFIG.get('database', {}).get('path', './realtime_signals.db')
-            async with aiosqlite.connect(db_path) as conn:
+            async with get_connection_pool(db_path).writer() as conn:
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS signals (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -859,29 +860,27 @@ class SignalTransmissionSystem:
         """シグナル送信記録（非同期）"""
         try:
             db_path = CONFIG.get('database', {}).get('path', './realtime_signals.db')
-            async with aiosqlite.connect(db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO signals (
-                        timestamp, symbol, action, quantity, price, stop_loss, take_profit,
-                        signal_quality, priority, strategy_params, transmission_status,
-                        transmission_time, error_message
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    signal.timestamp.isoformat(),
-                    signal.symbol,
-                    signal.action,
-                    signal.quantity,
-                    signal.price,
-                    signal.stop_loss,
-                    signal.take_profit,
-                    signal.signal_quality,
-                    signal.priority,
-                    json.dumps(signal.strategy_params),
-                    'SUCCESS' if success else 'FAILED',
-                    datetime.now().isoformat(),
-                    error_msg
-                ))
-                await conn.commit()
+            await get_ingest_queue(db_path).execute('''
+                INSERT INTO signals (
+                    timestamp, symbol, action, quantity, price, stop_loss, take_profit,
+                    signal_quality, priority, strategy_params, transmission_status,
+                    transmission_time, error_message
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                signal.timestamp.isoformat(),
+                signal.symbol,
+                signal.action,
+                signal.quantity,
+                signal.price,
+                signal.stop_loss,
+                signal.take_profit,
+                signal.signal_quality,
+                signal.priority,
+                json.dumps(signal.strategy_params),
+                'SUCCESS' if success else 'FAILED',
+                datetime.now().isoformat(),
+                error_msg
+            ), lane=WriteLane.NORMAL)
         except aiosqlite.Error as e:
             logger.error(f"Signal recording SQL error: {e}")
         except (OSError, PermissionError) as e:
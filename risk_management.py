@@ -12,23 +12,45 @@ import asyncio
 import json
 import time
 import logging
-import aiosqlite
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional, Any, Tuple, Union
 from enum import Enum
 import numpy as np
 import sys
+from collections import deque
 from pathlib import Path
 
 # 既存システム統合
 sys.path.append(str(Path(__file__).parent))
-from realtime_signal_generator import SystemConstants, get_config_value, calculate_time_diff_seconds, CONFIG
+sys.path.append(str(Path(__file__).parent / 'utilities'))
+from realtime_signal_generator import SystemConstants, get_config_value, calculate_time_diff_seconds, CONFIG, MarketData
+from database_pool import get_connection_pool, get_ingest_queue, WriteLane
 from position_management import Position, PositionTracker, PositionStatus, PositionType
 
+try:
+    from historical_data_lake import HistoricalDataLake
+    DATA_LAKE_AVAILABLE = True
+except ImportError:
+    DATA_LAKE_AVAILABLE = False
+
 # ログ設定
 logger = logging.getLogger(__name__)
 
+# 時間軸 → 1バーの秒数（ボラティリティの日次換算に使用）
+TIMEFRAME_SECONDS = {
+    'M1': 60,
+    'M5': 300,
+    'M15': 900,
+    'M30': 1800,
+    'H1': 3600,
+    'H4': 14400,
+    'D1': 86400
+}
+
+# ボラティリティのウォームスタートに使うヒストリカルデータレイク（risk_management.data_lake_dir）
+DEFAULT_DATA_LAKE_DIR = 'data_cache/data_lake'
+
 class RiskLevel(Enum):
     """リスクレベル"""
     LOW = "LOW"
@@ -85,13 +107,213 @@ class RiskAssessment:
     recommendations: List[str]
     timestamp: datetime
 
+@dataclass
+class VolatilitySnapshot:
+    """通貨ペア別ボラティリティ"""
+    symbol: str
+    realized_volatility: float      # ローリング実現ボラティリティ（日次換算）
+    ewma_volatility: float          # EWMAボラティリティ（日次換算）
+    atr: float                      # ATR（価格単位）
+    atr_percent: float              # ATR / 終値
+    samples: int
+    updated: Optional[datetime]
+
+class _SymbolVolatilityState:
+    """通貨ペア別の増分計算状態"""
+    
+    __slots__ = ('returns', 'return_sum', 'return_sq_sum', 'ewma_variance',
+                 'atr', 'tr_seed_sum', 'bar_count', 'last_close', 'last_timestamp',
+                 'updated')
+    
+    def __init__(self, window: int):
+        self.returns = deque(maxlen=window)
+        self.return_sum = 0.0
+        self.return_sq_sum = 0.0
+        self.ewma_variance: Optional[float] = None
+        self.atr: Optional[float] = None
+        self.tr_seed_sum = 0.0
+        self.bar_count = 0
+        self.last_close: Optional[float] = None
+        self.last_timestamp: Optional[datetime] = None
+        self.updated: Optional[datetime] = None
+
+class VolatilityEngine:
+    """
+    ボラティリティエンジン - 要件4.3
+    
+    市場データフィードのバーごとに以下を増分更新する（1バーO(1)）:
+    - ローリング実現ボラティリティ（対数リターンの窓内合計・二乗合計）
+    - ATR（Wilder平滑化）
+    - EWMA分散（RiskMetrics方式）
+    参照はキャッシュ済みの状態を読むだけなので、リスクチェックごとの計算コストはない。
+    
+    日次換算の1バーの秒数は購読する時間軸から与える（観測したバー間隔は
+    欠損・週末で揺れるため使わない）。
+    """
+    
+    def __init__(self, window: int = 288, atr_period: int = 14, ewma_lambda: float = 0.94,
+                 min_samples: int = 20, bar_seconds: float = 300.0):
+        self.window = window
+        self.atr_period = atr_period
+        self.ewma_lambda = ewma_lambda
+        self.min_samples = min_samples
+        self.bar_seconds = bar_seconds
+        self._states: Dict[str, _SymbolVolatilityState] = {}
+    
+    def update(self, symbol: str, high: float, low: float, close: float,
+               timestamp: Optional[datetime] = None):
+        """1バー分の増分更新"""
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = _SymbolVolatilityState(self.window)
+        
+        if timestamp is not None and state.last_timestamp is not None:
+            # 同一時刻の再送は無視
+            if timestamp <= state.last_timestamp:
+                return
+        
+        previous_close = state.last_close
+        if previous_close is not None and previous_close > 0 and close > 0:
+            log_return = float(np.log(close / previous_close))
+            
+            # ローリング窓（満杯なら最古のリターンを差し引く）
+            if len(state.returns) == state.returns.maxlen:
+                oldest = state.returns[0]
+                state.return_sum -= oldest
+                state.return_sq_sum -= oldest * oldest
+            state.returns.append(log_return)
+            state.return_sum += log_return
+            state.return_sq_sum += log_return * log_return
+            
+            # 浮動小数点誤差の蓄積を窓1周ごとに再計算で解消
+            if state.bar_count % self.window == 0:
+                state.return_sum = float(sum(state.returns))
+                state.return_sq_sum = float(sum(r * r for r in state.returns))
+            
+            # EWMA分散
+            squared = log_return * log_return
+            if state.ewma_variance is None:
+                state.ewma_variance = squared
+            else:
+                state.ewma_variance = self.ewma_lambda * state.ewma_variance + (1.0 - self.ewma_lambda) * squared
+        
+        # ATR（True Range, Wilder平滑化）
+        if previous_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+        
+        state.bar_count += 1
+        if state.atr is None:
+            state.tr_seed_sum += true_range
+            if state.bar_count >= self.atr_period:
+                state.atr = state.tr_seed_sum / self.atr_period
+        else:
+            state.atr = (state.atr * (self.atr_period - 1) + true_range) / self.atr_period
+        
+        state.last_close = close
+        state.last_timestamp = timestamp or state.last_timestamp
+        state.updated = timestamp or datetime.now()
+    
+    async def on_market_data(self, market_data: MarketData):
+        """市場データフィード購読コールバック"""
+        self.update(market_data.symbol, market_data.high, market_data.low,
+                    market_data.close, market_data.timestamp)
+    
+    def warm_start(self, symbol: str, frame) -> int:
+        """
+        ヒストリカルデータからの初期化
+        
+        Args:
+            frame: high/low/close列・DatetimeIndexのDataFrame（時刻昇順）
+        
+        Returns:
+            int: 投入バー数
+        """
+        if frame is None or len(frame) == 0:
+            return 0
+        timestamps = frame.index.to_pydatetime()
+        for timestamp, high, low, close in zip(timestamps, frame['high'].to_numpy(),
+                                               frame['low'].to_numpy(), frame['close'].to_numpy()):
+            self.update(symbol, float(high), float(low), float(close), timestamp)
+        return len(frame)
+    
+    def warm_start_from_lake(self, lake, symbols: List[str], timeframe: str = "M5",
+                             lookback_bars: Optional[int] = None) -> Dict[str, int]:
+        """
+        ヒストリカルデータレイク（HistoricalDataLake）からの初期化
+        
+        末尾パーティションから必要な期間だけを読み込む。
+        """
+        lookback_bars = lookback_bars or self.window * 2
+        loaded = {}
+        for symbol in symbols:
+            time_range = lake.time_range(symbol, timeframe)
+            if time_range is None:
+                continue
+            _, end = time_range
+            start = end - timedelta(seconds=self.bar_seconds * lookback_bars * 2)
+            frame = lake.read(symbol, timeframe, start=start, end=end,
+                              columns=['high', 'low', 'close']).iloc[-lookback_bars:]
+            loaded[symbol] = self.warm_start(symbol, frame)
+        return loaded
+    
+    def _bars_per_day(self) -> float:
+        return 86400.0 / self.bar_seconds
+    
+    def is_ready(self, symbol: str) -> bool:
+        """有効なボラティリティが得られるか"""
+        state = self._states.get(symbol)
+        return state is not None and len(state.returns) >= self.min_samples
+    
+    def realized_volatility(self, symbol: str) -> Optional[float]:
+        """ローリング実現ボラティリティ（日次換算）"""
+        state = self._states.get(symbol)
+        if state is None or len(state.returns) < 2:
+            return None
+        n = len(state.returns)
+        variance = (state.return_sq_sum - state.return_sum * state.return_sum / n) / (n - 1)
+        return float(np.sqrt(max(variance, 0.0) * self._bars_per_day()))
+    
+    def ewma_volatility(self, symbol: str) -> Optional[float]:
+        """EWMAボラティリティ（日次換算）"""
+        state = self._states.get(symbol)
+        if state is None or state.ewma_variance is None:
+            return None
+        return float(np.sqrt(state.ewma_variance * self._bars_per_day()))
+    
+    def atr(self, symbol: str) -> Optional[float]:
+        """ATR（価格単位）"""
+        state = self._states.get(symbol)
+        return state.atr if state is not None else None
+    
+    def get_snapshot(self, symbol: str) -> Optional[VolatilitySnapshot]:
+        """通貨ペア別ボラティリティ取得"""
+        state = self._states.get(symbol)
+        if state is None:
+            return None
+        atr = state.atr or 0.0
+        return VolatilitySnapshot(
+            symbol=symbol,
+            realized_volatility=self.realized_volatility(symbol) or 0.0,
+            ewma_volatility=self.ewma_volatility(symbol) or 0.0,
+            atr=atr,
+            atr_percent=atr / state.last_close if state.last_close else 0.0,
+            samples=len(state.returns),
+            updated=state.updated
+        )
+    
+    def symbols(self) -> List[str]:
+        return list(self._states)
+
 class RiskManager:
     """
     リスク管理エンジン - kiro設計tasks.md:101-107準拠
     設定可能リスクパラメータ・最大ドローダウン監視・ポジションサイズ計算
     """
     
-    def __init__(self, position_tracker: PositionTracker, risk_params: Optional[RiskParameters] = None):
+    def __init__(self, position_tracker: PositionTracker, risk_params: Optional[RiskParameters] = None,
+                 data_lake=None, use_data_lake: bool = True):
         self.position_tracker = position_tracker
         self.risk_params = risk_params or RiskParameters()
         self.is_running = False
@@ -107,6 +329,24 @@ class RiskManager:
         self.last_risk_check = time.time()
         self.volatility_history: List[Tuple[datetime, float]] = []
         
+        # ボラティリティエンジン（市場データフィードから増分更新）
+        risk_config = self.config.get('risk_management', {})
+        self.volatility_timeframe = risk_config.get('volatility_timeframe', 'M5')
+        self.volatility_symbols = risk_config.get('volatility_symbols', ['EURUSD', 'USDJPY', 'GBPJPY'])
+        self.volatility_engine = VolatilityEngine(
+            window=risk_config.get('volatility_window_bars', self.risk_params.volatility_lookback_hours * 12),
+            atr_period=risk_config.get('atr_period', 14),
+            ewma_lambda=risk_config.get('ewma_lambda', 0.94),
+            bar_seconds=risk_config.get(
+                'volatility_bar_seconds', TIMEFRAME_SECONDS.get(self.volatility_timeframe, 300)
+            )
+        )
+        # ウォームスタート用ヒストリカルデータレイク（HistoricalDataLake）
+        # 未指定なら設定のディレクトリ（既定はWFA・データ取得と共有のレイク）を使う
+        if data_lake is None and use_data_lake:
+            data_lake = self._open_data_lake(risk_config.get('data_lake_dir', DEFAULT_DATA_LAKE_DIR))
+        self.data_lake = data_lake
+        
         # データベース
         self.db_path = self.config.get('database', {}).get('path', './risk_management.db')
         self._db_initialized = False
@@ -147,6 +387,9 @@ class RiskManager:
         # 初期残高設定
         await self._set_daily_start_balance()
         
+        # ボラティリティエンジンのウォームスタート
+        self._warm_start_volatility()
+        
         # リスク監視開始
         self.is_running = True
         asyncio.create_task(self._risk_monitoring_loop())
@@ -156,7 +399,7 @@ class RiskManager:
     async def _init_database(self):
         """リスク管理データベース初期化"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
+            async with get_connection_pool(self.db_path).writer() as conn:
                 # リスク評価履歴テーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS risk_assessments (
@@ -197,6 +440,37 @@ class RiskManager:
         except Exception as e:
             logger.error(f"Risk database initialization error: {e}")
     
+    def _open_data_lake(self, lake_dir: str):
+        """共有ヒストリカルデータレイクを開く（未作成・モジュールなしならNone）"""
+        if not DATA_LAKE_AVAILABLE:
+            logger.warning("historical_data_lake未検出: ボラティリティのウォームスタート無効")
+            return None
+        if not Path(lake_dir).is_dir():
+            logger.info(f"Data lake not found, volatility warm start disabled: {lake_dir}")
+            return None
+        try:
+            return HistoricalDataLake(lake_dir)
+        except Exception as e:
+            logger.error(f"Data lake open error: {e}")
+            return None
+    
+    def _warm_start_volatility(self):
+        """ヒストリカルデータからボラティリティエンジンを初期化"""
+        if self.data_lake is None:
+            return
+        try:
+            loaded = self.volatility_engine.warm_start_from_lake(
+                self.data_lake, self.volatility_symbols, self.volatility_timeframe
+            )
+            for symbol, bars in loaded.items():
+                logger.info(f"Volatility warm start: {symbol} {bars} bars")
+        except Exception as e:
+            logger.error(f"Volatility warm start error: {e}")
+    
+    async def on_market_data(self, market_data: MarketData):
+        """市場データ受信（ボラティリティ更新）"""
+        await self.volatility_engine.on_market_data(market_data)
+    
     async def _set_daily_start_balance(self):
         """日次開始残高設定"""
         try:
@@ -328,10 +602,14 @@ class RiskManager:
         return abs(current_exposure + new_exposure)
     
     async def _calculate_volatility_score(self, symbol: str) -> float:
-        """ボラティリティスコア計算"""
+        """ボラティリティスコア計算（日次換算ボラティリティ）"""
         try:
-            # 簡易ボラティリティ計算（実装では価格履歴から計算）
-            # 現在は設定ベースの固定値を返す
+            # ボラティリティエンジンの値（EWMA・実現ボラティリティの大きい方）
+            if self.volatility_engine.is_ready(symbol):
+                return max(self.volatility_engine.ewma_volatility(symbol) or 0.0,
+                           self.volatility_engine.realized_volatility(symbol) or 0.0)
+            
+            # データ不足時は時間帯ベースの推定値
             base_volatility = 0.01  # 1%
             
             # 時間帯による調整（例：ロンドン・NYオープン時は高ボラティリティ）
@@ -535,28 +813,26 @@ class RiskManager:
     async def _save_risk_assessment(self, assessment: RiskAssessment):
         """リスク評価データベース保存"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO risk_assessments (
-                        timestamp, risk_level, risk_action, current_drawdown,
-                        daily_pnl, total_exposure, volatility_score, account_balance,
-                        risk_score, reasons, recommendations
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    assessment.timestamp.isoformat(),
-                    assessment.risk_level.value,
-                    assessment.risk_action.value,
-                    assessment.current_drawdown,
-                    assessment.daily_pnl,
-                    assessment.total_exposure,
-                    assessment.volatility_score,
-                    assessment.account_balance,
-                    assessment.risk_score,
-                    json.dumps(assessment.reasons),
-                    json.dumps(assessment.recommendations)
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO risk_assessments (
+                    timestamp, risk_level, risk_action, current_drawdown,
+                    daily_pnl, total_exposure, volatility_score, account_balance,
+                    risk_score, reasons, recommendations
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                assessment.timestamp.isoformat(),
+                assessment.risk_level.value,
+                assessment.risk_action.value,
+                assessment.current_drawdown,
+                assessment.daily_pnl,
+                assessment.total_exposure,
+                assessment.volatility_score,
+                assessment.account_balance,
+                assessment.risk_score,
+                json.dumps(assessment.reasons),
+                json.dumps(assessment.recommendations)
+            ), lane=WriteLane.NORMAL)
+            
         except Exception as e:
             logger.error(f"Risk assessment save error: {e}")
     
@@ -565,19 +841,17 @@ class RiskManager:
                              positions_affected: int = 0, pnl_impact: float = 0.0):
         """リスクイベントログ記録"""
         try:
-            async with aiosqlite.connect(self.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO risk_events (
-                        timestamp, event_type, severity, description,
-                        action_taken, positions_affected, pnl_impact
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    datetime.now().isoformat(),
-                    event_type, severity, description,
+            await get_ingest_queue(self.db_path).execute('''
+                INSERT INTO risk_events (
+                    timestamp, event_type, severity, description,
                     action_taken, positions_affected, pnl_impact
-                ))
-                await conn.commit()
-                
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                datetime.now().isoformat(),
+                event_type, severity, description,
+                action_taken, positions_affected, pnl_impact
+            ), lane=WriteLane.NORMAL)
+            
         except Exception as e:
             logger.error(f"Risk event logging error: {e}")
     
@@ -5,9 +5,18 @@
 """
 
 import json
+import logging
 from dataclasses import dataclass
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+CONTRACT_SIZE = 100000  # 1ロットあたりの通貨量
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -36,6 +45,7 @@ class RiskParameters:
     max_consecutive_losses: int = 3  # 最大連続損失回数
     correlation_limit: float = 0.7  # 相関限界
     exposure_limit: float = 0.02  # 最大エクスポージャー
+    var_limit: float = 0.01  # ポートフォリオVaR上限（口座残高比）
     heat_index_limit: float = 0.5  # ヒートインデックス限界
     kelly_fraction: float = 0.25  # ケリー基準適用率
 
@@ -200,6 +210,331 @@ class MarketEnvironmentDetector:
         return False
 
 
+class PortfolioRiskEngine:
+    """
+    ポートフォリオリスクエンジン
+
+    取引通貨ペア間の指数加重（EWMA）共分散行列をバーごとに増分更新し、
+    保有ポジションのパラメトリック/ヒストリカルVaR・CVaRを計算する。
+    ヒストリカルVaR用のリターン履歴は固定長リングバッファに保持する。
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        ewma_lambda: float = 0.94,
+        history_size: int = 500,
+        confidence: float = 0.99,
+        min_observations: int = 30,
+    ):
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.ewma_lambda = ewma_lambda
+        self.confidence = confidence
+        self.min_observations = min_observations
+        self.z_score = NormalDist().inv_cdf(confidence)
+        # 正規分布CVaR係数 φ(z) / (1 - α)
+        self.cvar_factor = NormalDist().pdf(self.z_score) / (1.0 - confidence)
+
+        n = len(self.symbols)
+        self.covariance = np.zeros((n, n))
+        self.last_prices = np.full(n, np.nan)
+        self.return_history = np.zeros((history_size, n))
+        self.history_count = 0
+        self._history_pos = 0
+        self.updates = 0
+
+    def is_ready(self) -> bool:
+        """共分散推定に十分な観測があるか"""
+        return self.updates >= self.min_observations
+
+    def update(self, prices: Dict[str, float]):
+        """1バー分の価格で共分散・リターン履歴を更新"""
+        current = self.last_prices.copy()
+        for symbol, price in prices.items():
+            i = self.symbol_index.get(symbol)
+            if i is not None and price > 0:
+                current[i] = price
+
+        with np.errstate(invalid="ignore"):
+            returns = np.log(current / self.last_prices)
+        returns = np.nan_to_num(returns, nan=0.0)
+        first_update = np.isnan(self.last_prices).all()
+        self.last_prices = current
+        if first_update:
+            return
+
+        if self.updates == 0:
+            self.covariance = np.outer(returns, returns)
+        else:
+            self.covariance *= self.ewma_lambda
+            self.covariance += (1.0 - self.ewma_lambda) * np.outer(returns, returns)
+
+        self.return_history[self._history_pos] = returns
+        self._history_pos = (self._history_pos + 1) % len(self.return_history)
+        self.history_count = min(self.history_count + 1, len(self.return_history))
+        self.updates += 1
+
+    def volatilities(self) -> np.ndarray:
+        """通貨ペア別ボラティリティ（1バーあたり）"""
+        return np.sqrt(np.clip(np.diag(self.covariance), 0.0, None))
+
+    def correlation_matrix(self) -> np.ndarray:
+        """相関行列"""
+        vols = self.volatilities()
+        denom = np.outer(vols, vols)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = np.where(denom > 0, self.covariance / denom, 0.0)
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+    def exposure_vector(self, positions: List[Dict]) -> np.ndarray:
+        """
+        ポジション → 通貨ペア別の符号付き想定元本
+
+        各ポジションは symbol, direction (BUY/SELL), position_size (ロット) を持つ。
+        notionalがあればそれを優先する。
+        """
+        exposure = np.zeros(len(self.symbols))
+        for position in positions:
+            i = self.symbol_index.get(position.get("symbol"))
+            if i is None:
+                continue
+            notional = position.get("notional")
+            if notional is None:
+                notional = position.get("position_size", 0) * CONTRACT_SIZE
+            sign = -1.0 if position.get("direction") == "SELL" else 1.0
+            exposure[i] += sign * notional
+        return exposure
+
+    def parametric_var(self, exposure: np.ndarray) -> Dict[str, float]:
+        """パラメトリック（分散共分散法）VaR・CVaR"""
+        sigma = float(np.sqrt(max(exposure @ self.covariance @ exposure, 0.0)))
+        return {"var": self.z_score * sigma, "cvar": self.cvar_factor * sigma}
+
+    def historical_var(self, exposure: np.ndarray) -> Dict[str, float]:
+        """ヒストリカルVaR・CVaR（リターン履歴からの損益分布）"""
+        if self.history_count == 0:
+            return {"var": 0.0, "cvar": 0.0}
+        pnl = self.return_history[: self.history_count] @ exposure
+        return self._tail_metrics(pnl[:, None])[0]
+
+    def _tail_metrics(self, pnl: np.ndarray) -> List[Dict[str, float]]:
+        """損益行列（観測数×ポートフォリオ数）の列ごとのVaR・CVaR"""
+        tail_count = max(1, int(np.ceil(len(pnl) * (1.0 - self.confidence) - 1e-9)))
+        tail = np.partition(pnl, tail_count - 1, axis=0)[:tail_count]
+        var = -tail.max(axis=0)
+        cvar = -tail.mean(axis=0)
+        return [
+            {"var": float(max(v, 0.0)), "cvar": float(max(c, 0.0))}
+            for v, c in zip(var, cvar)
+        ]
+
+    def diversification_ratio(self, exposure: np.ndarray) -> float:
+        """
+        相関集中度（ポートフォリオσ / 個別σの絶対加重和）
+
+        全ポジションが完全相関かつ同方向なら1.0、分散・ヘッジが効くほど小さい。
+        """
+        standalone = float(np.abs(exposure) @ self.volatilities())
+        if standalone == 0:
+            return 0.0
+        sigma = float(np.sqrt(max(exposure @ self.covariance @ exposure, 0.0)))
+        return min(sigma / standalone, 1.0)
+
+    def portfolio_risk(self, positions: List[Dict]) -> Dict[str, float]:
+        """保有ポジションのリスク指標"""
+        exposure = self.exposure_vector(positions)
+        parametric = self.parametric_var(exposure)
+        historical = self.historical_var(exposure)
+        return {
+            "parametric_var": parametric["var"],
+            "parametric_cvar": parametric["cvar"],
+            "historical_var": historical["var"],
+            "historical_cvar": historical["cvar"],
+            "correlation_concentration": self.diversification_ratio(exposure),
+        }
+
+    def evaluate_candidates(
+        self, positions: List[Dict], candidates: List[Dict]
+    ) -> List[Dict[str, float]]:
+        """
+        エントリー候補の一括評価
+
+        各候補を現在のポジションに加えた場合のVaR・CVaRと増分VaRを返す。
+        候補数分の共分散二次形式・ヒストリカル損益を行列演算でまとめて計算する。
+        """
+        if not candidates:
+            return []
+
+        base = self.exposure_vector(positions)
+        portfolios = base + np.array(
+            [self.exposure_vector([candidate]) for candidate in candidates]
+        )
+
+        variances = np.einsum("ij,jk,ik->i", portfolios, self.covariance, portfolios)
+        sigmas = np.sqrt(np.clip(variances, 0.0, None))
+        base_var = self.parametric_var(base)["var"]
+
+        if self.history_count > 0:
+            pnl = self.return_history[: self.history_count] @ portfolios.T
+            historical = self._tail_metrics(pnl)
+        else:
+            historical = [{"var": 0.0, "cvar": 0.0}] * len(candidates)
+
+        return [
+            {
+                "parametric_var": float(self.z_score * sigma),
+                "parametric_cvar": float(self.cvar_factor * sigma),
+                "historical_var": hist["var"],
+                "historical_cvar": hist["cvar"],
+                "incremental_var": float(self.z_score * sigma - base_var),
+            }
+            for sigma, hist in zip(sigmas, historical)
+        ]
+
+
+class TradeStatisticsAccumulator:
+    """
+    取引統計の増分集計
+
+    決済済み取引を1件ずつ取り込み、連続損失回数・ヒートインデックス用の
+    直近20件/その前20件の損益合計・ケリー基準用の勝敗集計をO(1)で更新する。
+    to_checkpoint()/from_checkpoint()で状態を保存・復元できる。
+    """
+
+    HEAT_WINDOW = 20
+
+    @staticmethod
+    def trade_key(trade: Dict) -> str:
+        """取引の識別キー（取引ID・決済時刻・損益）"""
+        return repr(
+            (
+                trade.get("trade_id", trade.get("id")),
+                str(trade.get("exit_time", trade.get("timestamp"))),
+                trade.get("pnl", 0),
+            )
+        )
+
+    def __init__(self):
+        self.trade_count = 0
+        self.consecutive_losses = 0
+        self.win_count = 0
+        self.win_sum = 0.0
+        self.loss_count = 0
+        self.loss_sum = 0.0
+        self.recent = deque(maxlen=self.HEAT_WINDOW)
+        self.recent_sum = 0.0
+        self.historical = deque(maxlen=self.HEAT_WINDOW)
+        self.historical_sum = 0.0
+        self.last_trade_key: Optional[str] = None
+
+    def add_trade(self, pnl: float, trade_key: Optional[str] = None):
+        """決済済み取引の追加"""
+        self.trade_count += 1
+        self.last_trade_key = trade_key
+
+        if pnl < 0:
+            self.consecutive_losses += 1
+            self.loss_count += 1
+            self.loss_sum += pnl
+        else:
+            self.consecutive_losses = 0
+            if pnl > 0:
+                self.win_count += 1
+                self.win_sum += pnl
+
+        # 直近窓から押し出された損益はその前の窓へ移る
+        if len(self.recent) == self.HEAT_WINDOW:
+            moved = self.recent[0]
+            self.recent_sum -= moved
+            if len(self.historical) == self.HEAT_WINDOW:
+                self.historical_sum -= self.historical[0]
+            self.historical.append(moved)
+            self.historical_sum += moved
+        self.recent.append(pnl)
+        self.recent_sum += pnl
+
+    def sync(self, trade_history: List[Dict]):
+        """
+        取引履歴との同期
+
+        最後に取り込んだ取引が履歴の同じ位置にあれば（追記のみの履歴）未取り込みの
+        末尾だけを追加する。位置がずれている・別の取引に置き換わっている・
+        識別キーが不明な場合は別の履歴とみなして全件から集計し直す。
+        """
+        if self.trade_count and (
+            len(trade_history) < self.trade_count
+            or self.last_trade_key is None
+            or self.trade_key(trade_history[self.trade_count - 1])
+            != self.last_trade_key
+        ):
+            self.__init__()
+        for trade in trade_history[self.trade_count :]:
+            self.add_trade(trade.get("pnl", 0), self.trade_key(trade))
+
+    def heat_index(self) -> float:
+        """ヒートインデックス（直近20取引とその前20取引の平均損益比較）"""
+        if self.trade_count < 10 or not self.historical:
+            return 0.0
+
+        recent_avg = self.recent_sum / len(self.recent)
+        historical_avg = self.historical_sum / len(self.historical)
+        if historical_avg == 0:
+            return 0.0
+
+        performance_decline = (historical_avg - recent_avg) / abs(historical_avg)
+        return max(0.0, min(1.0, performance_decline))
+
+    def kelly_position_size(self, fraction: float = 0.25) -> float:
+        """ケリー基準ベースポジションサイズ"""
+        if self.trade_count < 30 or not self.win_count or not self.loss_count:
+            return 0.01
+
+        win_rate = self.win_count / self.trade_count
+        avg_win = self.win_sum / self.win_count
+        avg_loss = abs(self.loss_sum / self.loss_count)
+        if avg_loss == 0:
+            return 0.01
+
+        kelly_fraction = (win_rate * avg_win - (1 - win_rate) * avg_loss) / avg_win
+        return max(0.01, min(kelly_fraction * fraction, 0.10))  # 最大10%
+
+    def to_checkpoint(self) -> Dict:
+        """状態の保存"""
+        return {
+            "trade_count": self.trade_count,
+            "consecutive_losses": self.consecutive_losses,
+            "win_count": self.win_count,
+            "win_sum": self.win_sum,
+            "loss_count": self.loss_count,
+            "loss_sum": self.loss_sum,
+            "recent": list(self.recent),
+            "historical": list(self.historical),
+            "last_trade_key": self.last_trade_key,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: Dict) -> "TradeStatisticsAccumulator":
+        """状態の復元"""
+        accumulator = cls()
+        for key in (
+            "trade_count",
+            "consecutive_losses",
+            "win_count",
+            "win_sum",
+            "loss_count",
+            "loss_sum",
+        ):
+            setattr(accumulator, key, checkpoint[key])
+        accumulator.recent.extend(checkpoint["recent"])
+        accumulator.recent_sum = sum(accumulator.recent)
+        accumulator.historical.extend(checkpoint["historical"])
+        accumulator.historical_sum = sum(accumulator.historical)
+        accumulator.last_trade_key = checkpoint.get("last_trade_key")
+        return accumulator
+
+
 class AdaptiveRiskManager:
     """適応型リスク管理システム"""
 
@@ -214,6 +549,32 @@ class AdaptiveRiskManager:
         self.max_daily_risk = 0.06  # 6%日次リスク
         self.max_drawdown_limit = 0.20  # 20%最大ドローダウン
 
+        # ポートフォリオリスク（相関・VaR）
+        self.portfolio_risk = PortfolioRiskEngine(
+            base_params.get("symbols", ["USDJPY", "GBPJPY", "EURUSD"]),
+            confidence=base_params.get("var_confidence", 0.99),
+        )
+
+        # 価格取り込み状況（通貨ペア別の取り込み済みバー時刻、同一バー時刻の価格）
+        self._fed_bar_times: Dict[str, datetime] = {}
+        self._pending_bar_time: Optional[datetime] = None
+        self._pending_prices: Dict[str, float] = {}
+
+        # 取引統計（決済ごとに増分更新）
+        self.trade_statistics = TradeStatisticsAccumulator()
+
+        # 現在のリスク管理パラメータ（calculate_adaptive_risk_parametersで更新）
+        self.risk_params = RiskParameters(
+            position_size=0.01,
+            stop_loss_pips=0.0,
+            take_profit_pips=0.0,
+            max_drawdown_limit=self.max_drawdown_limit,
+            daily_loss_limit=self.max_daily_risk * self.account_balance,
+            volatility_multiplier=1.0,
+            exposure_limit=base_params.get("exposure_limit", 0.02),
+            var_limit=base_params.get("var_limit", 0.01),
+        )
+
         # 市場環境別調整係数
         self.environment_adjustments = {
             "volatility": {
@@ -234,14 +595,102 @@ class AdaptiveRiskManager:
             },
         }
 
+    def update_market_prices(self, prices: Dict[str, float]):
+        """バー確定時の価格更新（共分散行列の増分更新）"""
+        self.portfolio_risk.update(prices)
+
+    def observe_price_data(self, price_data: List[Dict], symbol: Optional[str] = None):
+        """
+        市場データ経路からの価格取り込み
+
+        未取り込みのバーの終値をバー時刻ごとに通貨ペア横断で集め、バー時刻が
+        進んだ時点で1観測としてupdate_market_prices()に渡す。初回は最新バーから
+        取り込む（通貨ペアごとの履歴を順に流すと観測時刻が揃わないため）。
+        バー時刻（datetime）のないバーは観測時刻を揃えられないため取り込まない。
+        """
+        if not price_data:
+            return
+        symbol = symbol or self.base_params.get("symbol") or price_data[-1].get("symbol")
+        if symbol not in self.portfolio_risk.symbol_index:
+            return
+
+        recent_bars = price_data[-50:]
+        timed_bars = [bar for bar in recent_bars if bar.get("datetime") is not None]
+        if len(timed_bars) < len(recent_bars):
+            logger.debug(
+                f"datetimeのないバーを除外: {symbol} "
+                f"({len(recent_bars) - len(timed_bars)}/{len(recent_bars)})"
+            )
+        if not timed_bars:
+            return
+
+        fed_until = self._fed_bar_times.get(symbol)
+        new_bars = (
+            [bar for bar in timed_bars if bar["datetime"] > fed_until]
+            if fed_until is not None
+            else timed_bars[-1:]
+        )
+        for bar in new_bars:
+            bar_time = bar["datetime"]
+            if self._pending_bar_time is not None and bar_time > self._pending_bar_time:
+                self.update_market_prices(self._pending_prices)
+                self._pending_prices = {}
+            if self._pending_bar_time is None or bar_time >= self._pending_bar_time:
+                self._pending_bar_time = bar_time
+                self._pending_prices[symbol] = bar["close"]
+            self._fed_bar_times[symbol] = bar_time
+
+    def record_trade(self, trade: Dict):
+        """決済済み取引の記録（取引統計の増分更新）"""
+        self.trade_statistics.add_trade(
+            trade.get("pnl", 0), TradeStatisticsAccumulator.trade_key(trade)
+        )
+
+    def get_trade_statistics_checkpoint(self) -> Dict:
+        """取引統計のチェックポイント取得"""
+        return self.trade_statistics.to_checkpoint()
+
+    def restore_trade_statistics(self, checkpoint: Dict):
+        """チェックポイントからの取引統計復元"""
+        self.trade_statistics = TradeStatisticsAccumulator.from_checkpoint(checkpoint)
+
+    def evaluate_candidate_trades(
+        self, candidates: List[Dict], current_positions: List[Dict] = None
+    ) -> List[Dict]:
+        """
+        エントリー候補の一括リスク評価
+
+        候補を加えた後のパラメトリックVaRがVaR上限、総エクスポージャーが
+        エクスポージャー上限（いずれも口座残高に対する比率）を超える候補は
+        不許可とする。
+        """
+        if current_positions is None:
+            current_positions = []
+
+        var_limit = self.account_balance * self.risk_params.var_limit
+        current_exposure = self._calculate_total_exposure(current_positions)
+        results = self.portfolio_risk.evaluate_candidates(current_positions, candidates)
+        for candidate, result in zip(candidates, results):
+            total_exposure = current_exposure + self._calculate_total_exposure([candidate])
+            result["total_exposure"] = total_exposure
+            result["allowed"] = (
+                result["parametric_var"] <= var_limit
+                and total_exposure <= self.risk_params.exposure_limit
+            )
+        return results
+
     def calculate_adaptive_risk_parameters(
         self,
         price_data: List[Dict],
         current_time: datetime,
         current_drawdown: float = 0.0,
+        symbol: Optional[str] = None,
     ) -> RiskParameters:
         """適応型リスク管理パラメータ計算"""
 
+        # ポートフォリオリスク用の価格取り込み
+        self.observe_price_data(price_data, symbol)
+
         # 市場環境検知
         market_env = self.environment_detector.detect_market_environment(
             price_data, current_time
@@ -289,7 +738,7 @@ class AdaptiveRiskManager:
             adjusted_position_size *= max(drawdown_multiplier, 0.3)
 
         # 最終パラメータ
-        return RiskParameters(
+        self.risk_params = RiskParameters(
             position_size=max(adjusted_position_size, 0.01),  # 最小0.01ロット
             stop_loss_pips=adjusted_stop_loss * 10000,  # pips変換
             take_profit_pips=adjusted_take_profit * 10000,
@@ -301,10 +750,12 @@ class AdaptiveRiskManager:
             # 新強化項目
             max_consecutive_losses=3,
             correlation_limit=0.7,
-            exposure_limit=0.02,
+            exposure_limit=self.risk_params.exposure_limit,
+            var_limit=self.risk_params.var_limit,
             heat_index_limit=0.5,
             kelly_fraction=0.25,
         )
+        return self.risk_params
 
     def _calculate_base_position_size(self, current_atr: float) -> float:
         """基本ポジションサイズ計算"""
@@ -332,9 +783,13 @@ class AdaptiveRiskManager:
         current_drawdown: float,
         daily_loss: float,
         open_positions: int,
+        symbol: Optional[str] = None,
     ) -> Tuple[bool, str]:
         """トレード実行判定"""
 
+        # ポートフォリオリスク用の価格取り込み
+        self.observe_price_data(price_data, symbol)
+
         # 最大ドローダウンチェック
         if current_drawdown >= self.max_drawdown_limit:
             return False, "最大ドローダウン到達"
@@ -369,7 +824,7 @@ class AdaptiveRiskManager:
         return True, "取引可能"
 
     def get_market_analysis(
-        self, price_data: List[Dict], current_time: datetime
+        self, price_data: List[Dict], current_time: datetime, symbol: Optional[str] = None
     ) -> Dict:
         """市場分析レポート"""
 
@@ -383,7 +838,9 @@ class AdaptiveRiskManager:
             current_atr, historical_atr
         )
 
-        risk_params = self.calculate_adaptive_risk_parameters(price_data, current_time)
+        risk_params = self.calculate_adaptive_risk_parameters(
+            price_data, current_time, symbol=symbol
+        )
 
         return {
             "timestamp": current_time.isoformat(),
@@ -413,18 +870,27 @@ class AdaptiveRiskManager:
         }
 
     def calculate_advanced_risk_metrics(
-        self, trade_history: List[Dict], current_positions: List[Dict] = None
+        self, trade_history: List[Dict] = None, current_positions: List[Dict] = None
     ) -> Dict:
-        """高度なリスク指標計算"""
+        """
+        高度なリスク指標計算
+
+        trade_historyを省略した場合はrecord_trade()で記録済みの取引統計を使う。
+        渡された場合は記録済みの取引の続きであれば末尾のみを増分集計し、
+        別の履歴であれば全件から集計し直す。
+        """
 
         if current_positions is None:
             current_positions = []
+        if trade_history is not None:
+            self.trade_statistics.sync(trade_history)
+        statistics = self.trade_statistics
 
         # 連続損失回数
-        consecutive_losses = self._calculate_consecutive_losses(trade_history)
+        consecutive_losses = statistics.consecutive_losses
 
         # ヒートインデックス（パフォーマンス低下指標）
-        heat_index = self._calculate_heat_index(trade_history)
+        heat_index = statistics.heat_index()
 
         # 相関分析（複数ポジション間）
         correlation_risk = self._calculate_correlation_risk(current_positions)
@@ -432,8 +898,18 @@ class AdaptiveRiskManager:
         # エクスポージャー計算
         total_exposure = self._calculate_total_exposure(current_positions)
 
+        # ポートフォリオVaR（口座残高比）
+        var_ratio = self._calculate_var_ratio(current_positions)
+
         # ケリー基準ベース推奨ポジションサイズ
-        kelly_size = self._calculate_kelly_position_size(trade_history)
+        kelly_size = statistics.kelly_position_size()
+
+        # ポートフォリオVaR・CVaR
+        portfolio_risk = (
+            self.portfolio_risk.portfolio_risk(current_positions)
+            if self.portfolio_risk.is_ready()
+            else {}
+        )
 
         return {
             "advanced_metrics": {
@@ -441,63 +917,35 @@ class AdaptiveRiskManager:
                 "heat_index": heat_index,
                 "correlation_risk": correlation_risk,
                 "total_exposure": total_exposure,
+                "portfolio_var_ratio": var_ratio,
                 "kelly_recommended_size": kelly_size,
+                "portfolio_risk": portfolio_risk,
             },
             "risk_alerts": {
                 "consecutive_loss_alert": consecutive_losses >= 3,
                 "heat_index_alert": heat_index > 0.5,
                 "correlation_alert": correlation_risk > 0.7,
-                "exposure_alert": total_exposure > 0.02,
+                "exposure_alert": total_exposure > self.risk_params.exposure_limit,
+                "var_alert": var_ratio > self.risk_params.var_limit,
             },
             "recommended_actions": self._generate_risk_recommendations(
-                consecutive_losses, heat_index, correlation_risk, total_exposure
+                consecutive_losses, heat_index, correlation_risk, total_exposure, var_ratio
             ),
         }
 
-    def _calculate_consecutive_losses(self, trade_history: List[Dict]) -> int:
-        """連続損失回数計算"""
-        if not trade_history:
-            return 0
-
-        consecutive_losses = 0
-        for trade in reversed(trade_history):
-            if trade.get("pnl", 0) < 0:
-                consecutive_losses += 1
-            else:
-                break
-
-        return consecutive_losses
-
-    def _calculate_heat_index(self, trade_history: List[Dict]) -> float:
-        """ヒートインデックス計算（パフォーマンス低下指標）"""
-        if len(trade_history) < 10:
-            return 0.0
-
-        # 直近20取引と過去20取引の比較
-        recent_trades = trade_history[-20:]
-        historical_trades = (
-            trade_history[-40:-20] if len(trade_history) >= 40 else trade_history[:-20]
-        )
-
-        recent_avg = sum(t.get("pnl", 0) for t in recent_trades) / len(recent_trades)
-        historical_avg = (
-            sum(t.get("pnl", 0) for t in historical_trades) / len(historical_trades)
-            if historical_trades
-            else 0
-        )
-
-        if historical_avg == 0:
-            return 0.0
-
-        # パフォーマンス低下率
-        performance_decline = (historical_avg - recent_avg) / abs(historical_avg)
-        return max(0.0, min(1.0, performance_decline))
-
     def _calculate_correlation_risk(self, current_positions: List[Dict]) -> float:
         """相関リスク計算"""
         if len(current_positions) < 2:
             return 0.0
 
+        # 共分散推定済みなら相関集中度（EWMA共分散ベース）
+        if self.portfolio_risk.is_ready() and all(
+            p.get("symbol") in self.portfolio_risk.symbol_index
+            for p in current_positions
+        ):
+            exposure = self.portfolio_risk.exposure_vector(current_positions)
+            return self.portfolio_risk.diversification_ratio(exposure)
+
         # 簡易相関（同方向ポジション比率）
         long_positions = sum(
             1 for p in current_positions if p.get("direction") == "BUY"
@@ -522,32 +970,14 @@ class AdaptiveRiskManager:
         total_exposure = sum(p.get("position_size", 0) for p in current_positions)
         return total_exposure / self.account_balance
 
-    def _calculate_kelly_position_size(self, trade_history: List[Dict]) -> float:
-        """ケリー基準ベースポジションサイズ"""
-        if len(trade_history) < 30:
-            return 0.01
-
-        # 勝率計算
-        winning_trades = [t for t in trade_history if t.get("pnl", 0) > 0]
-        losing_trades = [t for t in trade_history if t.get("pnl", 0) < 0]
-
-        if not winning_trades or not losing_trades:
-            return 0.01
-
-        win_rate = len(winning_trades) / len(trade_history)
-        avg_win = sum(t["pnl"] for t in winning_trades) / len(winning_trades)
-        avg_loss = abs(sum(t["pnl"] for t in losing_trades) / len(losing_trades))
-
-        if avg_loss == 0:
-            return 0.01
-
-        # ケリー基準
-        kelly_fraction = (win_rate * avg_win - (1 - win_rate) * avg_loss) / avg_win
-
-        # 安全係数適用（25%）
-        safe_kelly = kelly_fraction * 0.25
+    def _calculate_var_ratio(self, current_positions: List[Dict]) -> float:
+        """ポートフォリオVaR（相関考慮のパラメトリックVaR）の口座残高比"""
+        if not current_positions or not self.portfolio_risk.is_ready():
+            return 0.0
 
-        return max(0.01, min(safe_kelly, 0.10))  # 最大10%
+        exposure = self.portfolio_risk.exposure_vector(current_positions)
+        var = self.portfolio_risk.parametric_var(exposure)["var"]
+        return var / self.account_balance
 
     def _generate_risk_recommendations(
         self,
@@ -555,6 +985,7 @@ class AdaptiveRiskManager:
         heat_index: float,
         correlation_risk: float,
         total_exposure: float,
+        var_ratio: float = 0.0,
     ) -> List[str]:
         """リスク推奨事項生成"""
         recommendations = []
@@ -568,9 +999,12 @@ class AdaptiveRiskManager:
         if correlation_risk > 0.7:
             recommendations.append("ポジション相関が高いため分散化必要")
 
-        if total_exposure > 0.02:
+        if total_exposure > self.risk_params.exposure_limit:
             recommendations.append("総エクスポージャーが上限超過、ポジション削減")
 
+        if var_ratio > self.risk_params.var_limit:
+            recommendations.append("ポートフォリオVaRが上限超過、相関ポジション削減")
+
         if not recommendations:
             recommendations.append("リスクレベル正常、取引継続可能")
 
@@ -599,7 +1033,12 @@ def main():
         )
 
     # リスク管理システム初期化
-    base_params = {"stop_atr": 1.3, "profit_atr": 2.5, "atr_period": 14}
+    base_params = {
+        "stop_atr": 1.3,
+        "profit_atr": 2.5,
+        "atr_period": 14,
+        "symbol": "USDJPY",
+    }
 
     risk_manager = AdaptiveRiskManager(base_params)
 
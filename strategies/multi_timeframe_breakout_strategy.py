@@ -12,6 +12,8 @@
 import math
 from datetime import datetime, timedelta
 
+import numpy as np
+
 
 class MultiTimeframeData:
     """複数時間軸データ管理クラス"""
@@ -501,86 +503,182 @@ class MultiTimeframeBreakoutStrategy:
             return entry_price, "timeout"
 
 
-def create_enhanced_sample_data():
-    """
-    改善されたサンプルデータ生成（5年間・40万バー）
-    市場パターンに基づく疑似データ生成
+# 合成データ生成パラメータ
+BARS_PER_DAY = 288  # M5
+BARS_PER_WEEK = BARS_PER_DAY * 5  # 週末除く
+BARS_PER_YEAR = int(365.25 / 7 * BARS_PER_WEEK)
+SAMPLE_BASE_PRICE = 1.1000
+SYMBOL_BASE_PRICES = {
+    "EURUSD": 1.1000,
+    "GBPUSD": 1.3000,
+    "USDJPY": 110.00,
+    "GBPJPY": 140.00,
+}
+
+
+def _session_volatility_table():
+    """時間帯別ボラティリティ倍率（0-23時）"""
+    table = np.empty(24)
+    for hour in range(24):
+        if 7 <= hour <= 16:  # ロンドンセッション
+            table[hour] = 1.2
+        elif 12 <= hour <= 21:  # NYセッション（重複含む）
+            table[hour] = 1.5
+        elif hour >= 23 or hour <= 8:  # 東京セッション
+            table[hour] = 0.8
+        else:
+            table[hour] = 0.6
+    return table
+
+
+def _weekday_timestamps(start_date, n_bars):
+    """週末を除くM5タイムスタンプ列（土日は翌月曜0時へスキップ）"""
+    start = np.datetime64(start_date, "m")
+    start_day = start.astype("datetime64[D]")
+    # 1970-01-01は木曜日 → 月曜始まりの曜日番号
+    weekday = (start_day.astype(np.int64) + 3) % 7
+    monday = start_day - weekday
+    if weekday >= 5:
+        offset = BARS_PER_WEEK
+    else:
+        minutes = (start - start_day.astype("datetime64[m]")).astype(np.int64)
+        offset = weekday * BARS_PER_DAY + minutes // 5
+
+    slots = offset + np.arange(n_bars, dtype=np.int64)
+    weeks, week_slots = np.divmod(slots, BARS_PER_WEEK)
+    minutes_from_monday = weeks * 7 * 1440 + week_slots * 5
+    return monday.astype("datetime64[m]") + minutes_from_monday
+
+
+def _reflect_into_range(values, low, high):
+    """価格範囲制限（境界で反射させ、増分の分布を保つ）"""
+    width = high - low
+    folded = np.mod(values - low, 2 * width)
+    return low + width - np.abs(folded - width)
+
+
+def generate_enhanced_sample_columns(
+    n_bars=400000,
+    start_date=datetime(2019, 1, 1),
+    initial_price=SAMPLE_BASE_PRICE,
+    seed=None,
+):
     """
-    import math
-    import random
+    改善されたサンプルデータ生成（ベクトル化・列形式）
+
+    create_enhanced_sample_dataと同じ統計構造（サイクルトレンド・
+    時間帯別ボラティリティ・週末スキップ）をNumPyで一括生成する。
+    価格幅・ボラティリティはinitial_priceに比例してスケールする。
 
-    base_date = datetime(2019, 1, 1)  # 5年間データ
-    data = []
+    Args:
+        n_bars: バー数（5年 ≒ 40万バー）
+        start_date: 開始日時
+        initial_price: 初期価格
+        seed: 乱数シード（Noneなら非決定的）
 
-    current_date = base_date
-    price = 1.1000
+    Returns:
+        dict: datetime/open/high/low/close/volume の列配列
+    """
+    rng = np.random.default_rng(seed)
+    scale = initial_price / SAMPLE_BASE_PRICE
 
     # 市場サイクルパラメータ
     cycle_length = 5000  # 約2週間のサイクル
-    volatility_base = 0.0001
+    volatility_base = 0.0001 * scale
+
+    timestamps = _weekday_timestamps(start_date, n_bars)
+    hours = (timestamps.astype("datetime64[h]").astype(np.int64)) % 24
+
+    # サイクルベースのトレンド（正弦波）
+    cycle_position = (np.arange(n_bars) % cycle_length) / cycle_length
+    trend_component = np.sin(2 * np.pi * cycle_position) * 0.00005 * scale
+
+    # 時間帯ベースのボラティリティ調整
+    volatility = volatility_base * _session_volatility_table()[hours]
+
+    # ノイズ成分（正規分布）と価格パス
+    noise_component = rng.standard_normal(n_bars) * volatility
+    price = initial_price + np.cumsum(trend_component + noise_component)
+    price = _reflect_into_range(price, 0.9000 * scale, 1.3000 * scale)
+
+    # 現実的なOHLC生成（足内変動を現実的な範囲に制限）
+    intrabar_range = volatility * 1.5
+    open_price = price
+    high = open_price + np.abs(rng.standard_normal(n_bars) * intrabar_range / 3)
+    low = open_price - np.abs(rng.standard_normal(n_bars) * intrabar_range / 3)
+    close = open_price + rng.standard_normal(n_bars) * intrabar_range / 4
+
+    # 整合性確保
+    high = np.maximum.reduce([open_price, high, close])
+    low = np.minimum.reduce([open_price, low, close])
+
+    volume = (100 + np.abs(rng.standard_normal(n_bars) * 50)).astype(np.int64)
+
+    return {
+        "datetime": timestamps.astype("datetime64[ns]"),
+        "open": open_price,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    }
 
-    for i in range(400000):  # 約5年分のM5バー
-        # サイクル位置（0-1）
-        cycle_position = (i % cycle_length) / cycle_length
 
-        # サイクルベースのトレンド（正弦波）
-        trend_component = math.sin(2 * math.pi * cycle_position) * 0.00005
+def generate_multi_symbol_columns(
+    symbols=("EURUSD", "USDJPY", "GBPJPY"),
+    years=5,
+    start_date=datetime(2019, 1, 1),
+    seed=None,
+):
+    """
+    複数通貨ペア・複数年のストレステスト用データ生成
 
-        # 時間帯ベースのボラティリティ調整
-        hour = current_date.hour
-        if 7 <= hour <= 16:  # ロンドンセッション
-            volatility_multiplier = 1.2
-        elif 12 <= hour <= 21:  # NYセッション（重複含む）
-            volatility_multiplier = 1.5
-        elif hour >= 23 or hour <= 8:  # 東京セッション
-            volatility_multiplier = 0.8
-        else:
-            volatility_multiplier = 0.6
-
-        volatility = volatility_base * volatility_multiplier
-
-        # ノイズ成分（正規分布）
-        noise_component = random.gauss(0, volatility)
-
-        # 価格更新
-        price_change = trend_component + noise_component
-        price += price_change
-        price = max(0.9000, min(1.3000, price))  # 価格範囲制限
-
-        # 現実的なOHLC生成
-        # 足内変動を現実的な範囲に制限
-        intrabar_range = volatility * 1.5
-
-        open_price = price
-        high = open_price + abs(random.gauss(0, intrabar_range / 3))
-        low = open_price - abs(random.gauss(0, intrabar_range / 3))
-        close = open_price + random.gauss(0, intrabar_range / 4)
-
-        # 整合性確保
-        high = max(open_price, high, close)
-        low = min(open_price, low, close)
-
-        data.append(
-            {
-                "datetime": current_date,
-                "open": open_price,
-                "high": high,
-                "low": low,
-                "close": close,
-                "volume": int(100 + abs(random.gauss(0, 50))),  # 現実的な出来高
-            }
+    通貨ペアごとに独立した乱数ストリーム（SeedSequence.spawn）を使うため、
+    同じseedなら通貨ペアの組み合わせに依らず各系列は再現可能。
+
+    Returns:
+        dict: 通貨ペア → 列配列
+    """
+    n_bars = int(years * BARS_PER_YEAR)
+    child_seeds = np.random.SeedSequence(seed).spawn(len(symbols))
+    return {
+        symbol: generate_enhanced_sample_columns(
+            n_bars=n_bars,
+            start_date=start_date,
+            initial_price=SYMBOL_BASE_PRICES.get(symbol, SAMPLE_BASE_PRICE),
+            seed=child_seed,
         )
+        for symbol, child_seed in zip(symbols, child_seeds)
+    }
 
-        current_date += timedelta(minutes=5)
 
-        # 週末スキップ処理
-        if current_date.weekday() >= 5:
-            # 土曜日なら月曜日の朝まで飛ばす
-            days_to_monday = 7 - current_date.weekday()
-            current_date += timedelta(days=days_to_monday)
-            current_date = current_date.replace(hour=0, minute=0)
+def create_enhanced_sample_data(seed=None):
+    """
+    改善されたサンプルデータ生成（5年間・40万バー）
+    市場パターンに基づく疑似データ生成
 
-    return data
+    生成はgenerate_enhanced_sample_columnsで行い、従来形式の辞書リストに展開する。
+    """
+    columns = generate_enhanced_sample_columns(seed=seed)
+    datetimes = columns["datetime"].astype("datetime64[us]").astype(object)
+    return [
+        {
+            "datetime": current_date,
+            "open": open_price,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+        for current_date, open_price, high, low, close, volume in zip(
+            datetimes,
+            columns["open"].tolist(),
+            columns["high"].tolist(),
+            columns["low"].tolist(),
+            columns["close"].tolist(),
+            columns["volume"].tolist(),
+        )
+    ]
 
 
 def main():
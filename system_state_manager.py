@@ -12,11 +12,11 @@ import asyncio
 import json
 import gzip
 import logging
-import aiosqlite
 import time
 import hashlib
 import pickle
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional, Any, Tuple, Union
@@ -27,6 +27,7 @@ from pathlib import Path
 # 既存システム統合
 sys.path.append(str(Path(__file__).parent))
 from realtime_signal_generator import SystemConstants, get_config_value, CONFIG
+from database_pool import get_connection_pool, get_ingest_queue, WriteLane
 from position_management import PositionTracker
 from risk_management import RiskManager
 from emergency_protection import EmergencyProtectionSystem
@@ -35,6 +36,19 @@ from database_manager import DatabaseManager
 # ログ設定
 logger = logging.getLogger(__name__)
 
+# スナップショットのセクション（差分判定・書き込みの単位）
+SNAPSHOT_SECTIONS = (
+    'active_positions',
+    'risk_parameters',
+    'emergency_status',
+    'component_states',
+    'configuration_data',
+    'performance_metrics'
+)
+SNAPSHOT_FORMAT_VERSION = 3
+# 復旧時に最優先で戻すセクション（残りは取引再開後に遅延復元）
+HOT_SECTIONS = ('active_positions', 'risk_parameters')
+
 class SnapshotType(Enum):
     """スナップショット種別"""
     HOURLY = "HOURLY"
@@ -89,6 +103,133 @@ class RecoveryPlan:
     rollback_available: bool
     risk_assessment: str
 
+class HashingWriter:
+    """書き込みと同時にSHA-256を計算するファイルラッパー"""
+    
+    def __init__(self, raw):
+        self.raw = raw
+        self.hasher = hashlib.sha256()
+        self.bytes_written = 0
+    
+    def write(self, data: bytes) -> int:
+        self.hasher.update(data)
+        self.bytes_written += len(data)
+        return self.raw.write(data)
+    
+    def flush(self):
+        self.raw.flush()
+    
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+
+def _json_serializer(obj):
+    """JSONシリアライザ（datetime・enum対応）"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    elif isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+def _write_gzip_member(writer: HashingWriter, data: bytes) -> Tuple[int, int]:
+    """独立したgzipメンバーとして書き込み、(圧縮後オフセット, 圧縮後長さ)を返す"""
+    offset = writer.bytes_written
+    with gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=6, mtime=0) as gz:
+        gz.write(data)
+    return offset, writer.bytes_written - offset
+
+_CONTAINER_TYPES = (dict, list, tuple)
+
+def _copy_snapshot_sections(value: Any) -> Any:
+    """
+    セクションの構造複製（イベントループ上で実行）
+    
+    稼働中のコンポーネントが更新する辞書・リストのみを複製し、不変の値（文字列・数値・
+    datetime・Enum）は共有する。copy.deepcopyより安価で、ワーカースレッドでの
+    JSONエンコード中に元の辞書が変更されても影響を受けない。
+    """
+    if isinstance(value, dict):
+        return {key: _copy_snapshot_sections(item) if isinstance(item, _CONTAINER_TYPES) else item
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy_snapshot_sections(item) if isinstance(item, _CONTAINER_TYPES) else item
+                for item in value]
+    return value
+
+def _encode_snapshot_sections(sections: Dict[str, Any]) -> Dict[str, bytes]:
+    """セクションのJSONエンコード（ワーカースレッドで実行）"""
+    return {
+        name: json.dumps(value, separators=(',', ':'), sort_keys=True,
+                         default=_json_serializer).encode()
+        for name, value in sections.items()
+    }
+
+def _write_snapshot_file(file_path: Path, header: Dict[str, Any], sections: Dict[str, Any],
+                         base_digests: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    スナップショットファイル書き込み（ワーカースレッドで実行）
+    
+    セクションはイベントループ上で複製済みの辞書を受け取り、JSONエンコード・ダイジェスト・
+    圧縮・チェックサムをすべてこのスレッドで行う。base_digestsが与えられた場合は
+    ダイジェストが変わったセクションのみを書く（差分）。
+    圧縮済みバイト列はHashingWriterを通して書くため、チェックサムのための再読み込みは不要。
+    
+    各セクションは独立したgzipメンバーとして書き、その圧縮後オフセット・長さを
+    復旧索引（section_index）として返す。ファイル全体を展開すると従来どおり
+    1つのJSONオブジェクトになる。
+    """
+    encoded = _encode_snapshot_sections(sections)
+    digests = {name: hashlib.sha256(data).hexdigest() for name, data in encoded.items()}
+    if base_digests is None:
+        written = list(encoded)
+    else:
+        written = [name for name in encoded if digests[name] != base_digests.get(name)]
+    
+    header = dict(header, section_digests=digests, written_sections=written)
+    header_bytes = json.dumps(header, default=_json_serializer).encode()
+    
+    tmp_path = file_path.with_name(file_path.name + '.tmp')
+    section_index = {}
+    original_size = len(header_bytes)
+    with open(tmp_path, 'wb') as raw:
+        writer = HashingWriter(raw)
+        _write_gzip_member(writer, header_bytes[:-1])
+        for name in written:
+            separator = b',"' + name.encode() + b'":'
+            _write_gzip_member(writer, separator)
+            offset, length = _write_gzip_member(writer, encoded[name])
+            section_index[name] = {
+                'offset': offset,
+                'length': length,
+                'size': len(encoded[name]),
+                'digest': digests[name]
+            }
+            original_size += len(separator) + len(encoded[name])
+        _write_gzip_member(writer, b'}')
+    os.replace(tmp_path, file_path)
+    
+    return {
+        'checksum': writer.hexdigest(),
+        'file_size': writer.bytes_written,
+        'original_size': original_size,
+        'section_digests': digests,
+        'written_sections': written,
+        'section_index': section_index
+    }
+
+def _read_snapshot_section(file_path: str, entry: Dict[str, Any]) -> Any:
+    """復旧索引のオフセットから1セクションだけを読み込み・展開"""
+    with open(file_path, 'rb') as f:
+        f.seek(entry['offset'])
+        data = gzip.decompress(f.read(entry['length']))
+    if hashlib.sha256(data).hexdigest() != entry['digest']:
+        raise ValueError(f"Snapshot section digest mismatch: {file_path}@{entry['offset']}")
+    return json.loads(data)
+
+def _read_snapshot_file(file_path: str) -> Dict[str, Any]:
+    """スナップショットファイル全体の読み込み（索引のない旧形式用）"""
+    with gzip.open(file_path, 'rb') as f:
+        return json.loads(f.read())
+
 class SystemStateManager:
     """
     システム状態管理システム - kiro設計tasks.md:135-141準拠
@@ -109,6 +250,20 @@ class SystemStateManager:
         self.snapshot_dir = Path(self.config.get('snapshots', {}).get('directory', './snapshots'))
         self.snapshot_dir.mkdir(exist_ok=True)
         
+        # 差分スナップショット設定（ベース1つ + 変更セクションのみの差分）
+        self.base_snapshot_interval = self.config.get('snapshots', {}).get('base_interval', 24)
+        self._base_snapshot_id: Optional[str] = None
+        self._base_digests: Optional[Dict[str, str]] = None
+        self._deltas_since_base = 0
+        self._snapshot_lock = asyncio.Lock()
+        # シリアライズ・圧縮・ハッシュはイベントループ外の単一ワーカーで順次実行
+        self._snapshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshot-writer')
+        
+        # クラッシュ復旧（ホットセクション即時・残りは遅延復元）
+        self.recovered_state: Dict[str, Any] = {}
+        self._recovery_index: Dict[str, Tuple[str, Optional[Dict[str, Any]]]] = {}
+        self._deferred_restore_task = None
+        
         self.max_snapshots_per_type = {
             SnapshotType.HOURLY: 24,      # 24時間分
             SnapshotType.DAILY: 30,       # 30日分
@@ -162,7 +317,7 @@ class SystemStateManager:
     async def _initialize_snapshot_tables(self):
         """スナップショット管理テーブル初期化"""
         try:
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
+            async with get_connection_pool(self.db_manager.db_path).writer() as conn:
                 # スナップショット詳細テーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS system_snapshot_details (
@@ -178,10 +333,23 @@ class SystemStateManager:
                         recovery_priority INTEGER DEFAULT 5,
                         validation_status TEXT DEFAULT 'PENDING',
                         description TEXT,
+                        base_snapshot_id TEXT,
+                        is_delta INTEGER DEFAULT 0,
+                        section_index TEXT,
                         created_at TEXT DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
                 
+                # 差分スナップショット列（既存テーブルへの追加）
+                cursor = await conn.execute('PRAGMA table_info(system_snapshot_details)')
+                existing_columns = {row[1] for row in await cursor.fetchall()}
+                if 'base_snapshot_id' not in existing_columns:
+                    await conn.execute('ALTER TABLE system_snapshot_details ADD COLUMN base_snapshot_id TEXT')
+                if 'is_delta' not in existing_columns:
+                    await conn.execute('ALTER TABLE system_snapshot_details ADD COLUMN is_delta INTEGER DEFAULT 0')
+                if 'section_index' not in existing_columns:
+                    await conn.execute('ALTER TABLE system_snapshot_details ADD COLUMN section_index TEXT')
+                
                 # 復旧履歴テーブル
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS recovery_history (
@@ -209,7 +377,7 @@ class SystemStateManager:
         """前回シャットダウン状態確認 - kiro要件5.3準拠"""
         try:
             # 最新のシャットダウンスナップショット確認
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
+            async with get_connection_pool(self.db_manager.db_path).reader() as conn:
                 cursor = await conn.execute('''
                     SELECT snapshot_id, timestamp, validation_status
                     FROM system_snapshot_details
@@ -219,19 +387,20 @@ class SystemStateManager:
                 ''', (SnapshotType.SHUTDOWN.value,))
                 
                 last_shutdown = await cursor.fetchone()
+            
+            # 復旧処理は書き込み接続を使うため読み込み接続を返却してから実行
+            if last_shutdown:
+                snapshot_id, timestamp, validation_status = last_shutdown
+                logger.info(f"Previous shutdown snapshot found: {snapshot_id}")
                 
-                if last_shutdown:
-                    snapshot_id, timestamp, validation_status = last_shutdown
-                    logger.info(f"Previous shutdown snapshot found: {snapshot_id}")
-                    
-                    # 異常終了検知
-                    if validation_status != 'VALIDATED':
-                        logger.warning("Previous shutdown was not clean - potential crash detected")
-                        await self._handle_crash_recovery(snapshot_id)
-                    else:
-                        logger.info("Previous shutdown was clean")
+                # 異常終了検知
+                if validation_status != 'VALIDATED':
+                    logger.warning("Previous shutdown was not clean - potential crash detected")
+                    await self._handle_crash_recovery(snapshot_id)
                 else:
-                    logger.info("No previous shutdown snapshot found")
+                    logger.info("Previous shutdown was clean")
+            else:
+                logger.info("No previous shutdown snapshot found")
                     
         except Exception as e:
             logger.error(f"Previous shutdown check error: {e}")
@@ -300,25 +469,35 @@ class SystemStateManager:
                 recovery_priority=self._calculate_recovery_priority(snapshot_type)
             )
             
-            # ファイル保存
-            file_path = await self._save_snapshot_to_file(snapshot)
-            
-            # チェックサム計算
-            checksum = await self._calculate_file_checksum(file_path)
-            file_size = file_path.stat().st_size
-            
-            # 圧縮比計算（推定）
-            snapshot_data_temp = asdict(snapshot)
-            original_size = len(json.dumps(snapshot_data_temp, default=lambda x: x.isoformat() if isinstance(x, datetime) else (x.value if isinstance(x, Enum) else str(x))).encode())
-            compression_ratio = file_size / original_size if original_size > 0 else 1.0
+            # ファイル保存（ベースまたは差分）
+            async with self._snapshot_lock:
+                is_base = (
+                    self._base_digests is None
+                    or self._deltas_since_base >= self.base_snapshot_interval
+                    or snapshot_type in (SnapshotType.DAILY, SnapshotType.SHUTDOWN)
+                )
+                base_snapshot_id = None if is_base else self._base_snapshot_id
+                file_path, result = await self._save_snapshot_to_file(
+                    snapshot, None if is_base else self._base_digests, base_snapshot_id
+                )
+                
+                if is_base:
+                    self._base_snapshot_id = snapshot_id
+                    self._base_digests = result['section_digests']
+                    self._deltas_since_base = 0
+                else:
+                    self._deltas_since_base += 1
             
             # スナップショット更新
-            snapshot.file_size_bytes = file_size
-            snapshot.compression_ratio = compression_ratio
-            snapshot.checksum = checksum
+            snapshot.file_size_bytes = result['file_size']
+            snapshot.compression_ratio = (
+                result['file_size'] / result['original_size'] if result['original_size'] > 0 else 1.0
+            )
+            snapshot.checksum = result['checksum']
             
             # データベース記録
-            await self._save_snapshot_metadata(snapshot, str(file_path))
+            await self._save_snapshot_metadata(snapshot, str(file_path), base_snapshot_id,
+                                               result['section_index'])
             
             # 古いスナップショット削除
             await self._cleanup_old_snapshots(snapshot_type)
@@ -459,70 +638,77 @@ class SystemStateManager:
         }
         return priority_map.get(snapshot_type, 5)
     
-    async def _save_snapshot_to_file(self, snapshot: SystemSnapshot) -> Path:
-        """スナップショットファイル保存"""
+    async def _save_snapshot_to_file(self, snapshot: SystemSnapshot,
+                                     base_digests: Optional[Dict[str, str]] = None,
+                                     base_snapshot_id: Optional[str] = None) -> Tuple[Path, Dict[str, Any]]:
+        """
+        スナップショットファイル保存
+        
+        base_digestsを渡すとベースから変化したセクションのみの差分ファイルになる。
+        イベントループ上ではセクションの構造複製のみを行い、JSONエンコード・
+        圧縮・チェックサム・書き込みはスナップショット専用ワーカースレッドで行う。
+        """
         try:
-            file_name = f"{snapshot.snapshot_id}_{snapshot.snapshot_type.value}.json.gz"
+            suffix = 'delta' if base_digests is not None else 'base'
+            file_name = f"{snapshot.snapshot_id}_{snapshot.snapshot_type.value}_{suffix}.json.gz"
             file_path = self.snapshot_dir / file_name
             
-            # JSON形式でシリアライズ（datetime・enum対応）
-            def json_serializer(obj):
-                if isinstance(obj, datetime):
-                    return obj.isoformat()
-                elif isinstance(obj, Enum):
-                    return obj.value
-                raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-            
-            snapshot_data = asdict(snapshot)
-            json_data = json.dumps(snapshot_data, indent=2, default=json_serializer).encode()
-            
-            # gzip圧縮して保存
-            with gzip.open(file_path, 'wb') as f:
-                f.write(json_data)
+            header = {
+                'snapshot_id': snapshot.snapshot_id,
+                'timestamp': snapshot.timestamp,
+                'snapshot_type': snapshot.snapshot_type,
+                'system_version': snapshot.system_version,
+                'recovery_priority': snapshot.recovery_priority,
+                'format_version': SNAPSHOT_FORMAT_VERSION,
+                'is_delta': base_digests is not None,
+                'base_snapshot_id': base_snapshot_id
+            }
+            # 稼働中に変更される辞書をワーカースレッドと共有しないよう、ループ上で複製
+            sections = _copy_snapshot_sections(
+                {name: getattr(snapshot, name) for name in SNAPSHOT_SECTIONS}
+            )
             
-            return file_path
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._snapshot_executor, _write_snapshot_file,
+                file_path, header, sections, base_digests
+            )
+            return file_path, result
             
         except Exception as e:
             logger.error(f"Snapshot file save error: {e}")
             raise
     
-    async def _calculate_file_checksum(self, file_path: Path) -> str:
-        """ファイルチェックサム計算"""
-        try:
-            with open(file_path, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()
-                
-        except Exception as e:
-            logger.error(f"Checksum calculation error: {e}")
-            return ""
-    
-    async def _save_snapshot_metadata(self, snapshot: SystemSnapshot, file_path: str):
+    async def _save_snapshot_metadata(self, snapshot: SystemSnapshot, file_path: str,
+                                      base_snapshot_id: Optional[str] = None,
+                                      section_index: Optional[Dict[str, Any]] = None):
         """スナップショットメタデータ保存"""
         try:
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
-                await conn.execute('''
-                    INSERT INTO system_snapshot_details (
-                        snapshot_id, timestamp, snapshot_type, system_version,
-                        file_path, file_size_bytes, compression_ratio, checksum,
-                        component_count, recovery_priority, validation_status,
-                        description
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    snapshot.snapshot_id,
-                    snapshot.timestamp.isoformat(),
-                    snapshot.snapshot_type.value,
-                    snapshot.system_version,
-                    file_path,
-                    snapshot.file_size_bytes,
-                    snapshot.compression_ratio,
-                    snapshot.checksum,
-                    len(snapshot.component_states),
-                    snapshot.recovery_priority,
-                    'CREATED',
-                    f"System snapshot - {snapshot.snapshot_type.value}"
-                ))
-                await conn.commit()
-                
+            await get_ingest_queue(self.db_manager.db_path).execute('''
+                INSERT INTO system_snapshot_details (
+                    snapshot_id, timestamp, snapshot_type, system_version,
+                    file_path, file_size_bytes, compression_ratio, checksum,
+                    component_count, recovery_priority, validation_status,
+                    description, base_snapshot_id, is_delta, section_index
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                snapshot.snapshot_id,
+                snapshot.timestamp.isoformat(),
+                snapshot.snapshot_type.value,
+                snapshot.system_version,
+                file_path,
+                snapshot.file_size_bytes,
+                snapshot.compression_ratio,
+                snapshot.checksum,
+                len(snapshot.component_states),
+                snapshot.recovery_priority,
+                'CREATED',
+                f"System snapshot - {snapshot.snapshot_type.value}",
+                base_snapshot_id,
+                1 if base_snapshot_id else 0,
+                json.dumps(section_index) if section_index is not None else None
+            ), lane=WriteLane.NORMAL)
+            
         except Exception as e:
             logger.error(f"Snapshot metadata save error: {e}")
     
@@ -531,7 +717,7 @@ class SystemStateManager:
         try:
             max_count = self.max_snapshots_per_type.get(snapshot_type, 10)
             
-            async with aiosqlite.connect(self.db_manager.db_path) as conn:
+            async with get_connection_pool(self.db_manager.db_path).writer() as conn:
                 # 古いスナップショット取得
                 cursor = await conn.execute('''
                     SELECT snapshot_id, file_path FROM system_snapshot_details
@@ -543,6 +729,17 @@ class SystemStateManager:
                 old_snapshots = await cursor.fetchall()
                 
                 for snapshot_id, file_path in old_snapshots:
+                    # 差分スナップショットのベースは参照が残る間は削除しない
+                    if snapshot_id == self._base_snapshot_id:
+                        continue
+                    cursor = await conn.execute('''
+                        SELECT 1 FROM system_snapshot_details
+                        WHERE base_snapshot_id = ?
+                        LIMIT 1
+                    ''', (snapshot_id,))
+                    if await cursor.fetchone():
+                        continue
+                    
                     try:
                         # ファイル削除
                         Path(file_path).unlink(missing_ok=True)
@@ -679,23 +876,164 @@ class SystemStateManager:
     
     async def _create_recovery_plan(self, snapshot_id: str, recovery_level: RecoveryLevel) -> RecoveryPlan:
         """復旧プラン作成"""
-        # 簡略実装
         return RecoveryPlan(
             plan_id=f"recovery_{int(time.time())}",
             target_snapshot_id=snapshot_id,
             recovery_level=recovery_level,
             estimated_time_minutes=5,
-            steps=[{"step": "restore_configuration"}, {"step": "restore_positions"}],
+            steps=[
+                {"step": "load_recovery_index"},
+                {"step": "restore_risk_parameters", "sections": ["risk_parameters"]},
+                {"step": "restore_positions", "sections": ["active_positions"]},
+                {"step": "restore_deferred_sections", "lazy": True}
+            ],
             prerequisites=["database_accessible"],
             rollback_available=True,
             risk_assessment="LOW"
         )
     
+    async def _load_recovery_index(self, snapshot_id: str) -> Dict[str, Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        復旧索引読み込み
+        
+        セクション名 → (ファイルパス, 索引エントリ)。差分スナップショットは
+        ベースの索引に差分側のセクションを重ねる。索引のない旧形式は
+        エントリNone（ファイル全体を読む）とする。
+        """
+        async with get_connection_pool(self.db_manager.db_path).reader() as conn:
+            cursor = await conn.execute('''
+                SELECT file_path, section_index, base_snapshot_id
+                FROM system_snapshot_details
+                WHERE snapshot_id = ?
+            ''', (snapshot_id,))
+            row = await cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Snapshot not found: {snapshot_id}")
+            rows = [row]
+            
+            base_snapshot_id = row[2]
+            if base_snapshot_id:
+                cursor = await conn.execute('''
+                    SELECT file_path, section_index, base_snapshot_id
+                    FROM system_snapshot_details
+                    WHERE snapshot_id = ?
+                ''', (base_snapshot_id,))
+                base_row = await cursor.fetchone()
+                if base_row is None:
+                    raise ValueError(f"Base snapshot not found: {base_snapshot_id}")
+                rows.insert(0, base_row)
+        
+        recovery_index = {}
+        for file_path, section_index, _ in rows:
+            if section_index:
+                for name, entry in json.loads(section_index).items():
+                    recovery_index[name] = (file_path, entry)
+            else:
+                for name in SNAPSHOT_SECTIONS:
+                    recovery_index[name] = (file_path, None)
+        return recovery_index
+    
+    async def _load_section(self, name: str) -> Any:
+        """復旧索引からセクションを読み込み（ワーカースレッド）"""
+        if name in self.recovered_state:
+            return self.recovered_state[name]
+        if name not in self._recovery_index:
+            return None
+        
+        file_path, entry = self._recovery_index[name]
+        loop = asyncio.get_running_loop()
+        if entry is not None:
+            value = await loop.run_in_executor(self._snapshot_executor, _read_snapshot_section, file_path, entry)
+        else:
+            data = await loop.run_in_executor(self._snapshot_executor, _read_snapshot_file, file_path)
+            value = data.get(name)
+        
+        self.recovered_state[name] = value
+        return value
+    
+    async def get_recovered_section(self, name: str) -> Any:
+        """復旧済みセクション取得（未復元なら読み込む）"""
+        return await self._load_section(name)
+    
     async def _execute_recovery_plan(self, plan: RecoveryPlan) -> bool:
-        """復旧プラン実行"""
-        # 簡略実装
+        """
+        復旧プラン実行
+        
+        アクティブポジション・リスクパラメータ（ホットセクション）のみを先に復元し、
+        コンポーネント状態・パフォーマンス指標などは取引再開後にバックグラウンドで読む。
+        """
         logger.info(f"Executing recovery plan: {plan.plan_id}")
-        return True
+        start_time = time.time()
+        restored = 0
+        
+        try:
+            self.recovered_state = {}
+            self._recovery_index = await self._load_recovery_index(plan.target_snapshot_id)
+            
+            # リスクパラメータ
+            risk_parameters = await self._load_section('risk_parameters')
+            if risk_parameters and hasattr(self.risk_manager, 'risk_params'):
+                for key, value in risk_parameters.items():
+                    if hasattr(self.risk_manager.risk_params, key):
+                        setattr(self.risk_manager.risk_params, key, value)
+                restored += 1
+            
+            # アクティブポジション（DBから復元済みのものは上書きしない）
+            active_positions = await self._load_section('active_positions') or []
+            recovered_positions = 0
+            for data in active_positions:
+                if self.position_tracker.restore_position(data) is not None:
+                    recovered_positions += 1
+            restored += 1
+            
+            hot_time = time.time() - start_time
+            logger.info(f"Hot sections restored in {hot_time:.3f}s "
+                        f"({len(active_positions)} positions, {recovered_positions} recovered from snapshot)")
+            
+            # 残りのセクションは遅延復元
+            self._deferred_restore_task = asyncio.create_task(self._restore_deferred_sections())
+            
+            await self._record_recovery(plan, True, hot_time, restored)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Recovery plan execution error: {e}")
+            await self._record_recovery(plan, False, time.time() - start_time, restored, str(e))
+            return False
+    
+    async def _restore_deferred_sections(self):
+        """ホットセクション以外の遅延復元"""
+        for name in SNAPSHOT_SECTIONS:
+            if name in HOT_SECTIONS:
+                continue
+            try:
+                await self._load_section(name)
+            except Exception as e:
+                logger.warning(f"Deferred section restore failed: {name}: {e}")
+        logger.info("Deferred snapshot sections restored")
+    
+    async def _record_recovery(self, plan: RecoveryPlan, success: bool, execution_time: float,
+                               components_restored: int, error_message: Optional[str] = None):
+        """復旧履歴記録"""
+        try:
+            await get_ingest_queue(self.db_manager.db_path).execute('''
+                INSERT INTO recovery_history (
+                    recovery_id, timestamp, source_snapshot_id, recovery_level,
+                    success, execution_time_seconds, components_restored, error_message
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                plan.plan_id,
+                datetime.now().isoformat(),
+                plan.target_snapshot_id,
+                plan.recovery_level.value,
+                success,
+                execution_time,
+                components_restored,
+                error_message
+            ), lane=WriteLane.NORMAL)
+            
+        except Exception as e:
+            logger.error(f"Recovery history save error: {e}")
     
     async def stop(self):
         """システム状態管理停止"""
@@ -710,6 +1048,10 @@ class SystemStateManager:
                 self.snapshot_schedule_task.cancel()
             if self.health_check_task:
                 self.health_check_task.cancel()
+            if self._deferred_restore_task:
+                self._deferred_restore_task.cancel()
+            
+            self._snapshot_executor.shutdown(wait=False)
             
             self.current_status = SystemStatus.STOPPED
             logger.info("System State Manager stopped successfully")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+オンラインバックアップのテスト
+フル → ページ変更 → 差分 → 復元で稼働中のデータベースと同じ内容に戻ること、
+ベースが使えない差分はフルバックアップとして保存されることを確認
+"""
+
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+# システムパス追加
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from database_backup import BackupKind, OnlineBackupEngine
+from database_pool import get_connection_pool, close_connection_pools
+
+ROWS = 2000
+
+async def _populate(db_path: str):
+    async with get_connection_pool(db_path).writer() as conn:
+        await conn.execute("CREATE TABLE ticks (id INTEGER PRIMARY KEY, symbol TEXT, price REAL, note TEXT)")
+        await conn.executemany(
+            "INSERT INTO ticks (id, symbol, price, note) VALUES (?, ?, ?, ?)",
+            [(i, "EURUSD", 1.1 + i * 1e-5, "x" * 100) for i in range(ROWS)]
+        )
+        await conn.commit()
+
+async def _live_rows(db_path: str) -> list:
+    async with get_connection_pool(db_path).reader() as conn:
+        cursor = await conn.execute("SELECT * FROM ticks ORDER BY id")
+        return [tuple(row) for row in await cursor.fetchall()]
+
+def _restored_rows(path: Path) -> list:
+    conn = sqlite3.connect(str(path))
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        return conn.execute("SELECT * FROM ticks ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+def test_full_differential_restore_matches_live(tmp_path):
+    db_path = str(tmp_path / "trading.db")
+    engine = OnlineBackupEngine(db_path, step_pages=16, chunk_pages=8)
+
+    async def scenario():
+        try:
+            await _populate(db_path)
+            full = await engine.create_full_backup(tmp_path / "full.db")
+            assert full.backup_kind == BackupKind.FULL
+            assert full.pages_written == full.page_count
+            assert await OnlineBackupEngine.verify(full.path, full.checksum)
+
+            # 一部のページだけを変更
+            async with get_connection_pool(db_path).writer() as conn:
+                await conn.execute("UPDATE ticks SET price = price * 2 WHERE id < 20")
+                await conn.execute(
+                    "INSERT INTO ticks (id, symbol, price, note) VALUES (?, 'USDJPY', 150.0, 'new')",
+                    (ROWS,)
+                )
+                await conn.commit()
+
+            diff = await engine.create_differential_backup(tmp_path / "diff.bin", full.path)
+            assert diff.backup_kind == BackupKind.DIFFERENTIAL
+            assert diff.base_path == full.path
+            assert 0 < diff.pages_written < diff.page_count
+            assert diff.file_size_bytes < full.file_size_bytes
+            assert await OnlineBackupEngine.verify(diff.path, diff.checksum)
+
+            restored = tmp_path / "restored.db"
+            await engine.restore(diff.path, restored, base_path=full.path)
+            live = await _live_rows(db_path)
+            assert len(live) == ROWS + 1
+            assert _restored_rows(restored) == live
+        finally:
+            await close_connection_pools()
+
+    asyncio.run(scenario())
+
+def test_differential_without_base_is_promoted_to_full(tmp_path):
+    db_path = str(tmp_path / "trading.db")
+    engine = OnlineBackupEngine(db_path)
+
+    async def scenario():
+        try:
+            await _populate(db_path)
+            result = await engine.create_differential_backup(
+                tmp_path / "diff.bin", tmp_path / "missing_full.db"
+            )
+            assert result.backup_kind == BackupKind.FULL
+            assert result.path == tmp_path / "diff.db"
+            assert result.base_path is None
+            assert not (tmp_path / "diff.bin").exists()
+            assert not (tmp_path / "diff.bin.snapshot").exists()
+            assert await OnlineBackupEngine.verify(result.path, result.checksum)
+
+            restored = tmp_path / "restored.db"
+            await engine.restore(result.path, restored)
+            assert _restored_rows(restored) == await _live_rows(db_path)
+        finally:
+            await close_connection_pools()
+
+    asyncio.run(scenario())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+緊急一括決済の送信経路テスト
+ポジション操作がTradingMessageとしてブリッジへ送信され、MT4の約定通知で記録した
+チケット番号付きの決済指示を経てローカルでも決済されることを確認
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# システムパス追加
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from communication.tcp_bridge import ConnectionState, MessageType, TradingMessage
+from database_pool import close_connection_pools
+from emergency_protection import EmergencyFlattenExecutor
+from position_management import PositionStatus, PositionTracker
+
+class _StubBridge:
+    """接続済みTCPブリッジの代替（送信メッセージを記録）"""
+
+    def __init__(self):
+        self.connection_state = ConnectionState.CONNECTED
+        self.sent = []
+
+    async def send_message(self, message: TradingMessage) -> bool:
+        self.sent.append(message)
+        return True
+
+async def _tracker_with_stub(tmp_path) -> PositionTracker:
+    tracker = PositionTracker()
+    tracker.db_path = str(tmp_path / "positions.db")
+    tracker.tcp_bridge = _StubBridge()
+    await tracker._init_database()
+    return tracker
+
+def test_flatten_sends_tickets_and_closes_positions(tmp_path):
+    async def scenario():
+        tracker = await _tracker_with_stub(tmp_path)
+        try:
+            positions = []
+            for ticket, symbol in enumerate(["EURUSD", "USDJPY", "GBPUSD"], start=101):
+                position = await tracker.open_position(symbol, "BUY", 1.1, 0.1)
+                assert position.status == PositionStatus.PENDING
+
+                # MT4からの約定通知でチケット番号を記録
+                await tracker._on_mt4_position_update(TradingMessage(
+                    message_type=MessageType.POSITION_UPDATE,
+                    timestamp=time.time(),
+                    data={"action": "OPEN", "success": True, "position_id": position.position_id,
+                          "mt4_ticket": ticket, "fill_price": 1.1002},
+                    message_id=f"position_update_{ticket}"
+                ))
+                assert position.status == PositionStatus.OPEN
+                assert position.mt4_ticket == ticket
+                positions.append(position)
+
+            executor = EmergencyFlattenExecutor(tracker, batch_size=2)
+            result = await executor.flatten(positions, deadline=5.0)
+
+            assert sorted(result.closed) == sorted(p.position_id for p in positions)
+            assert result.failed == []
+            assert tracker.active_positions == {}
+
+            batches = [m for m in tracker.tcp_bridge.sent if m.data["action"] == "CLOSE_BATCH"]
+            assert [m.message_type for m in batches] == [MessageType.POSITION_ACTION] * 2
+            assert sorted(p["mt4_ticket"] for m in batches for p in m.data["positions"]) == [101, 102, 103]
+
+            # EA側の文字列照合は区切り文字の空白なしが前提
+            payload = batches[0].to_json()
+            assert '"message_type":"position_action"' in payload
+            assert json.loads(payload)["data"]["action"] == "CLOSE_BATCH"
+        finally:
+            await close_connection_pools()
+
+    asyncio.run(scenario())
+
+def test_flatten_keeps_positions_when_bridge_send_fails(tmp_path):
+    async def scenario():
+        tracker = await _tracker_with_stub(tmp_path)
+        try:
+            position = await tracker.open_position("EURUSD", "SELL", 1.1, 0.1)
+            tracker.tcp_bridge.connection_state = ConnectionState.DISCONNECTED
+            tracker.file_bridge.send_message = lambda message: False
+
+            executor = EmergencyFlattenExecutor(tracker, max_retries=1)
+            result = await executor.flatten([position], deadline=2.0)
+
+            assert result.closed == []
+            assert result.failed == [position.position_id]
+            assert position.position_id in tracker.active_positions
+        finally:
+            await close_connection_pools()
+
+    asyncio.run(scenario())
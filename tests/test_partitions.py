@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+月別パーティションの振り分けテスト
+該当する月のパーティションがない行（過去日付・事前作成より先の日付）も保存でき、
+アーカイブ（受け皿）パーティション経由で検索・保持期間処理の対象になることを確認
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# システムパス追加
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from database_manager import DatabaseManager, TradingSignalRecord
+from database_pool import get_connection_pool, close_connection_pools
+
+def _signal(signal_id: str, timestamp: datetime, status: str = "SENT",
+            processing_time_ms: float = 1.0) -> TradingSignalRecord:
+    return TradingSignalRecord(
+        signal_id=signal_id, timestamp=timestamp, symbol="EURUSD", action="BUY",
+        quantity=0.1, price=1.1, stop_loss=None, take_profit=None,
+        quality_score=0.5, confidence_level=0.5, strategy_params={},
+        source_system="test", processing_time_ms=processing_time_ms, market_conditions={},
+        signal_status=status
+    )
+
+async def _count(db_path: str, sql: str) -> int:
+    async with get_connection_pool(db_path).reader() as conn:
+        cursor = await conn.execute(sql)
+        return (await cursor.fetchone())[0]
+
+def test_out_of_range_signals_routed_to_archive(tmp_path):
+    db_path = str(tmp_path / "trading.db")
+    now = datetime.now()
+
+    async def scenario():
+        db_manager = DatabaseManager(db_path)
+        await db_manager.initialize()
+        try:
+            assert await db_manager.save_trading_signal(_signal("current", now, processing_time_ms=2.0))
+            assert await db_manager.save_trading_signal(
+                _signal("back_dated", now - timedelta(days=400), processing_time_ms=3.0)
+            )
+            assert await db_manager.save_trading_signal(
+                _signal("far_future", now + timedelta(days=1000), processing_time_ms=1.0)
+            )
+
+            assert await _count(db_path, "SELECT COUNT(*) FROM trading_signals") == 3
+            assert await _count(db_path, "SELECT COUNT(*) FROM trading_signals_archive") == 2
+
+            # 取引実行の列（te.*）が同名の列を上書きするため処理時間で識別する
+            history = await db_manager.get_trading_history(days=500)
+            assert [record["processing_time_ms"] for record in history] == [1.0, 2.0, 3.0]
+            stats = await db_manager.get_system_statistics()
+            assert stats["total_signals"] == 3
+        finally:
+            await db_manager.stop()
+            await close_connection_pools()
+
+    asyncio.run(scenario())
+
+def test_archive_rows_follow_retention(tmp_path):
+    db_path = str(tmp_path / "trading.db")
+    old = datetime.now() - timedelta(days=400)
+
+    async def scenario():
+        db_manager = DatabaseManager(db_path)
+        await db_manager.initialize()
+        try:
+            assert await db_manager.save_trading_signal(_signal("old_rejected", old, "REJECTED"))
+            assert await db_manager.save_trading_signal(_signal("old_executed", old, "EXECUTED"))
+
+            result = await db_manager.cleanup_old_data(retention_days=180)
+            assert result["signals_deleted"] == 1
+
+            async with get_connection_pool(db_path).reader() as conn:
+                cursor = await conn.execute("SELECT signal_id FROM trading_signals")
+                assert [row[0] for row in await cursor.fetchall()] == ["old_executed"]
+            stats = await db_manager.get_system_statistics()
+            assert stats["total_signals"] == 1
+        finally:
+            await db_manager.stop()
+            await close_connection_pools()
+
+    asyncio.run(scenario())
+
+def test_signal_id_unique_across_partitions(tmp_path):
+    db_path = str(tmp_path / "trading.db")
+    now = datetime.now()
+
+    async def scenario():
+        db_manager = DatabaseManager(db_path)
+        await db_manager.initialize()
+        try:
+            assert await db_manager.save_trading_signal(_signal("S1", now))
+            # 別の月（アーカイブ行き）でも同じsignal_idは保存できない
+            assert not await db_manager.save_trading_signal(_signal("S1", now - timedelta(days=400)))
+            assert await db_manager.save_trading_signal(_signal("S2", now - timedelta(days=400)))
+            # アーカイブに既にあるsignal_idも当月パーティションへは保存できない
+            assert not await db_manager.save_trading_signal(_signal("S2", now))
+
+            async with get_connection_pool(db_path).reader() as conn:
+                cursor = await conn.execute(
+                    "SELECT signal_id, COUNT(*) FROM trading_signals GROUP BY signal_id ORDER BY signal_id"
+                )
+                assert [tuple(row) for row in await cursor.fetchall()] == [("S1", 1), ("S2", 1)]
+            assert await _count(db_path, "SELECT COUNT(*) FROM trading_signals_archive") == 1
+        finally:
+            await db_manager.stop()
+            await close_connection_pools()
+
+    asyncio.run(scenario())
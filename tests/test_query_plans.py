@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+クエリプラン回帰テスト
+取引履歴系のホットクエリがフルスキャン・一時B木ソートに戻っていないことを確認
+
+EXPLAIN QUERY PLAN の各行について以下を失敗とする:
+- SCAN（テーブル・インデックスの全件走査。パーティションビューの結果の走査は除く）
+- USE TEMP B-TREE FOR ORDER BY（インデックスで解決できない並べ替え）
+- AUTOMATIC INDEX（恒久インデックスの欠落）
+"""
+
+import asyncio
+import importlib.util
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# システムパス追加
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from database_manager import (
+    DatabaseManager,
+    TRADING_HISTORY_QUERY,
+    TRADING_HISTORY_BY_SYMBOL_QUERY,
+)
+from database_partitions import PARTITIONS_FOR_RANGE_QUERY
+from performance_reporter import CLOSED_POSITIONS_PNL_QUERY
+
+def _load_dashboard_database_module():
+    """Dashboard/database_manager.py 読み込み（トップレベルの同名モジュールと区別）"""
+    spec = importlib.util.spec_from_file_location(
+        "dashboard_database_manager", ROOT / "Dashboard" / "database_manager.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def assert_indexed_plan(conn: sqlite3.Connection, sql: str, params) -> list:
+    """フルスキャン・ソートが含まれないことを確認してプランを返す"""
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+    # ビュー（サブクエリ）の結果の走査は対象外。ビュー内の各テーブルの検索は個別に判定する
+    subqueries = {
+        detail.split()[-1] for detail in plan
+        if detail.startswith(("CO-ROUTINE", "MATERIALIZE"))
+    }
+    offending = [
+        detail for detail in plan
+        if (detail.startswith("SCAN") and detail.split()[1] not in subqueries)
+        or "TEMP B-TREE FOR ORDER BY" in detail
+        or "AUTOMATIC" in detail
+    ]
+    assert not offending, f"full scan or sort in query plan: {plan}"
+    return plan
+
+@pytest.fixture(scope="module")
+def trading_db(tmp_path_factory):
+    """スキーマ移行適用済みの取引データベース"""
+    db_path = tmp_path_factory.mktemp("query_plans") / "trading.db"
+
+    async def setup():
+        db_manager = DatabaseManager(str(db_path))
+        await db_manager.initialize()
+        await db_manager.stop()
+        return db_manager
+
+    db_manager = asyncio.run(setup())
+    assert db_manager.current_schema_version == db_manager.migrations[-1].version_to
+
+    conn = sqlite3.connect(str(db_path))
+    yield conn
+    conn.close()
+
+@pytest.fixture(scope="module")
+def dashboard_db(tmp_path_factory):
+    """Dashboardデータベース"""
+    module = _load_dashboard_database_module()
+    db_path = tmp_path_factory.mktemp("dashboard_plans") / "dashboard.db"
+    module.DatabaseManager(str(db_path))
+
+    conn = sqlite3.connect(str(db_path))
+    yield module, conn
+    conn.close()
+
+def _current_partition(conn, table: str) -> str:
+    return conn.execute(PARTITIONS_FOR_RANGE_QUERY, (table, 0)).fetchone()[0]
+
+def test_migrations_recorded(trading_db):
+    rows = trading_db.execute(
+        "SELECT migration_id, status FROM database_migrations ORDER BY migration_id"
+    ).fetchall()
+    assert rows
+    assert all(status == "COMPLETED" for _, status in rows)
+
+def test_trading_history_plan(trading_db):
+    signals = _current_partition(trading_db, "trading_signals")
+    plan = assert_indexed_plan(trading_db, TRADING_HISTORY_QUERY.format(signals=signals), (0,))
+    assert any("idx_trading_signals_epoch" in detail for detail in plan)
+
+def test_trading_history_by_symbol_plan(trading_db):
+    signals = _current_partition(trading_db, "trading_signals")
+    plan = assert_indexed_plan(
+        trading_db, TRADING_HISTORY_BY_SYMBOL_QUERY.format(signals=signals), ("EURUSD", 0)
+    )
+    assert any("idx_trading_signals_symbol_epoch" in detail for detail in plan)
+    assert any("COVERING INDEX idx_risk_assessments_signal_cover" in detail for detail in plan)
+
+def test_partition_and_integrity_plans(trading_db):
+    assert_indexed_plan(trading_db, PARTITIONS_FOR_RANGE_QUERY, ("trading_signals", 0))
+    # パーティションのUNION ALLビューでも各パーティションのインデックスを使う
+    assert_indexed_plan(trading_db, '''
+        SELECT COUNT(*) FROM trading_signals WHERE timestamp_epoch > ?
+    ''', (0,))
+
+def test_closed_positions_pnl_plan(trading_db):
+    plan = assert_indexed_plan(trading_db, CLOSED_POSITIONS_PNL_QUERY, (0, 1))
+    assert any("COVERING INDEX idx_trade_executions_status_epoch" in detail for detail in plan)
+
+def test_dashboard_position_history_plans(dashboard_db):
+    module, conn = dashboard_db
+    order_by = " ORDER BY timestamp DESC"
+
+    assert_indexed_plan(conn, module.POSITION_HISTORY_QUERY + order_by, ("2025-01-01",))
+    plan = assert_indexed_plan(
+        conn, module.POSITION_HISTORY_QUERY + " AND symbol = ?" + order_by,
+        ("2025-01-01", "EURUSD")
+    )
+    assert any("idx_position_symbol_timestamp" in detail for detail in plan)
+
+def test_dashboard_daily_stats_plan(dashboard_db):
+    module, conn = dashboard_db
+    plan = assert_indexed_plan(conn, module.DAILY_POSITIONS_QUERY, ("2025-01-01", "2025-01-02"))
+    assert any("COVERING INDEX" in detail for detail in plan)
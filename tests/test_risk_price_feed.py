@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+リスク管理の価格取り込みテスト
+市場データ経路のバーをバー時刻ごとに1観測として取り込み、datetimeのないバーは
+例外にせず除外することを確認
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# システムパス追加
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from risk_management_system import AdaptiveRiskManager
+
+def _bar(close: float, bar_time=None) -> dict:
+    bar = {"open": close, "high": close, "low": close, "close": close}
+    if bar_time is not None:
+        bar["datetime"] = bar_time
+    return bar
+
+def _manager(observed: list) -> AdaptiveRiskManager:
+    manager = AdaptiveRiskManager({"symbol": "EURUSD", "symbols": ["EURUSD", "USDJPY"]})
+    manager.update_market_prices = lambda prices: observed.append(dict(prices))
+    return manager
+
+def test_bars_without_datetime_are_skipped():
+    observed = []
+    manager = _manager(observed)
+    start = datetime(2024, 3, 1, 12, 0)
+
+    manager.observe_price_data([_bar(1.10)])
+    assert manager._fed_bar_times == {}
+
+    manager.observe_price_data([_bar(1.10, start), _bar(1.11)])
+    assert manager._fed_bar_times == {"EURUSD": start}
+
+    manager.observe_price_data([
+        _bar(1.10, start), _bar(1.12, start + timedelta(minutes=5)), _bar(1.13)
+    ])
+    assert manager._fed_bar_times == {"EURUSD": start + timedelta(minutes=5)}
+    assert observed == [{"EURUSD": 1.10}]
+
+def test_bars_with_same_time_form_one_observation():
+    observed = []
+    manager = _manager(observed)
+    start = datetime(2024, 3, 1, 12, 0)
+
+    manager.observe_price_data([_bar(1.10, start)], symbol="EURUSD")
+    manager.observe_price_data([_bar(150.0, start)], symbol="USDJPY")
+    manager.observe_price_data([_bar(1.11, start + timedelta(minutes=5))], symbol="EURUSD")
+
+    assert observed == [{"EURUSD": 1.10, "USDJPY": 150.0}]
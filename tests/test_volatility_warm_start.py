@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+ボラティリティのウォームスタートテスト
+呼び出し側がデータレイクを渡さなくても、設定のディレクトリにある共有レイクから
+初期化され、ライブのバーを受信する前にボラティリティが得られることを確認
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# システムパス追加
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "utilities"))
+
+from database_pool import close_connection_pools
+from historical_data_lake import HistoricalDataLake
+from position_management import PositionTracker
+from realtime_signal_generator import CONFIG
+from risk_management import RiskManager
+
+def _bars(periods: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0.0, 0.0005, periods)))
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.0003, "low": close * 0.9997, "close": close},
+        index=pd.date_range("2024-03-01", periods=periods, freq="5min"),
+    )
+
+def test_default_lake_warm_starts_volatility(tmp_path, monkeypatch):
+    lake_dir = tmp_path / "data_lake"
+    HistoricalDataLake(str(lake_dir)).append("EURUSD", "M5", _bars(600))
+    monkeypatch.setitem(CONFIG, "risk_management", {
+        "data_lake_dir": str(lake_dir),
+        "volatility_symbols": ["EURUSD", "USDJPY"],
+        "volatility_timeframe": "M5",
+    })
+    monkeypatch.setitem(CONFIG, "database", {"path": str(tmp_path / "risk.db")})
+
+    async def scenario():
+        risk_manager = RiskManager(PositionTracker())
+        assert risk_manager.data_lake is not None
+        assert not risk_manager.volatility_engine.is_ready("EURUSD")
+
+        await risk_manager.initialize()
+        try:
+            engine = risk_manager.volatility_engine
+            assert engine.is_ready("EURUSD")
+            assert engine.realized_volatility("EURUSD") > 0
+            # レイクにないシンボルはライブのバー待ち
+            assert not engine.is_ready("USDJPY")
+        finally:
+            await risk_manager.stop()
+            await close_connection_pools()
+
+    asyncio.run(scenario())
+
+def test_missing_lake_dir_disables_warm_start(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG, "risk_management", {"data_lake_dir": str(tmp_path / "missing")})
+
+    risk_manager = RiskManager(PositionTracker())
+    assert risk_manager.data_lake is None
+    assert not (tmp_path / "missing").exists()
@@ -35,14 +35,192 @@ class SlippageConfig:
     volatility_multiplier: float = 2.0 # ボラティリティ乗数
     execution_delay_ms: int = 100      # 約定遅延(ミリ秒)
     liquidity_threshold: float = 1000000  # 流動性閾値
+    max_execution_history: Optional[int] = None  # 約定履歴の保持上限（None=無制限, 0=保持しない）
     
+# 条件・注文タイプの配列インデックス（Enum定義順）
+CONDITION_CODES = list(MarketCondition)
+ORDER_TYPE_CODES = list(OrderType)
+
+# 市場状況・注文タイプ別の調整係数・遅延
+CONDITION_SLIPPAGE_MULTIPLIERS = {
+    MarketCondition.LIQUID: 0.5,
+    MarketCondition.NORMAL: 1.0,
+    MarketCondition.ILLIQUID: 2.0,
+    MarketCondition.VOLATILE: 1.5
+}
+ORDER_SLIPPAGE_MULTIPLIERS = {
+    OrderType.MARKET: 1.0,
+    OrderType.LIMIT: 0.3,
+    OrderType.STOP: 1.2
+}
+CONDITION_DELAYS_MS = {
+    MarketCondition.LIQUID: 50,
+    MarketCondition.NORMAL: 100,
+    MarketCondition.ILLIQUID: 300,
+    MarketCondition.VOLATILE: 200
+}
+ORDER_DELAYS_MS = {
+    OrderType.MARKET: 0,
+    OrderType.LIMIT: 100,
+    OrderType.STOP: 50
+}
+
+# 約定テーブル（列指向の構造化配列）
+EXECUTION_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ns]'),
+    ('signal_price', 'f8'),
+    ('execution_price', 'f8'),
+    ('slippage_cost', 'f8'),
+    ('slippage_pct', 'f8'),
+    ('market_impact', 'f8'),
+    ('market_condition', 'i1'),
+    ('order_type', 'i1'),
+    ('order_size', 'f8'),
+    ('execution_delay_ms', 'i4'),
+    ('network_latency', 'i4'),
+    ('volume', 'f8')
+])
+
+class ExecutionLog:
+    """
+    約定ログ（EXECUTION_DTYPEの事前確保バッファ）
+    
+    容量は倍々で拡張し、max_size指定時は上限到達後にリングバッファとして
+    古い約定から上書きする。辞書への展開はレポート時のみ行う。
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, initial_capacity: int = 1024):
+        self.max_size = max_size
+        capacity = initial_capacity if max_size is None else min(initial_capacity, max_size)
+        self._buffer = np.zeros(capacity, dtype=EXECUTION_DTYPE)
+        self._start = 0
+        self._size = 0
+        self.total_appended = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _grow(self, required: int):
+        """容量拡張（時系列順に詰め直す）"""
+        capacity = max(required, len(self._buffer) * 2)
+        if self.max_size is not None:
+            capacity = min(capacity, self.max_size)
+        buffer = np.zeros(capacity, dtype=EXECUTION_DTYPE)
+        buffer[:self._size] = self.to_array()
+        self._buffer = buffer
+        self._start = 0
+    
+    def append(self, executions: np.ndarray):
+        """約定テーブル追記"""
+        count = len(executions)
+        self.total_appended += count
+        if count == 0 or self.max_size == 0:
+            return
+        
+        if self.max_size is not None and count > self.max_size:
+            executions = executions[-self.max_size:]
+            count = self.max_size
+        
+        required = self._size + count
+        if required > len(self._buffer) and (
+            self.max_size is None or len(self._buffer) < self.max_size
+        ):
+            self._grow(required)
+        
+        capacity = len(self._buffer)
+        positions = (self._start + self._size + np.arange(count)) % capacity
+        self._buffer[positions] = executions
+        
+        if required > capacity:
+            # 上限超過分は最古の約定を上書き済み
+            self._start = (self._start + required - capacity) % capacity
+            self._size = capacity
+        else:
+            self._size = required
+    
+    def to_array(self) -> np.ndarray:
+        """時系列順の約定テーブル（コピー）"""
+        if self._start == 0:
+            return self._buffer[:self._size].copy()
+        return np.concatenate((self._buffer[self._start:], self._buffer[:self._start]))
+    
+    def clear(self):
+        """ログクリア"""
+        self._start = 0
+        self._size = 0
+        self.total_appended = 0
+
 class AdvancedSlippageModel:
     """高度スリッパージモデル"""
     
     def __init__(self, config: SlippageConfig = None):
         self.config = config or SlippageConfig()
         self.market_conditions = {}
-        self.execution_history = []
+        self.execution_history = ExecutionLog(max_size=self.config.max_execution_history)
+        # データセット単位の事前計算キャッシュ (data, lookback, features)
+        self._feature_cache = None
+        
+    def precompute_market_features(self, data: pd.DataFrame,
+                                   lookback_period: int = 20) -> Dict[str, np.ndarray]:
+        """
+        市場状況特徴量の一括事前計算
+        
+        analyze_market_condition(data.iloc[:i+1]) を全バーについて
+        ローリング計算で一度に求める。同一DataFrameへの再呼び出しはキャッシュを返す。
+        
+        Returns:
+            Dict: 'condition_code'（CONDITION_CODESのインデックス）,
+                  'volatility', 'avg_volume', 'volume_std', 'avg_spread'
+        """
+        cached = self._feature_cache
+        if cached is not None and cached[0] is data and cached[1] == lookback_period:
+            return cached[2]
+        
+        close = data['Close']
+        volume = data['Volume'].astype(float)
+        
+        # ボラティリティ（窓内のリターン lookback-1 本の標本標準偏差）
+        returns = close.pct_change()
+        volatility = (
+            returns.rolling(lookback_period - 1).std().to_numpy() * np.sqrt(252)
+            if lookback_period > 1 else np.full(len(data), np.nan)
+        )
+        
+        # 出来高バンド
+        volume_roll = volume.rolling(lookback_period)
+        avg_volume = volume_roll.mean().to_numpy()
+        volume_std = volume_roll.std().to_numpy()
+        current_volume = volume.to_numpy()
+        
+        # スプレッド（High-Low）
+        spreads = (data['High'] - data['Low']) / close
+        avg_spread = spreads.rolling(lookback_period).mean().to_numpy()
+        
+        # 条件判定（analyze_market_conditionと同じ優先順位）
+        with np.errstate(invalid='ignore'):
+            is_volatile = volatility > 0.3
+            is_illiquid = current_volume < (avg_volume - volume_std)
+            is_liquid = (current_volume > (avg_volume + volume_std)) & (avg_spread < 0.001)
+        
+        condition_code = np.select(
+            [is_volatile, is_illiquid, is_liquid],
+            [CONDITION_CODES.index(MarketCondition.VOLATILE),
+             CONDITION_CODES.index(MarketCondition.ILLIQUID),
+             CONDITION_CODES.index(MarketCondition.LIQUID)],
+            default=CONDITION_CODES.index(MarketCondition.NORMAL)
+        ).astype(np.int8)
+        # 履歴不足のバーはNORMAL
+        condition_code[:lookback_period - 1] = CONDITION_CODES.index(MarketCondition.NORMAL)
+        
+        features = {
+            'condition_code': condition_code,
+            'volatility': volatility,
+            'avg_volume': avg_volume,
+            'volume_std': volume_std,
+            'avg_spread': avg_spread
+        }
+        self._feature_cache = (data, lookback_period, features)
+        return features
         
     def analyze_market_condition(self, data: pd.DataFrame, 
                                lookback_period: int = 20) -> MarketCondition:
@@ -87,20 +265,9 @@ class AdvancedSlippageModel:
         # 基本スプレッド
         base_slippage = self.config.base_spread
         
-        # 市場状況調整
-        condition_multipliers = {
-            MarketCondition.LIQUID: 0.5,
-            MarketCondition.NORMAL: 1.0,
-            MarketCondition.ILLIQUID: 2.0,
-            MarketCondition.VOLATILE: 1.5
-        }
-        
-        # 注文タイプ調整
-        order_multipliers = {
-            OrderType.MARKET: 1.0,
-            OrderType.LIMIT: 0.3,
-            OrderType.STOP: 1.2
-        }
+        # 市場状況・注文タイプ調整
+        condition_multipliers = CONDITION_SLIPPAGE_MULTIPLIERS
+        order_multipliers = ORDER_SLIPPAGE_MULTIPLIERS
         
         # 市場インパクト計算
         market_impact = self.config.market_impact_coeff * np.sqrt(order_size / volume)
@@ -131,20 +298,9 @@ class AdvancedSlippageModel:
         # 基本約定遅延
         base_delay = self.config.execution_delay_ms
         
-        # 市場状況による遅延
-        condition_delays = {
-            MarketCondition.LIQUID: 50,
-            MarketCondition.NORMAL: 100,
-            MarketCondition.ILLIQUID: 300,
-            MarketCondition.VOLATILE: 200
-        }
-        
-        # 注文タイプによる遅延
-        order_delays = {
-            OrderType.MARKET: 0,
-            OrderType.LIMIT: 100,
-            OrderType.STOP: 50
-        }
+        # 市場状況・注文タイプによる遅延
+        condition_delays = CONDITION_DELAYS_MS
+        order_delays = ORDER_DELAYS_MS
         
         # 総遅延時間
         total_delay = (
@@ -166,108 +322,168 @@ class AdvancedSlippageModel:
                                    data: pd.DataFrame,
                                    entry_signals: pd.Series,
                                    order_type: OrderType = OrderType.MARKET,
-                                   order_size: float = 100000) -> List[Dict]:
-        """現実的な約定シミュレーション"""
-        
-        executions = []
-        
-        for timestamp, should_execute in entry_signals.items():
-            if not should_execute:
-                continue
-                
-            try:
-                # 現在の市場データ
-                current_idx = data.index.get_loc(timestamp)
-                current_bar = data.iloc[current_idx]
-                
-                # 市場状況分析
-                market_condition = self.analyze_market_condition(
-                    data.iloc[:current_idx+1]
-                )
-                
-                # スリッパージ計算（Look-ahead bias完全修正）
-                # 実際の取引では現在バーのCloseは使用不可、常にOpenを使用
-                current_price = current_bar['Open']
-                
-                slippage_info = self.calculate_dynamic_slippage(
-                    price=current_price,
-                    volume=current_bar['Volume'],
-                    market_condition=market_condition,
-                    order_type=order_type,
-                    order_size=order_size
-                )
-                
-                # 約定遅延計算
-                delay_info = self.calculate_execution_delay(
-                    market_condition=market_condition,
-                    order_type=order_type
-                )
-                
-                # 約定価格計算（スリッパージ考慮）
-                if order_type == OrderType.MARKET:
-                    # 成行注文：次のバーの始値 + スリッパージ
-                    if current_idx + 1 < len(data):
-                        next_bar = data.iloc[current_idx + 1]
-                        execution_price = next_bar['Open'] * (1 + slippage_info['total_slippage'])
-                    else:
-                        continue
-                else:
-                    # 指値・逆指値注文：現在価格 + スリッパージ（Look-ahead bias修正）
-                    execution_price = current_price * (1 + slippage_info['total_slippage'])
-                
-                # 約定記録（Look-ahead bias修正）
-                execution = {
-                    'timestamp': timestamp,
-                    'signal_price': current_price,
-                    'execution_price': execution_price,
-                    'slippage_cost': execution_price - current_price,
-                    'slippage_pct': slippage_info['total_slippage'],
-                    'market_condition': market_condition.value,
-                    'order_type': order_type.value,
-                    'order_size': order_size,
-                    'execution_delay_ms': delay_info['total_delay_ms'],
-                    'volume': current_bar['Volume'],
-                    'detailed_slippage': slippage_info,
-                    'detailed_delay': delay_info
-                }
-                
-                executions.append(execution)
-                self.execution_history.append(execution)
-                
-            except (IndexError, KeyError) as e:
-                continue
+                                   order_size: float = 100000,
+                                   network_latency: int = 50) -> np.ndarray:
+        """
+        現実的な約定シミュレーション（ベクトル化）
+        
+        市場状況はprecompute_market_featuresの事前計算結果を配列参照し、
+        スリッパージ・遅延も全シグナル分を一括計算する。
+        
+        Returns:
+            np.ndarray: EXECUTION_DTYPEの構造化配列（1行=1約定）
+        """
+        # シグナル発生バーの位置（データに存在しないタイムスタンプは除外）
+        signal_mask = np.asarray(entry_signals.values, dtype=bool)
+        positions = data.index.get_indexer(entry_signals.index[signal_mask])
+        positions = positions[positions >= 0]
+        
+        # 成行注文は次バー始値で約定するため最終バーは除外
+        if order_type == OrderType.MARKET:
+            positions = positions[positions + 1 < len(data)]
+        
+        executions = np.zeros(len(positions), dtype=EXECUTION_DTYPE)
+        if len(positions) == 0:
+            return executions
+        
+        features = self.precompute_market_features(data)
+        condition_codes = features['condition_code'][positions]
+        
+        opens = data['Open'].to_numpy(dtype=float)
+        volumes = data['Volume'].to_numpy(dtype=float)
+        
+        # スリッパージ計算（Look-ahead bias完全修正）
+        # 実際の取引では現在バーのCloseは使用不可、常にOpenを使用
+        current_prices = opens[positions]
+        current_volumes = volumes[positions]
+        
+        condition_multipliers = np.array(
+            [CONDITION_SLIPPAGE_MULTIPLIERS[c] for c in CONDITION_CODES]
+        )
+        with np.errstate(divide='ignore'):
+            market_impact = self.config.market_impact_coeff * np.sqrt(order_size / current_volumes)
+        total_slippage = (
+            self.config.base_spread *
+            condition_multipliers[condition_codes] *
+            ORDER_SLIPPAGE_MULTIPLIERS[order_type] +
+            market_impact
+        )
+        
+        # 約定遅延計算
+        condition_delays = np.array([CONDITION_DELAYS_MS[c] for c in CONDITION_CODES])
+        total_delay = (
+            self.config.execution_delay_ms +
+            condition_delays[condition_codes] +
+            ORDER_DELAYS_MS[order_type] +
+            network_latency
+        )
+        
+        # 約定価格計算（スリッパージ考慮）
+        if order_type == OrderType.MARKET:
+            # 成行注文：次のバーの始値 + スリッパージ
+            execution_prices = opens[positions + 1] * (1 + total_slippage)
+        else:
+            # 指値・逆指値注文：現在価格 + スリッパージ（Look-ahead bias修正）
+            execution_prices = current_prices * (1 + total_slippage)
+        
+        executions['timestamp'] = data.index[positions].to_numpy(dtype='datetime64[ns]')
+        executions['signal_price'] = current_prices
+        executions['execution_price'] = execution_prices
+        executions['slippage_cost'] = execution_prices - current_prices
+        executions['slippage_pct'] = total_slippage
+        executions['market_impact'] = market_impact
+        executions['market_condition'] = condition_codes
+        executions['order_type'] = ORDER_TYPE_CODES.index(order_type)
+        executions['order_size'] = order_size
+        executions['execution_delay_ms'] = total_delay
+        executions['network_latency'] = network_latency
+        executions['volume'] = current_volumes
+        
+        self.execution_history.append(executions)
         
         return executions
     
-    def calculate_cost_impact(self, executions: List[Dict]) -> Dict:
+    def executions_to_records(self, executions) -> List[Dict]:
+        """約定テーブルを従来形式の辞書リストへ展開（レポート用）"""
+        if isinstance(executions, list):
+            return executions
+        if isinstance(executions, ExecutionLog):
+            executions = executions.to_array()
+        
+        records = []
+        for row in executions:
+            market_condition = CONDITION_CODES[row['market_condition']]
+            order_type = ORDER_TYPE_CODES[row['order_type']]
+            records.append({
+                'timestamp': pd.Timestamp(row['timestamp']),
+                'signal_price': float(row['signal_price']),
+                'execution_price': float(row['execution_price']),
+                'slippage_cost': float(row['slippage_cost']),
+                'slippage_pct': float(row['slippage_pct']),
+                'market_condition': market_condition.value,
+                'order_type': order_type.value,
+                'order_size': float(row['order_size']),
+                'execution_delay_ms': int(row['execution_delay_ms']),
+                'volume': float(row['volume']),
+                'detailed_slippage': {
+                    'total_slippage': float(row['slippage_pct']),
+                    'base_slippage': self.config.base_spread,
+                    'market_impact': float(row['market_impact']),
+                    'condition_multiplier': CONDITION_SLIPPAGE_MULTIPLIERS[market_condition],
+                    'order_multiplier': ORDER_SLIPPAGE_MULTIPLIERS[order_type],
+                    'market_condition': market_condition.value
+                },
+                'detailed_delay': {
+                    'total_delay_ms': int(row['execution_delay_ms']),
+                    'base_delay': self.config.execution_delay_ms,
+                    'condition_delay': CONDITION_DELAYS_MS[market_condition],
+                    'order_delay': ORDER_DELAYS_MS[order_type],
+                    'network_latency': int(row['network_latency'])
+                }
+            })
+        return records
+    
+    def calculate_cost_impact(self, executions) -> Dict:
         """コストインパクト分析"""
-        if not executions:
+        if len(executions) == 0:
             return {}
-            
+        
+        # 辞書リスト（旧形式）も列形式に揃えて集計
+        if isinstance(executions, ExecutionLog):
+            executions = executions.to_array()
+        if isinstance(executions, list):
+            columns = pd.DataFrame(executions)
+            condition_values = columns['market_condition'].to_numpy()
+        else:
+            columns = executions
+            condition_values = np.array(
+                [c.value for c in CONDITION_CODES]
+            )[executions['market_condition']]
+        
         # 基本統計
-        slippage_costs = [e['slippage_cost'] for e in executions]
-        slippage_pcts = [e['slippage_pct'] for e in executions]
-        delays = [e['execution_delay_ms'] for e in executions]
+        slippage_costs = np.asarray(columns['slippage_cost'], dtype=float)
+        slippage_pcts = np.asarray(columns['slippage_pct'], dtype=float)
+        delays = np.asarray(columns['execution_delay_ms'], dtype=float)
         
         # 市場状況別分析
         condition_analysis = {}
         for condition in MarketCondition:
-            condition_execs = [e for e in executions if e['market_condition'] == condition.value]
-            if condition_execs:
+            mask = condition_values == condition.value
+            if mask.any():
                 condition_analysis[condition.value] = {
-                    'count': len(condition_execs),
-                    'avg_slippage_pct': np.mean([e['slippage_pct'] for e in condition_execs]),
-                    'avg_delay_ms': np.mean([e['execution_delay_ms'] for e in condition_execs])
+                    'count': int(mask.sum()),
+                    'avg_slippage_pct': np.mean(slippage_pcts[mask]),
+                    'avg_delay_ms': np.mean(delays[mask])
                 }
         
         return {
-            'total_executions': len(executions),
-            'total_slippage_cost': sum(slippage_costs),
+            'total_executions': len(slippage_pcts),
+            'total_slippage_cost': float(slippage_costs.sum()),
             'avg_slippage_cost': np.mean(slippage_costs),
             'avg_slippage_pct': np.mean(slippage_pcts),
-            'max_slippage_pct': max(slippage_pcts),
+            'max_slippage_pct': float(slippage_pcts.max()),
             'avg_execution_delay_ms': np.mean(delays),
-            'max_execution_delay_ms': max(delays),
+            'max_execution_delay_ms': float(delays.max()),
             'condition_breakdown': condition_analysis,
             'slippage_distribution': {
                 'p25': np.percentile(slippage_pcts, 25),
@@ -277,7 +493,7 @@ class AdvancedSlippageModel:
             }
         }
     
-    def save_execution_report(self, executions: List[Dict], output_path: str = None):
+    def save_execution_report(self, executions, output_path: str = None):
         """約定レポート保存"""
         if output_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -293,7 +509,7 @@ class AdvancedSlippageModel:
                 'execution_delay_ms': self.config.execution_delay_ms
             },
             'cost_impact_analysis': cost_impact,
-            'detailed_executions': executions,
+            'detailed_executions': self.executions_to_records(executions),
             'generation_timestamp': datetime.now().isoformat()
         }
         
@@ -2,76 +2,350 @@
 """
 データキャッシュシステム
 品質優先の5年データ生成と高速読み込み
+
+キャッシュは列ごとの.npyファイル（列指向）で保存し、読み込みは
+読み取り専用mmapで行う。複数のWFAワーカーが同じキャッシュを開いても
+ページはOSのページキャッシュで共有される。
 """
 
+import hashlib
+import json
 import os
 import pickle
+import shutil
 from datetime import datetime
 
-from multi_timeframe_breakout_strategy import create_enhanced_sample_data
+import numpy as np
+import pandas as pd
+
+from multi_timeframe_breakout_strategy import (
+    generate_enhanced_sample_columns,
+    generate_multi_symbol_columns,
+)
+
+# 列定義（列名 → 保存dtype）
+CACHE_COLUMNS = {
+    "datetime": "datetime64[ns]",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "int64",
+}
+CACHE_FORMAT_VERSION = 1
+DEFAULT_DATASET = "full_market_data_5y"
+DEFAULT_SEED = 42
+
+
+def records_to_columns(records):
+    """辞書リスト（従来形式）を列配列へ変換"""
+    return {
+        name: np.array([record[name] for record in records], dtype=dtype)
+        for name, dtype in CACHE_COLUMNS.items()
+    }
+
+
+def columns_to_records(columns):
+    """列配列を辞書リスト（従来形式）へ展開"""
+    datetimes = columns["datetime"].astype("datetime64[us]").astype(object)
+    values = [datetimes] + [columns[name].tolist() for name in list(CACHE_COLUMNS)[1:]]
+    names = list(CACHE_COLUMNS)
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def frame_to_records(frame):
+    """
+    DataFrame（get_full_frame形式）を辞書リスト（従来形式）へ展開
+
+    辞書を要求する既存の戦略コード向け。フルデータではなくFold等の
+    必要な区間だけを渡すこと。
+    """
+    columns = {name: frame[name].to_numpy() for name in list(CACHE_COLUMNS)[1:]}
+    columns["datetime"] = frame.index.to_numpy()
+    return columns_to_records(columns)
 
 
 class DataCacheManager:
     """データキャッシュ管理クラス"""
 
-    def __init__(self, cache_dir="data_cache"):
+    def __init__(
+        self,
+        cache_dir="data_cache",
+        dataset=DEFAULT_DATASET,
+        seed=DEFAULT_SEED,
+        data_lake=None,
+        timeframe="M5",
+    ):
         self.cache_dir = cache_dir
-        self.cache_file = os.path.join(cache_dir, "full_market_data_5y.pkl")
+        self.dataset = dataset
+        self.seed = seed
+        # ヒストリカルデータレイク（HistoricalDataLake）: 設定時はread_range()が
+        # 該当月のパーティションだけを読む（データセット名をシンボルとして登録）
+        self.data_lake = data_lake
+        self.timeframe = timeframe
+        # ensure_lake()済みフラグ（read_range()ごとの登録確認を省く）
+        self._lake_checked = False
+        self.columnar_dir = os.path.join(cache_dir, dataset)
+        self.manifest_file = os.path.join(self.columnar_dir, "manifest.json")
+        # 旧形式（pickle）キャッシュ: 存在すれば初回読み込み時に列形式へ移行
+        self.cache_file = os.path.join(cache_dir, f"{dataset}.pkl")
 
         # キャッシュディレクトリ作成
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir)
 
+    def _column_path(self, name):
+        return os.path.join(self.columnar_dir, f"{name}.npy")
+
+    def has_columnar_cache(self):
+        """列形式キャッシュの存在確認"""
+        return os.path.exists(self.manifest_file)
+
+    def write_columns(self, columns):
+        """
+        列形式キャッシュ書き込み
+
+        各列を一時ファイルに書いてからrenameし、manifestを最後に置くことで
+        読み込み側が書きかけのキャッシュを開かないようにする。
+        """
+        os.makedirs(self.columnar_dir, exist_ok=True)
+        if os.path.exists(self.manifest_file):
+            os.remove(self.manifest_file)
+
+        rows = None
+        for name, dtype in CACHE_COLUMNS.items():
+            array = np.ascontiguousarray(columns[name], dtype=dtype)
+            if rows is None:
+                rows = len(array)
+            elif len(array) != rows:
+                raise ValueError(f"列長不一致: {name} ({len(array)} != {rows})")
+
+            tmp_path = self._column_path(name) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, self._column_path(name))
+
+        manifest = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "rows": rows,
+            "columns": CACHE_COLUMNS,
+            "created": datetime.now().isoformat(),
+        }
+        tmp_manifest = self.manifest_file + ".tmp"
+        with open(tmp_manifest, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_manifest, self.manifest_file)
+        self._lake_checked = False
+
+    def lake_source(self):
+        """
+        データレイク登録時の書き出し元識別情報
+
+        シードとmanifestの内容ハッシュ。キャッシュを再生成するとmanifestの
+        作成時刻が変わるため、同じ期間でも別内容のキャッシュは区別される。
+        """
+        if not self.has_columnar_cache():
+            self._build_cache(False)
+        with open(self.manifest_file, "rb") as f:
+            manifest_digest = hashlib.sha256(f.read()).hexdigest()
+        return {"seed": self.seed, "manifest_sha256": manifest_digest}
+
+    def load_columns(self, force_regenerate=False, mmap=True):
+        """
+        列配列取得（キャッシュ活用）
+
+        Args:
+            force_regenerate: 強制再生成フラグ
+            mmap: 読み取り専用mmapで開く（Falseならメモリに読み込む）
+
+        Returns:
+            dict: 列名 → np.ndarray
+        """
+        if force_regenerate or not self.has_columnar_cache():
+            self._build_cache(force_regenerate)
+
+        mmap_mode = "r" if mmap else None
+        return {
+            name: np.load(self._column_path(name), mmap_mode=mmap_mode)
+            for name in CACHE_COLUMNS
+        }
+
+    def get_full_frame(self, force_regenerate=False):
+        """
+        フルデータ取得（DataFrame形式）
+
+        Returns:
+            pd.DataFrame: datetimeインデックス, open/high/low/close/volume列
+        """
+        columns = self.load_columns(force_regenerate)
+        return pd.DataFrame(
+            {name: columns[name] for name in list(CACHE_COLUMNS)[1:]},
+            index=pd.DatetimeIndex(columns["datetime"], name="datetime"),
+            copy=False,
+        )
+
+    def get_timeline(self):
+        """
+        時刻列のみ取得（Fold境界の計算用）
+
+        Returns:
+            pd.DatetimeIndex: 全バーの時刻（mmap上の列を参照）
+        """
+        return pd.DatetimeIndex(self.load_columns()["datetime"], name="datetime")
+
+    def ensure_lake(self):
+        """
+        データレイクへの登録確認
+
+        未登録、または登録済みの書き出し元（シード・manifestハッシュ）が現在の
+        キャッシュと一致しない場合のみ、既存の登録を削除して書き出し直す。
+        並列ワーカーからread_range()を呼ぶ場合は、投入前に親プロセスで呼ぶこと。
+        """
+        if self.data_lake is None:
+            return
+        source = self.lake_source()
+        if self.data_lake.source(self.dataset, self.timeframe) != source:
+            self.data_lake.drop_dataset(self.dataset, self.timeframe)
+            self.export_to_lake(self.data_lake, self.dataset, self.timeframe)
+        self._lake_checked = True
+
+    def read_range(self, start=None, end=None):
+        """
+        期間読み込み（DataFrame形式）
+
+        データレイク設定時はlake.read()で期間に重なる月のパーティションだけを
+        読む（登録確認はインスタンスごとに初回のみ）。未設定なら列形式キャッシュ
+        （mmap）から切り出す。
+
+        Args:
+            start: 開始時刻（含む）。Noneなら先頭から
+            end: 終了時刻（含む）。Noneなら末尾まで
+
+        Returns:
+            pd.DataFrame: datetimeインデックス, open/high/low/close/volume列
+        """
+        if self.data_lake is not None:
+            if not self._lake_checked:
+                self.ensure_lake()
+            frame = self.data_lake.read(
+                self.dataset, self.timeframe, start, end, list(CACHE_COLUMNS)[1:]
+            )
+            frame.index.name = "datetime"
+            return frame
+        return self.get_full_frame().loc[start:end]
+
     def get_full_data(self, force_regenerate=False):
         """
         フルデータ取得（キャッシュ活用）
 
+        従来形式の辞書リストを返す。新規コードはload_columns()または
+        get_full_frame()を使うこと（辞書を生成しない）。
+
         Args:
             force_regenerate: 強制再生成フラグ
 
         Returns:
             list: 5年間のM5データ
         """
+        columns = self.load_columns(force_regenerate)
+        return columns_to_records(columns)
 
-        if force_regenerate or not os.path.exists(self.cache_file):
-            print("🔄 フルデータ生成中...")
-            print("   予想時間: 3-5分（初回のみ）")
+    def _build_cache(self, force_regenerate):
+        """列形式キャッシュ構築（旧pickleからの移行または新規生成）"""
+        if not force_regenerate and os.path.exists(self.cache_file):
+            print("🔄 旧形式キャッシュを列形式へ移行中...")
+            with open(self.cache_file, "rb") as f:
+                data = pickle.load(f)
+            self.write_columns(records_to_columns(data))
+            os.remove(self.cache_file)
+            print(f"   移行完了: {len(data)}バー → {self.columnar_dir}")
+            return
 
-            # フルデータ生成
-            start_time = datetime.now()
-            data = create_enhanced_sample_data()
-            generation_time = (datetime.now() - start_time).total_seconds()
+        print("🔄 フルデータ生成中...")
 
-            print(f"   生成完了: {len(data)}バー ({generation_time:.1f}秒)")
+        # フルデータ生成（ベクトル化・列形式のまま保存）
+        start_time = datetime.now()
+        columns = generate_enhanced_sample_columns(seed=self.seed)
+        generation_time = (datetime.now() - start_time).total_seconds()
 
-            # キャッシュ保存
-            print("💾 データキャッシュ保存中...")
-            with open(self.cache_file, "wb") as f:
-                pickle.dump(data, f)
-            print(f"   保存先: {self.cache_file}")
+        print(f"   生成完了: {len(columns['close'])}バー ({generation_time:.1f}秒)")
 
-            return data
+        # キャッシュ保存
+        print("💾 データキャッシュ保存中...")
+        self.write_columns(columns)
+        print(f"   保存先: {self.columnar_dir}")
 
-        else:
-            print("⚡ キャッシュデータ読み込み中...")
-            start_time = datetime.now()
+    def export_to_lake(self, lake, symbol="EURUSD", timeframe="M5"):
+        """
+        キャッシュをヒストリカルデータレイクへ書き出し
 
-            with open(self.cache_file, "rb") as f:
-                data = pickle.load(f)
+        lakeはHistoricalDataLake。月単位パーティションに分割されるため、
+        WFAのFoldは必要な期間のパーティションだけを読める。
+
+        Returns:
+            list: 更新したパーティションキー
+        """
+        return lake.append(
+            symbol, timeframe, self.get_full_frame(), source=self.lake_source()
+        )
+
+    @classmethod
+    def build_stress_datasets(
+        cls,
+        symbols=("EURUSD", "USDJPY", "GBPJPY"),
+        years=50,
+        cache_dir="data_cache",
+        seed=DEFAULT_SEED,
+    ):
+        """
+        ストレステスト用データセット構築（複数通貨ペア・複数年）
 
-            load_time = (datetime.now() - start_time).total_seconds()
-            print(f"   読み込み完了: {len(data)}バー ({load_time:.1f}秒)")
+        通貨ペアごとに "stress_<SYMBOL>_<years>y" データセットとして保存する。
 
-            return data
+        Returns:
+            dict: 通貨ペア → DataCacheManager
+        """
+        managers = {}
+        all_columns = generate_multi_symbol_columns(
+            symbols=symbols, years=years, seed=seed
+        )
+        for symbol, columns in all_columns.items():
+            manager = cls(
+                cache_dir=cache_dir, dataset=f"stress_{symbol}_{years}y", seed=seed
+            )
+            manager.write_columns(columns)
+            managers[symbol] = manager
+            print(f"💾 {symbol}: {len(columns['close'])}バー → {manager.columnar_dir}")
+        return managers
 
     def get_cache_info(self):
         """キャッシュ情報取得"""
-        if os.path.exists(self.cache_file):
+        if self.has_columnar_cache():
+            with open(self.manifest_file) as f:
+                manifest = json.load(f)
+            file_size = sum(
+                os.path.getsize(self._column_path(name)) for name in CACHE_COLUMNS
+            ) / (
+                1024 * 1024
+            )  # MB
+            mod_time = datetime.fromtimestamp(os.path.getmtime(self.manifest_file))
+
+            return {
+                "exists": True,
+                "format": "columnar",
+                "rows": manifest["rows"],
+                "file_size_mb": file_size,
+                "modified": mod_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "path": self.columnar_dir,
+            }
+        elif os.path.exists(self.cache_file):
             file_size = os.path.getsize(self.cache_file) / (1024 * 1024)  # MB
             mod_time = datetime.fromtimestamp(os.path.getmtime(self.cache_file))
 
             return {
                 "exists": True,
+                "format": "pickle",
+                "rows": None,
                 "file_size_mb": file_size,
                 "modified": mod_time.strftime("%Y-%m-%d %H:%M:%S"),
                 "path": self.cache_file,
@@ -79,16 +353,25 @@ class DataCacheManager:
         else:
             return {
                 "exists": False,
+                "format": None,
+                "rows": 0,
                 "file_size_mb": 0,
                 "modified": None,
-                "path": self.cache_file,
+                "path": self.columnar_dir,
             }
 
     def clear_cache(self):
         """キャッシュクリア"""
+        cleared = []
+        if os.path.exists(self.columnar_dir):
+            shutil.rmtree(self.columnar_dir)
+            cleared.append(self.columnar_dir)
         if os.path.exists(self.cache_file):
             os.remove(self.cache_file)
-            print(f"🗑️ キャッシュクリア完了: {self.cache_file}")
+            cleared.append(self.cache_file)
+
+        if cleared:
+            print(f"🗑️ キャッシュクリア完了: {', '.join(cleared)}")
         else:
             print("ℹ️ クリア対象のキャッシュが存在しません")
 
@@ -104,17 +387,20 @@ def main():
     print("📊 キャッシュ情報:")
     print(f"   存在: {info['exists']}")
     if info["exists"]:
+        print(f"   形式: {info['format']}")
         print(f"   サイズ: {info['file_size_mb']:.1f}MB")
         print(f"   更新日時: {info['modified']}")
 
-    # データ取得テスト
-    data = cache_manager.get_full_data()
+    # データ取得テスト（mmap列形式）
+    start_time = datetime.now()
+    frame = cache_manager.get_full_frame()
+    load_time = (datetime.now() - start_time).total_seconds()
 
     print("\n✅ データ取得成功")
-    print(f"   データ数: {len(data)}バー")
-    print(f"   期間: {data[0]['datetime']} to {data[-1]['datetime']}")
+    print(f"   データ数: {len(frame)}バー ({load_time:.3f}秒)")
+    print(f"   期間: {frame.index[0]} to {frame.index[-1]}")
 
-    return cache_manager, data
+    return cache_manager, frame
 
 
 if __name__ == "__main__":
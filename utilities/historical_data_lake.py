@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+ヒストリカルデータレイク
+通貨ペア/時間軸/年月でパーティション分割した列形式ストア
+
+レイアウト:
+    <root>/<SYMBOL>/<TIMEFRAME>/<YYYY-MM>/<column>.npy
+    <root>/_index.json  … 各パーティションの時刻範囲・行数
+
+- 追記は該当月のパーティションのみ書き換える（全体の再書き込みなし）
+- 索引の更新はロックファイルで直列化し、ディスク上の最新索引を読み直してから
+  自データセットの項目だけを書き換える（同じrootを開く他インスタンス・他プロセスの
+  登録を上書きしない）
+- 読み込みは索引の時刻範囲で対象パーティションを絞り込み（述語プッシュダウン）、
+  mmapで開いた列をsearchsortedで切り出す
+"""
+
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: ロックなし（単一プロセス前提）
+    fcntl = None
+
+INDEX_FILE = "_index.json"
+LOCK_FILE = "_index.lock"
+TIMESTAMP_COLUMN = "datetime"
+
+
+def _normalize_frame(frame):
+    """DatetimeIndex・小文字列名・時刻昇順に正規化（呼び出し元のframeは変更しない）"""
+    if not isinstance(frame.index, pd.DatetimeIndex):
+        if TIMESTAMP_COLUMN in frame.columns:
+            frame = frame.set_index(TIMESTAMP_COLUMN)
+        frame = frame.set_axis(pd.DatetimeIndex(frame.index), axis=0)
+    if frame.index.tz is not None:
+        frame = frame.tz_convert("UTC").tz_localize(None)
+    frame = frame.rename(columns=str.lower)
+    frame = frame[~frame.index.duplicated(keep="last")]
+    return frame.sort_index()
+
+
+class HistoricalDataLake:
+    """パーティション分割ヒストリカルデータストア"""
+
+    def __init__(self, root="data_lake"):
+        self.root = root
+        self.index_file = os.path.join(root, INDEX_FILE)
+        self.lock_file = os.path.join(root, LOCK_FILE)
+        os.makedirs(root, exist_ok=True)
+        self._index_stamp = None
+        self._index = self._load_index()
+
+    # ------------------------------------------------------------------
+    # 索引
+    # ------------------------------------------------------------------
+    def _stat_index(self):
+        try:
+            stat = os.stat(self.index_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_index(self):
+        self._index_stamp = self._stat_index()
+        if self._index_stamp is None:
+            return {}
+        with open(self.index_file) as f:
+            return json.load(f)
+
+    def _refresh_index(self):
+        """他インスタンスが索引を更新していれば読み直す"""
+        if self._stat_index() != self._index_stamp:
+            self._index = self._load_index()
+
+    @contextmanager
+    def _locked_index(self):
+        """
+        索引の排他更新
+
+        ロック取得後にディスク上の索引を読み直すため、ブロック内の変更は
+        他インスタンスの登録にマージされた状態で_save_index()される。
+        """
+        with open(self.lock_file, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                self._index = self._load_index()
+                yield self._index
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _save_index(self):
+        """索引書き込み（_locked_index()内で呼ぶこと）"""
+        tmp_path = self.index_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_file)
+        self._index_stamp = self._stat_index()
+
+    @staticmethod
+    def _dataset_key(symbol, timeframe):
+        return f"{symbol}/{timeframe}"
+
+    def datasets(self):
+        """登録済みデータセット一覧 [(symbol, timeframe), ...]"""
+        self._refresh_index()
+        return [tuple(key.split("/", 1)) for key in sorted(self._index)]
+
+    def partitions(self, symbol, timeframe):
+        """パーティション索引 {YYYY-MM: {start, end, rows}}"""
+        self._refresh_index()
+        entry = self._index.get(self._dataset_key(symbol, timeframe), {})
+        return dict(entry.get("partitions", {}))
+
+    def source(self, symbol, timeframe):
+        """append(source=...)で記録した書き出し元の識別情報。未記録ならNone"""
+        self._refresh_index()
+        entry = self._index.get(self._dataset_key(symbol, timeframe), {})
+        return entry.get("source")
+
+    def time_range(self, symbol, timeframe):
+        """データセット全体の時刻範囲 (start, end)。未登録ならNone"""
+        partitions = self.partitions(symbol, timeframe)
+        if not partitions:
+            return None
+        return (
+            pd.Timestamp(min(p["start"] for p in partitions.values())),
+            pd.Timestamp(max(p["end"] for p in partitions.values())),
+        )
+
+    # ------------------------------------------------------------------
+    # パーティション入出力
+    # ------------------------------------------------------------------
+    def _partition_dir(self, symbol, timeframe, key):
+        return os.path.join(self.root, symbol, timeframe, key)
+
+    def _read_partition(self, symbol, timeframe, key, columns, mmap=True):
+        partition_dir = self._partition_dir(symbol, timeframe, key)
+        mmap_mode = "r" if mmap else None
+        timestamps = np.load(
+            os.path.join(partition_dir, f"{TIMESTAMP_COLUMN}.npy"), mmap_mode=mmap_mode
+        )
+        values = {
+            name: np.load(
+                os.path.join(partition_dir, f"{name}.npy"), mmap_mode=mmap_mode
+            )
+            for name in columns
+        }
+        return timestamps, values
+
+    def _write_partition(self, symbol, timeframe, key, frame):
+        """パーティション書き込み（一時ディレクトリ → rename）"""
+        partition_dir = self._partition_dir(symbol, timeframe, key)
+        tmp_dir = partition_dir + ".tmp"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+
+        np.save(
+            os.path.join(tmp_dir, f"{TIMESTAMP_COLUMN}.npy"),
+            frame.index.to_numpy(dtype="datetime64[ns]"),
+        )
+        for name in frame.columns:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), frame[name].to_numpy())
+
+        if os.path.exists(partition_dir):
+            shutil.rmtree(partition_dir)
+        os.replace(tmp_dir, partition_dir)
+
+    # ------------------------------------------------------------------
+    # 公開API
+    # ------------------------------------------------------------------
+    def append(self, symbol, timeframe, frame, source=None):
+        """
+        バー追記（差分のみ）
+
+        新しいバーが属する月のパーティションだけを書き換える。同一時刻のバーは
+        新しい値で上書きする。
+
+        Args:
+            symbol: 通貨ペア（例: EURUSD）
+            timeframe: 時間軸（例: M5, D1）
+            frame: DatetimeIndex（またはdatetime列）を持つOHLC(V) DataFrame
+            source: 書き出し元の識別情報（JSON化可能な値）。指定時は索引に記録
+
+        Returns:
+            list: 更新したパーティションキー
+        """
+        frame = _normalize_frame(frame)
+        if frame.empty:
+            return []
+
+        with self._locked_index() as index:
+            return self._append_locked(index, symbol, timeframe, frame, source)
+
+    def _append_locked(self, index, symbol, timeframe, frame, source):
+        dataset_key = self._dataset_key(symbol, timeframe)
+        entry = index.setdefault(dataset_key, {"columns": [], "partitions": {}})
+        if not entry["columns"]:
+            entry["columns"] = list(frame.columns)
+        elif list(frame.columns) != entry["columns"]:
+            frame = frame.reindex(columns=entry["columns"])
+
+        updated = []
+        partition_keys = frame.index.strftime("%Y-%m")
+        for key, new_rows in frame.groupby(partition_keys, sort=True):
+            meta = entry["partitions"].get(key)
+            if meta is not None:
+                timestamps, values = self._read_partition(
+                    symbol, timeframe, key, entry["columns"], mmap=False
+                )
+                existing = pd.DataFrame(
+                    values, index=pd.DatetimeIndex(timestamps), columns=entry["columns"]
+                )
+                merged = pd.concat([existing, new_rows])
+                if new_rows.index[0] <= existing.index[-1]:
+                    # 過去バーの訂正・重複を含む場合のみ整列し直す
+                    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            else:
+                merged = new_rows
+
+            self._write_partition(symbol, timeframe, key, merged)
+            entry["partitions"][key] = {
+                "start": merged.index[0].isoformat(),
+                "end": merged.index[-1].isoformat(),
+                "rows": int(len(merged)),
+            }
+            updated.append(key)
+
+        if source is not None:
+            entry["source"] = source
+        entry["updated"] = datetime.now().isoformat()
+        self._save_index()
+        return updated
+
+    def read(self, symbol, timeframe, start=None, end=None, columns=None):
+        """
+        時刻範囲読み込み（必要なパーティションのみ）
+
+        Args:
+            start: 開始時刻（含む）。Noneなら先頭から
+            end: 終了時刻（含む）。Noneなら末尾まで
+            columns: 読み込む列（Noneなら全列）
+
+        Returns:
+            pd.DataFrame: DatetimeIndexのDataFrame（該当なしなら空）
+        """
+        self._refresh_index()
+        entry = self._index.get(self._dataset_key(symbol, timeframe))
+        columns = list(columns) if columns is not None else None
+        if entry is None:
+            return pd.DataFrame(columns=columns or [])
+
+        columns = columns or entry["columns"]
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        frames = []
+        for key in sorted(entry["partitions"]):
+            meta = entry["partitions"][key]
+            # 述語プッシュダウン: 範囲外のパーティションは開かない
+            if start is not None and pd.Timestamp(meta["end"]) < start:
+                continue
+            if end is not None and pd.Timestamp(meta["start"]) > end:
+                continue
+
+            timestamps, values = self._read_partition(symbol, timeframe, key, columns)
+            lo = (
+                0
+                if start is None
+                else np.searchsorted(timestamps, start.to_datetime64())
+            )
+            hi = (
+                len(timestamps)
+                if end is None
+                else np.searchsorted(timestamps, end.to_datetime64(), side="right")
+            )
+            if lo >= hi:
+                continue
+            frames.append(
+                pd.DataFrame(
+                    {name: values[name][lo:hi] for name in columns},
+                    index=pd.DatetimeIndex(timestamps[lo:hi], name=TIMESTAMP_COLUMN),
+                    copy=False,
+                )
+            )
+
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames)
+
+    def drop_before(self, symbol, timeframe, cutoff):
+        """cutoffより前に終わるパーティションを削除（保持期間管理）"""
+        cutoff = pd.Timestamp(cutoff)
+        with self._locked_index() as index:
+            entry = index.get(self._dataset_key(symbol, timeframe))
+            if entry is None:
+                return []
+
+            dropped = [
+                key
+                for key, meta in entry["partitions"].items()
+                if pd.Timestamp(meta["end"]) < cutoff
+            ]
+            for key in dropped:
+                shutil.rmtree(
+                    self._partition_dir(symbol, timeframe, key), ignore_errors=True
+                )
+                del entry["partitions"][key]
+
+            if dropped:
+                self._save_index()
+            return dropped
+
+    def drop_dataset(self, symbol, timeframe):
+        """データセット全体を削除（書き出し元が変わった場合の再登録用）"""
+        with self._locked_index() as index:
+            if index.pop(self._dataset_key(symbol, timeframe), None) is None:
+                return False
+            shutil.rmtree(
+                os.path.join(self.root, symbol, timeframe), ignore_errors=True
+            )
+            self._save_index()
+            return True
+
+
+def main():
+    """テスト実行"""
+    import tempfile
+
+    print("🚀 ヒストリカルデータレイク テスト")
+
+    with tempfile.TemporaryDirectory() as root:
+        lake = HistoricalDataLake(root)
+        index = pd.date_range("2024-01-30", periods=2000, freq="5min")
+        frame = pd.DataFrame(
+            {"open": 1.1, "high": 1.1005, "low": 1.0995, "close": 1.1, "volume": 100},
+            index=index,
+        )
+
+        updated = lake.append("EURUSD", "M5", frame.iloc[:1500])
+        print(f"   初回追記: {updated}")
+        updated = lake.append("EURUSD", "M5", frame.iloc[1500:])
+        print(f"   差分追記: {updated}")
+
+        subset = lake.read("EURUSD", "M5", start="2024-02-03", end="2024-02-04")
+        print(
+            f"   範囲読み込み: {len(subset)}バー ({subset.index[0]} - {subset.index[-1]})"
+        )
+        print(f"   パーティション: {lake.partitions('EURUSD', 'M5')}")
+
+
+if __name__ == "__main__":
+    main()
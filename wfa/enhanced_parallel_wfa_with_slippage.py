@@ -46,7 +46,7 @@ class EnhancedWFAStrategy(TradingStrategy):
             order_type=order_type
         )
         
-        if not executions:
+        if len(executions) == 0:
             return {
                 'total_return': 0.0,
                 'sharpe_ratio': np.nan,
@@ -55,46 +55,36 @@ class EnhancedWFAStrategy(TradingStrategy):
                 'avg_slippage_pct': 0.0
             }
         
-        # リターン計算
-        returns = []
-        equity_curve = [1.0]  # 初期資本1.0
+        # リターン計算（次の約定までのリターン）
+        execution_prices = executions['execution_price']
+        returns_array = np.diff(execution_prices) / execution_prices[:-1]
+        equity_curve = np.concatenate(([1.0], np.cumprod(1 + returns_array)))  # 初期資本1.0
         
-        for i, execution in enumerate(executions):
-            if i + 1 < len(executions):
-                # 次の約定までのリターン
-                entry_price = execution['execution_price']
-                exit_price = executions[i + 1]['execution_price']
-                trade_return = (exit_price - entry_price) / entry_price
-                returns.append(trade_return)
-                equity_curve.append(equity_curve[-1] * (1 + trade_return))
-        
-        if not returns:
+        if len(returns_array) == 0:
             return {
                 'total_return': 0.0,
                 'sharpe_ratio': np.nan,
                 'max_drawdown': 0.0,
                 'execution_count': len(executions),
-                'avg_slippage_pct': np.mean([e['slippage_pct'] for e in executions])
+                'avg_slippage_pct': np.mean(executions['slippage_pct'])
             }
         
         # パフォーマンス指標計算
         total_return = equity_curve[-1] - 1.0
-        returns_array = np.array(returns)
         
         # シャープレシオ
-        if len(returns) > 1 and returns_array.std() > 0:
+        if len(returns_array) > 1 and returns_array.std() > 0:
             sharpe_ratio = returns_array.mean() / returns_array.std() * np.sqrt(252)
         else:
             sharpe_ratio = np.nan
         
         # 最大ドローダウン
-        equity_array = np.array(equity_curve)
-        running_max = np.maximum.accumulate(equity_array)
-        drawdowns = (equity_array / running_max) - 1
+        running_max = np.maximum.accumulate(equity_curve)
+        drawdowns = (equity_curve / running_max) - 1
         max_drawdown = np.min(drawdowns)
         
         # スリッパージ統計
-        avg_slippage_pct = np.mean([e['slippage_pct'] for e in executions])
+        avg_slippage_pct = np.mean(executions['slippage_pct'])
         
         return {
             'total_return': total_return,
@@ -102,7 +92,7 @@ class EnhancedWFAStrategy(TradingStrategy):
             'max_drawdown': max_drawdown,
             'execution_count': len(executions),
             'avg_slippage_pct': avg_slippage_pct,
-            'total_slippage_cost': sum([e['slippage_cost'] for e in executions]),
+            'total_slippage_cost': float(executions['slippage_cost'].sum()),
             'detailed_executions': executions
         }
 
@@ -337,7 +327,9 @@ class EnhancedParallelWFARunner:
                     slippage_config = SlippageConfig(
                         base_spread=slippage_scenario['base_spread'],
                         market_impact_coeff=slippage_scenario['market_impact_coeff'],
-                        execution_delay_ms=slippage_scenario['execution_delay_ms']
+                        execution_delay_ms=slippage_scenario['execution_delay_ms'],
+                        # ワーカー内では約定履歴を参照しないため保持しない
+                        max_execution_history=slippage_scenario.get('max_execution_history', 0)
                     )
                     
                     task = (
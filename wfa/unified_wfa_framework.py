@@ -9,9 +9,10 @@ import logging
 import random
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
+import pandas as pd
 
 # ログ設定（scipyインポート前に設定）
 logging.basicConfig(
@@ -28,7 +29,8 @@ except ImportError:
     SCIPY_AVAILABLE = False
     logger.warning("scipy.stats not available. Using fallback p-value calculation.")
 
-from data_cache_system import DataCacheManager
+from data_cache_system import DataCacheManager, frame_to_records
+from historical_data_lake import HistoricalDataLake
 from multi_timeframe_breakout_strategy import (
     MultiTimeframeBreakoutStrategy,
     MultiTimeframeData,
@@ -47,6 +49,8 @@ class WFAConfiguration:
         # パフォーマンス設定
         self.data_sampling_ratio = 1.0  # 1.0 = 全データ, 0.2 = 20%サンプリング
         self.parallel_processing = False
+        # フォールド期間の読み込み元（Noneなら列形式キャッシュから直接切り出す）
+        self.data_lake_dir: Optional[str] = "data_cache/data_lake"
 
         # 統計設定
         self.significance_level = 0.05
@@ -333,7 +337,12 @@ class UnifiedWFAFramework:
 
     def __init__(self, config: Optional[WFAConfiguration] = None):
         self.config = config or WFAConfiguration()
-        self.cache_manager = DataCacheManager()
+        data_lake = (
+            HistoricalDataLake(self.config.data_lake_dir)
+            if self.config.data_lake_dir
+            else None
+        )
+        self.cache_manager = DataCacheManager(data_lake=data_lake)
         self.folds: List[WFAFold] = []
         self.results: Dict = {}
 
@@ -341,25 +350,39 @@ class UnifiedWFAFramework:
         if not self.config.validate():
             raise ValueError("WFA設定が無効です")
 
-    def prepare_data(self) -> List[Dict[str, Any]]:
-        """データ準備"""
+    def prepare_data(self) -> pd.DatetimeIndex:
+        """データ準備（時刻列のみ。バーはフォールド毎に期間読み込みする）"""
         logger.info("データ準備開始")
 
-        # 全データ取得
-        raw_data = self.cache_manager.get_full_data()
+        # 全期間の時刻列取得
+        timeline = self.cache_manager.get_timeline()
 
         # サンプリング適用
         if self.config.data_sampling_ratio < 1.0:
-            sample_size = int(len(raw_data) * self.config.data_sampling_ratio)
-            step = len(raw_data) // sample_size
-            raw_data = raw_data[::step]
-            logger.info(f"データサンプリング適用: {len(raw_data)}バー")
-
-        logger.info(f"使用データ: {len(raw_data)}バー")
-        return raw_data
-
-    def generate_folds(self, data: List[Dict]) -> List[WFAFold]:
-        """WFAフォールド生成"""
+            sample_size = int(len(timeline) * self.config.data_sampling_ratio)
+            step = len(timeline) // sample_size
+            timeline = timeline[::step]
+            logger.info(f"データサンプリング適用: {len(timeline)}バー")
+
+        logger.info(f"使用データ: {len(timeline)}バー")
+        return timeline
+
+    def _load_fold_frame(self, timeline: pd.DatetimeIndex) -> pd.DataFrame:
+        """フォールド期間のバー読み込み（データレイク設定時は該当月のパーティションのみ）"""
+        frame = self.cache_manager.read_range(timeline[0], timeline[-1])
+        if len(frame) != len(timeline):
+            # サンプリング適用時は時刻列に合わせて間引く
+            frame = frame.loc[timeline]
+        return frame
+
+    def generate_folds(self, data: pd.DatetimeIndex) -> List[WFAFold]:
+        """
+        WFAフォールド生成
+
+        フォールド境界は時刻列上で決め、各フォールドのバーは
+        cache_manager.read_range()で期間読み込みする。戦略が要求する
+        辞書リストへの展開もフォールドの区間だけに限定する。
+        """
         logger.info(f"WFAフォールド生成: {self.config.fold_count}フォールド")
 
         folds = []
@@ -385,23 +408,29 @@ class UnifiedWFAFramework:
                 continue
 
             # データ抽出
-            is_data = data[is_start:is_end]
-            oos_data = data[oos_start:oos_end]
+            is_frame = self._load_fold_frame(data[is_start:is_end])
+            oos_frame = self._load_fold_frame(data[oos_start:oos_end])
 
             # 期間情報
             is_period = (
-                is_data[0]["datetime"].strftime("%Y-%m-%d"),
-                is_data[-1]["datetime"].strftime("%Y-%m-%d"),
+                is_frame.index[0].strftime("%Y-%m-%d"),
+                is_frame.index[-1].strftime("%Y-%m-%d"),
             )
             oos_period = (
-                oos_data[0]["datetime"].strftime("%Y-%m-%d"),
-                oos_data[-1]["datetime"].strftime("%Y-%m-%d"),
+                oos_frame.index[0].strftime("%Y-%m-%d"),
+                oos_frame.index[-1].strftime("%Y-%m-%d"),
             )
 
-            fold = WFAFold(i + 1, is_data, oos_data, is_period, oos_period)
+            fold = WFAFold(
+                i + 1,
+                frame_to_records(is_frame),
+                frame_to_records(oos_frame),
+                is_period,
+                oos_period,
+            )
             folds.append(fold)
 
-            logger.info(f"フォールド{i+1}: IS={len(is_data)}バー, OOS={len(oos_data)}バー")
+            logger.info(f"フォールド{i+1}: IS={len(is_frame)}バー, OOS={len(oos_frame)}バー")
 
         self.folds = folds
         return folds
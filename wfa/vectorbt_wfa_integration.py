@@ -24,47 +24,38 @@ class VectorBTWFAIntegration:
         self.symbol = symbol
         self.timeframe = timeframe
         self.data_cache = DataCacheManager()
-        self.raw_data = None
         self.vectorbt_data = None
         
     def load_data(self):
         """既存WFAシステムからデータ読み込み"""
         try:
-            # 既存WFAシステムのデータ読み込み
-            self.raw_data = self.data_cache.get_full_data()
-            if not self.raw_data:
+            # 列形式キャッシュから直接DataFrameを構築（辞書リストを経由しない）
+            frame = self.data_cache.get_full_frame()
+            if frame.empty:
                 print("❌ データ読み込み失敗")
                 return False
                 
             # VectorBT用データ形式変換
-            self.vectorbt_data = self._convert_to_vectorbt_format(self.raw_data)
+            self.vectorbt_data = self._convert_to_vectorbt_format(frame)
             
-            print(f"✅ データ読み込み成功: {len(self.raw_data)}件")
+            print(f"✅ データ読み込み成功: {len(self.vectorbt_data)}件")
             return True
             
         except Exception as e:
             print(f"❌ データ読み込みエラー: {e}")
             return False
     
-    def _convert_to_vectorbt_format(self, raw_data):
-        """WFAデータをVectorBT形式に変換"""
-        df = pd.DataFrame(raw_data)
-        
-        # 必要なカラムの確認と変換
-        required_columns = ['datetime', 'open', 'high', 'low', 'close']
-        if not all(col in df.columns for col in required_columns):
+    def _convert_to_vectorbt_format(self, frame):
+        """WFAデータ（get_full_frame形式）をVectorBT形式に変換"""
+        # 必要なカラムの確認
+        required_columns = ['open', 'high', 'low', 'close']
+        if not all(col in frame.columns for col in required_columns):
             print("❌ 必要なカラムが不足")
-            print(f"実際のカラム: {list(df.columns)}")
+            print(f"実際のカラム: {list(frame.columns)}")
             return None
         
-        # インデックス設定
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df.set_index('datetime', inplace=True)
-        
-        # カラム名統一
-        df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}, inplace=True)
-        
-        return df
+        # カラム名統一（インデックスは既にdatetime）
+        return frame.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'})
     
     def calculate_breakout_signals(self, lookback_period=20):
         """ブレイクアウト信号計算（既存WFA戦略ロジック使用）"""